@@ -0,0 +1,138 @@
+# app_index.py
+
+"""
+Character-trigram index over APP_COMMANDS names.
+
+difflib.get_close_matches scores every installed app on every command.
+AppNameIndex gives the same answer (same cutoff, same tie-breaking)
+without the full SequenceMatcher scan:
+
+  1) the few names sharing the most trigrams with the spoken target are
+     scored first, which usually sets a high bar at once;
+  2) every other name is bounded by difflib's quick_ratio (shared
+     characters, counted for all names at once from a character-count
+     matrix), which is never below the real ratio.  Names are scored in
+     order of that bound until it drops below the n-th best score.
+
+Nothing in it is app-specific; music_library.py uses it for song names too.
+"""
+
+import difflib
+import heapq
+from collections import Counter, defaultdict
+
+from startup import lazy_import
+
+np = lazy_import("numpy")
+
+
+def trigrams(s: str):
+    """Padded trigrams so 1–2 character names still get keys."""
+    s = f"  {s} "
+    return {s[i:i + 3] for i in range(len(s) - 2)}
+
+
+class AppNameIndex:
+    def __init__(self, names=(), shortlist=32):
+        self.shortlist = shortlist
+        self._names = []
+        self._ngram_counts = []              # name id → number of trigrams
+        self._postings = defaultdict(list)   # trigram → [name ids]
+        self._chars = None                   # (char → column, name × char counts, name lengths), built on use
+        for n in names:
+            self.add(n)
+
+    def add(self, name):
+        i = len(self._names)
+        grams = trigrams(name)
+        self._names.append(name)
+        self._ngram_counts.append(len(grams))
+        for g in grams:
+            self._postings[g].append(i)
+        self._chars = None
+
+    def __len__(self):
+        return len(self._names)
+
+    def _shortlist(self, target):
+        """Up to `shortlist` name ids ranked by trigram Dice similarity."""
+        grams = trigrams(target)
+        hits = defaultdict(int)
+        for g in grams:
+            for i in self._postings.get(g, ()):
+                hits[i] += 1
+        n = len(grams)
+        counts = self._ngram_counts
+        return heapq.nlargest(self.shortlist, hits, key=lambda i: hits[i] / (n + counts[i]))
+
+    def candidates(self, target):
+        """Return up to `shortlist` names ranked by trigram Dice similarity."""
+        return [self._names[i] for i in self._shortlist(target)]
+
+    def _char_matrix(self):
+        if self._chars is None:
+            columns, rows, cols, vals = {}, [], [], []
+            for i, name in enumerate(self._names):
+                for c, k in Counter(name).items():
+                    rows.append(i)
+                    cols.append(columns.setdefault(c, len(columns)))
+                    vals.append(k)
+            counts = np.zeros((len(self._names), max(len(columns), 1)), dtype=np.int32)
+            counts[rows, cols] = vals
+            self._chars = (columns, counts, np.array([len(n) for n in self._names], dtype=np.int64))
+        return self._chars
+
+    def _upper_bounds(self, target):
+        """difflib quick_ratio of every name against `target` (≥ its ratio)."""
+        columns, counts, lengths = self._char_matrix()
+        want = Counter(target)
+        cols = [columns[c] for c in want if c in columns]
+        shared = (np.minimum(counts[:, cols], [want[c] for c in want if c in columns]).sum(axis=1)
+                  if cols else np.zeros(len(self._names), dtype=np.int64))
+        total = lengths + len(target)
+        # same arithmetic as difflib's _calculate_ratio, so ties compare equal
+        return np.where(total > 0, 2.0 * shared / np.maximum(total, 1), 1.0)
+
+    def scored_matches(self, target, n=1, cutoff=0.6):
+        """[(ratio, name)] best first: exactly difflib.get_close_matches, with scores."""
+        if not self._names:
+            return []
+        s = difflib.SequenceMatcher()
+        s.set_seq2(target)
+        scored, seen = [], set()
+
+        def score(i):
+            seen.add(i)
+            x = self._names[i]
+            s.set_seq1(x)
+            if s.real_quick_ratio() >= cutoff and s.quick_ratio() >= cutoff:
+                r = s.ratio()
+                if r >= cutoff:
+                    scored.append((r, x))
+
+        def bar():
+            # a name has to reach this to enter the top n (ties go by name, like difflib)
+            return cutoff if len(scored) < n else max(cutoff, heapq.nlargest(n, scored)[-1][0])
+
+        for i in self._shortlist(target):
+            score(i)
+        bounds = self._upper_bounds(target)
+        floor = bar()
+        rest = np.flatnonzero(bounds >= floor)
+        for i in rest[np.argsort(-bounds[rest], kind="stable")].tolist():
+            if bounds[i] < floor:
+                break
+            if i not in seen:
+                found = len(scored)
+                score(i)
+                if len(scored) > found:
+                    floor = bar()
+        return heapq.nlargest(n, scored)
+
+    def close_matches(self, target, n=1, cutoff=0.6):
+        """Drop-in for difflib.get_close_matches(target, names, n, cutoff)."""
+        return [x for _, x in self.scored_matches(target, n, cutoff)]
+
+    def best_match(self, target, cutoff=0.6):
+        best = self.close_matches(target, n=1, cutoff=cutoff)
+        return best[0] if best else None
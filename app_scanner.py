@@ -0,0 +1,217 @@
+# app_scanner.py
+
+"""
+Builds the {app name: exe path} index from the Uninstall registry keys and
+the Start Menu shortcuts.  Shortcuts are resolved in-process with lnk.py and
+all sources are scanned concurrently, then merged in the original order so
+later sources still override earlier ones.
+
+apps_index.json keeps one entry per source together with its fingerprint
+(registry key last-write time, Start Menu directory mtimes and per-file
+mtime/size), so a refresh only re-reads what changed since the last run.
+"""
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import winreg
+except ImportError:   # not on Windows: registry sources are simply empty
+    winreg = None
+
+from lnk import resolve_target
+
+UNINSTALL_KEY = r"SOFTWARE\Microsoft\Windows\CurrentVersion\Uninstall"
+INDEX_VERSION = 2
+
+
+def registry_sources():
+    """(source id, hive, access flag) in merge order: HKLM 32/64-bit, then HKCU."""
+    if winreg is None:
+        return []
+    return [
+        ("registry:HKLM32", winreg.HKEY_LOCAL_MACHINE, winreg.KEY_WOW64_32KEY),
+        ("registry:HKLM64", winreg.HKEY_LOCAL_MACHINE, winreg.KEY_WOW64_64KEY),
+        ("registry:HKCU",   winreg.HKEY_CURRENT_USER, 0),
+    ]
+
+
+def start_menu_folders():
+    """All Users then current user Start Menu\\Programs, if they exist."""
+    folders = []
+    for env in ("PROGRAMDATA", "APPDATA"):
+        path = os.path.join(os.environ.get(env, ""), "Microsoft", "Windows", "Start Menu", "Programs")
+        if os.path.isdir(path):
+            folders.append(path)
+    return folders
+
+
+# ─── Registry ────────────────────────────────────────────────────────────
+
+def registry_fingerprint(hive, flag=0):
+    """Last-write time of the Uninstall key (changes when apps come and go)."""
+    try:
+        with winreg.OpenKey(hive, UNINSTALL_KEY, 0, winreg.KEY_READ | flag) as key:
+            return winreg.QueryInfoKey(key)[2]
+    except OSError:
+        return None
+
+
+def scan_registry(hive, flag=0):
+    apps = {}
+    try:
+        with winreg.OpenKey(hive, UNINSTALL_KEY, 0, winreg.KEY_READ | flag) as key:
+            for i in range(winreg.QueryInfoKey(key)[0]):
+                try:
+                    sub = winreg.EnumKey(key, i)
+                    with winreg.OpenKey(key, sub) as sk:
+                        name, _ = winreg.QueryValueEx(sk, "DisplayName")
+                        icon, _ = winreg.QueryValueEx(sk, "DisplayIcon")
+                        if name and icon:
+                            apps[name.lower()] = icon.split(",")[0]
+                except OSError:
+                    continue
+    except OSError:
+        pass
+    return apps
+
+
+def refresh_registry(hive, flag, prev):
+    """Returns (source entry, rescanned?, files touched)."""
+    fp = registry_fingerprint(hive, flag)
+    if prev and fp is not None and prev.get("fingerprint") == fp:
+        return prev, False, 0
+    return {"fingerprint": fp, "apps": scan_registry(hive, flag)}, True, 0
+
+
+# ─── Start Menu ──────────────────────────────────────────────────────────
+
+def _shortcut_name(path):
+    return os.path.basename(path).lower().rsplit(".", 1)[0]
+
+
+def refresh_shortcut_tree(folder, prev, suffix, resolve, entry):
+    """
+    Walk `folder`, re-using the previous listing of any directory whose
+    mtime is unchanged and re-resolving only files ending in `suffix` whose
+    mtime/size moved.  resolve(path) gives a JSON-able value that is cached
+    per file; entry(path, value) turns it into (name, target) or None.
+    Returns (source entry, rescanned?, files touched).
+    """
+    prev = prev or {}
+    prev_dirs, prev_files = prev.get("dirs", {}), prev.get("files", {})
+    dirs, files, touched = {}, {}, 0
+
+    stack = [folder]
+    while stack:
+        d = stack.pop()
+        try:
+            mtime = os.stat(d).st_mtime_ns
+        except OSError:
+            continue
+        old = prev_dirs.get(d)
+        if old and old[0] == mtime:
+            subdirs, names = old[1], old[2]
+        else:
+            subdirs, names = [], []
+            try:
+                with os.scandir(d) as it:
+                    for e in it:
+                        if e.is_dir(follow_symlinks=False):
+                            subdirs.append(e.name)
+                        elif e.name.lower().endswith(suffix):
+                            names.append(e.name)
+            except OSError:
+                continue
+        dirs[d] = [mtime, subdirs, names]
+        stack.extend(os.path.join(d, s) for s in subdirs)
+
+        for fn in names:
+            full = os.path.join(d, fn)
+            try:
+                st = os.stat(full)
+            except OSError:
+                continue
+            cached = prev_files.get(full)
+            if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+                files[full] = cached
+            else:
+                files[full] = [st.st_mtime_ns, st.st_size, resolve(full)]
+                touched += 1
+
+    apps = {}
+    for full in sorted(files):
+        hit = entry(full, files[full][2])
+        if hit:
+            apps[hit[0]] = hit[1]
+    changed = bool(touched) or files.keys() != prev_files.keys()
+    return {"dirs": dirs, "files": files, "apps": apps}, changed, touched
+
+
+def refresh_start_menu(folder, prev):
+    """Start Menu .lnk files, named after the shortcut file."""
+    return refresh_shortcut_tree(folder, prev, ".lnk", resolve_target,
+                                 lambda full, target: (_shortcut_name(full), target) if target else None)
+
+
+def scan_start_menu_folder(folder_path):
+    return refresh_start_menu(folder_path, None)[0]["apps"]
+
+
+# ─── Index state ─────────────────────────────────────────────────────────
+
+def apps_from_state(state):
+    """Merged {name: exe} from an index state (or a pre-v2 flat index)."""
+    if state.get("version") != INDEX_VERSION:
+        return dict(state)
+    apps = {}
+    for src in state["order"]:
+        apps.update(state["sources"].get(src, {}).get("apps", {}))
+    return apps
+
+
+def default_sources():
+    """[(source id, refresh fn, args)] for the registry and Start Menu; fn(*args, prev)."""
+    sources = [(sid, refresh_registry, (hive, flag)) for sid, hive, flag in registry_sources()]
+    sources += [(f"startmenu:{folder}", refresh_start_menu, (folder,)) for folder in start_menu_folders()]
+    return sources
+
+
+def refresh_app_state(prev_state=None, max_workers=4, sources=None):
+    """
+    Re-scan only the sources whose fingerprint changed.  `sources` defaults
+    to default_sources(); other platforms pass their own (platforms/).
+    Returns (new state, stats) where stats has added/removed/changed entry
+    counts, files_touched, sources_rescanned and elapsed_ms.
+    """
+    t0 = time.perf_counter()
+    prev_state = prev_state or {}
+    prev_sources = prev_state.get("sources", {}) if prev_state.get("version") == INDEX_VERSION else {}
+
+    jobs = [(sid, fn, args + (prev_sources.get(sid),))
+            for sid, fn, args in (default_sources() if sources is None else sources)]
+
+    sources, rescanned, touched = {}, 0, 0
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = [(sid, pool.submit(fn, *args)) for sid, fn, args in jobs]
+        for sid, f in futures:
+            sources[sid], changed, files = f.result()
+            rescanned += changed
+            touched += files
+
+    state = {"version": INDEX_VERSION, "order": [sid for sid, _, _ in jobs], "sources": sources}
+    old_apps, new_apps = apps_from_state(prev_state), apps_from_state(state)
+    stats = {
+        "added":   sum(1 for k in new_apps if k not in old_apps),
+        "removed": sum(1 for k in old_apps if k not in new_apps),
+        "changed": sum(1 for k in new_apps if k in old_apps and old_apps[k] != new_apps[k]),
+        "files_touched": touched,
+        "sources_rescanned": rescanned,
+        "elapsed_ms": (time.perf_counter() - t0) * 1e3,
+    }
+    return state, stats
+
+
+def scan_installed_apps(max_workers=4):
+    return apps_from_state(refresh_app_state(None, max_workers)[0])
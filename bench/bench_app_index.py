@@ -0,0 +1,124 @@
+# bench/bench_app_index.py
+
+"""
+Lookup latency of AppNameIndex vs difflib.get_close_matches on synthetic
+app indexes, plus agreement on a regression corpus of spoken targets:
+exact names, one to three typos, shuffled words, names behind a filler
+word ("to X", "the X"), partial names and unrelated words.  Agreement
+has to be 100%: the index is exact, not a heuristic.
+
+    python bench/bench_app_index.py [--sizes 100 1000 10000] [--queries 1000]
+"""
+
+import argparse
+import difflib
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app_index import AppNameIndex  # noqa: E402
+
+REAL = [
+    "google chrome", "discord", "spotify", "steam", "notepad++", "visual studio code",
+    "mozilla firefox", "vlc media player", "obs studio", "microsoft edge", "7-zip",
+    "microsoft teams", "zoom", "telegram desktop", "viber", "epic games launcher",
+]
+SYLL = ["micro", "soft", "adobe", "vid", "play", "er", "tool", "kit", "studio",
+        "cloud", "net", "sync", "box", "photo", "shop", "data", "lab", "link"]
+
+
+def synthetic_apps(n, seed=1):
+    rnd = random.Random(seed)
+    names = set(REAL)
+    while len(names) < n:
+        words = ["".join(rnd.sample(SYLL, rnd.randint(1, 3))) for _ in range(rnd.randint(1, 3))]
+        if rnd.random() < 0.3:
+            words.append(str(rnd.randint(1, 2024)))
+        names.add(" ".join(words))
+    return sorted(names)
+
+
+def typo(s, rnd):
+    if len(s) < 3:
+        return s
+    i = rnd.randrange(len(s))
+    op = rnd.choice("dsi")
+    if op == "d":
+        return s[:i] + s[i + 1:]
+    if op == "s":
+        return s[:i] + rnd.choice("abcdefghijklmnopqrstuvwxyz") + s[i + 1:]
+    return s[:i] + rnd.choice("abcdefghijklmnopqrstuvwxyz") + s[i:]
+
+
+def shuffled(s, rnd):
+    words = s.split()
+    rnd.shuffle(words)
+    return " ".join(words)
+
+
+KINDS = {
+    "exact":    lambda name, rnd: name,
+    "1 typo":   lambda name, rnd: typo(name, rnd),
+    "2 typos":  lambda name, rnd: typo(typo(name, rnd), rnd),
+    "3 typos":  lambda name, rnd: typo(typo(typo(name, rnd), rnd), rnd),
+    "shuffled": lambda name, rnd: typo(shuffled(name, rnd), rnd) if rnd.random() < 0.5 else shuffled(name, rnd),
+    "to X":     lambda name, rnd: rnd.choice(["to ", "the ", "my "]) + typo(name, rnd),
+    "partial":  lambda name, rnd: name.split()[0],
+    "other":    lambda name, rnd: rnd.choice(["времето", "hello", "музика", "the", "calculator", "ок"]),
+}
+
+
+def regression_corpus(names, k, seed=2):
+    """[(kind, query)] with the kinds in equal shares."""
+    rnd = random.Random(seed)
+    kinds = list(KINDS)
+    out = []
+    for j in range(k):
+        kind = kinds[j % len(kinds)]
+        out.append((kind, KINDS[kind](rnd.choice(names), rnd)))
+    return out
+
+
+def timed(fn, queries):
+    t0 = time.perf_counter()
+    res = [fn(q) for q in queries]
+    return res, (time.perf_counter() - t0) / len(queries) * 1e6
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    ap.add_argument("--queries", type=int, default=1000)
+    args = ap.parse_args()
+
+    print(f"{'apps':>7} {'build ms':>9} {'difflib µs':>11} {'index µs':>9} {'speedup':>8} {'agree':>7}")
+    disagree = {}
+    for n in args.sizes:
+        names = synthetic_apps(n)
+        t0 = time.perf_counter()
+        idx = AppNameIndex(names)
+        idx.close_matches("warm up")            # builds the character matrix
+        build_ms = (time.perf_counter() - t0) * 1e3
+
+        corpus = regression_corpus(names, args.queries)
+        queries = [q for _, q in corpus]
+        ref, ref_us = timed(lambda q: difflib.get_close_matches(q, names, n=1, cutoff=0.6), queries)
+        got, idx_us = timed(lambda q: idx.close_matches(q, n=1, cutoff=0.6), queries)
+        agree = sum(a == b for a, b in zip(ref, got)) / len(queries)
+        for (kind, q), a, b in zip(corpus, ref, got):
+            if a != b:
+                disagree.setdefault(kind, []).append((n, q, a, b))
+        print(f"{n:>7} {build_ms:>9.1f} {ref_us:>11.1f} {idx_us:>9.1f} {ref_us / idx_us:>7.1f}x {agree:>7.1%}")
+        top3 = [idx.close_matches(q, n=3, cutoff=0.5) == difflib.get_close_matches(q, names, n=3, cutoff=0.5)
+                for q in queries[:200]]
+        assert all(top3), "top-3 lists differ from difflib"
+    print(f"  query kinds: {', '.join(KINDS)} ({args.queries // len(KINDS)} each)")
+    for kind, rows in disagree.items():
+        print(f"  {kind}: {len(rows)} disagreements, e.g. {rows[0]}")
+    assert not disagree, "the index must agree with difflib"
+
+if __name__ == "__main__":
+    main()
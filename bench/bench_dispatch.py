@@ -0,0 +1,139 @@
+# bench/bench_dispatch.py
+
+"""
+Replay recorded transcripts through the command dispatcher and report
+per-utterance latency.  Handlers are no-ops so only routing is measured.
+
+The phrases and verbs are those VoiceAssistantApp._build_commands
+registers (built once on the fake platform), so the bench follows the
+real registry; the previous if-chain is replayed over the same tables.
+
+    python bench/bench_dispatch.py [--n 5000]
+"""
+
+import argparse
+import contextlib
+import difflib
+import functools
+import io
+import os
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from commands import CommandRegistry  # noqa: E402
+
+HERE = Path(__file__).parent
+
+
+@functools.lru_cache(maxsize=None)
+def app_registry():
+    """The CommandRegistry the app builds, with its real handlers (fake platform unless set)."""
+    os.environ.setdefault("VA_PLATFORM", "fake")
+    import voice_assistant_new_ui as va
+    app = va.VoiceAssistantApp.__new__(va.VoiceAssistantApp)
+    app.typing_mode = False
+    app.media_player = app.music_folder = ""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return app._build_commands()
+
+
+def exact_phrases():
+    """{label: (phrases)} the app registers as exact phrases."""
+    return {label: tuple(ps) for label, ps in app_registry().exact_phrases().items()}
+
+
+def load_transcripts():
+    lines = (HERE / "transcripts.txt").read_text(encoding="utf-8").splitlines()
+    return [l for l in lines if l.strip() and not l.startswith("#")]
+
+
+def synthetic_apps(n=300):
+    rnd = random.Random(1)
+    base = ["google chrome", "discord", "spotify", "steam", "notepad", "visual studio code"]
+    syll = ["micro", "soft", "adobe", "vid", "play", "er", "tool", "kit", "studio", "cloud"]
+    names = list(base)
+    while len(names) < n:
+        names.append(" ".join("".join(rnd.sample(syll, 2)) for _ in range(rnd.randint(1, 3))))
+    return names
+
+
+def build_registry(apps):
+    """The app's routes with no-op handlers; open/close/switch fuzzy-match `apps` like the app."""
+    def system(action, rest):
+        if not rest:
+            return False
+        return bool(difflib.get_close_matches(rest, apps, n=1, cutoff=0.6))
+
+    reg = CommandRegistry()
+    noop = lambda *a: None
+    for label, phrases in exact_phrases().items():
+        reg.add_exact(phrases, noop, label)
+    for verb, label in app_registry().prefix_verbs().items():
+        if label in ("open", "close", "switch"):
+            reg.add_prefix(verb, lambda rest, a=label: system(a, rest), label)
+        else:
+            reg.add_prefix(verb, noop, label)
+    return reg
+
+
+def legacy_dispatch(lower, apps, exact, verbs):
+    """The previous if-chain, kept here only as a baseline."""
+    for phrases in exact.values():
+        if lower in phrases:
+            return True
+    words = lower.split()
+    if words and words[0] in verbs:
+        if verbs[words[0]] == "play":
+            return True
+        if difflib.get_close_matches(" ".join(words[1:]), apps, n=1, cutoff=0.6):
+            return True
+    if lower.startswith("play "):
+        return True
+    if len(words) >= 2:
+        difflib.get_close_matches(" ".join(words[1:]), apps, n=1, cutoff=0.6)
+    return False
+
+
+def run(fn, corpus):
+    lat = []
+    for t in corpus:
+        t0 = time.perf_counter()
+        fn(t)
+        lat.append((time.perf_counter() - t0) * 1e6)
+    lat.sort()
+    return {
+        "mean_us": statistics.fmean(lat),
+        "p50_us": lat[len(lat) // 2],
+        "p95_us": lat[int(len(lat) * 0.95)],
+        "p99_us": lat[int(len(lat) * 0.99)],
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--n", type=int, default=5000, help="utterances to replay")
+    ap.add_argument("--apps", type=int, default=300, help="synthetic app index size")
+    args = ap.parse_args()
+
+    rnd = random.Random(0)
+    transcripts = [t.lower().strip() for t in load_transcripts()]
+    corpus = [rnd.choice(transcripts) for _ in range(args.n)]
+    apps = synthetic_apps(args.apps)
+    reg = build_registry(apps)
+    exact = exact_phrases()
+    verbs = {v: label for v, label in app_registry().prefix_verbs().items() if " " not in v}
+
+    print(f"{len(corpus)} utterances, {len(reg)} registered commands, {len(apps)} apps")
+    for name, fn in (("registry", reg.dispatch), ("legacy", lambda t: legacy_dispatch(t, apps, exact, verbs))):
+        r = run(fn, corpus)
+        print(f"{name:>9}: mean {r['mean_us']:8.1f} µs  p50 {r['p50_us']:8.1f}  "
+              f"p95 {r['p95_us']:8.1f}  p99 {r['p99_us']:8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+# bench/bench_gif.py
+
+"""
+The animated dog: start-up cost of getting its frames and how often the
+animation wakes the Tk loop.
+
+Start-up compares decoding + LANCZOS-resizing every frame (what __init__
+used to do) with gif_frames.load_frames from its on-disk cache and from
+the shared in-memory copy.  Wake-ups run GifAnimator on a simulated Tk
+root with a virtual clock through ten minutes of use: active, idle,
+minimized, restored.  The old loop re-armed after(100) forever, which
+is 600 wake-ups a minute whatever the window was doing.
+
+    python bench/bench_gif.py [--gif annoying_dog.gif] [--size 80] [--runs 20]
+"""
+
+import argparse
+import heapq
+import itertools
+import sys
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import gif_frames  # noqa: E402
+from gif_frames import GifAnimator, decode, load_frames  # noqa: E402
+
+
+class SimRoot:
+    """The after()/bind() part of a Tk root, on a virtual clock."""
+
+    def __init__(self):
+        self.now = 0.0
+        self._queue, self._ids, self._cancelled = [], itertools.count(), set()
+        self._bindings = {}
+
+    def after(self, ms, fn):
+        job = next(self._ids)
+        heapq.heappush(self._queue, (self.now + ms / 1e3, job, fn))
+        return job
+
+    def after_cancel(self, job):
+        self._cancelled.add(job)
+
+    def bind(self, sequence, fn, add=None):
+        self._bindings.setdefault(sequence, []).append(fn)
+
+    def fire(self, sequence):
+        for fn in self._bindings.get(sequence, []):
+            fn(SimpleNamespace(widget=self))
+
+    def run_until(self, t):
+        while self._queue and self._queue[0][0] <= t:
+            self.now, job, fn = heapq.heappop(self._queue)
+            if job not in self._cancelled:
+                fn()
+        self.now = t
+
+
+class SimLabel:
+    def __init__(self):
+        self.shown = []
+
+    def config(self, image):
+        self.shown.append(image)
+
+
+def best_ms(fn, runs):
+    best = float("inf")
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1e3
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--gif", default=str(ROOT / "annoying_dog.gif"))
+    ap.add_argument("--size", type=int, default=80)
+    ap.add_argument("--runs", type=int, default=20)
+    args = ap.parse_args()
+    size = (args.size, args.size)
+
+    # ── start-up ─────────────────────────────────────────────────
+    with tempfile.TemporaryDirectory() as cache:
+        old = best_ms(lambda: decode(args.gif, size), args.runs)
+
+        def cold():
+            gif_frames._loaded.clear()
+            for f in Path(cache).glob("*.frames"):
+                f.unlink()
+            return load_frames(args.gif, size, cache)
+
+        def warm():
+            gif_frames._loaded.clear()          # a new process: only the disk cache is left
+            return load_frames(args.gif, size, cache)
+        miss, hit = best_ms(cold, args.runs), best_ms(warm, args.runs)
+        shared = best_ms(lambda: load_frames(args.gif, size, cache), args.runs)
+        frames = warm()
+        assert [(img.tobytes(), ms) for img, ms in frames] == \
+            [(img.tobytes(), ms) for img, ms in decode(args.gif, size)]
+        on_disk = sum(f.stat().st_size for f in Path(cache).glob("*.frames"))
+    durations = [ms for _, ms in frames]
+    print(f"{Path(args.gif).name}: {len(frames)} frames → {size[0]}x{size[1]}, durations {durations} ms, "
+          f"{on_disk / 1024:.0f} KiB cached")
+    print(f"  decode + resize (old)       {old:8.2f} ms")
+    print(f"  first run (decode + write)  {miss:8.2f} ms")
+    print(f"  disk cache hit              {hit:8.2f} ms   saves {old - hit:.2f} ms per start")
+    print(f"  shared in-memory hit        {shared:8.3f} ms")
+
+    # ── wake-ups ─────────────────────────────────────────────────
+    root, label = SimRoot(), SimLabel()
+    dog = GifAnimator(root, label, list(range(len(frames))), durations, idle_s=60.0,
+                      clock=lambda: root.now).start()
+    phases = []
+
+    def phase(name, until, action=None):
+        if action:
+            action()
+        start, t0 = dog.wakeups, root.now
+        root.run_until(until)
+        phases.append((name, (dog.wakeups - start) / ((until - t0) / 60)))
+
+    phase("active (phrases)", 60.0, dog.poke)
+    phase("idle", 180.0)
+    phase("active again", 210.0, dog.poke)
+    phase("minimized", 420.0, lambda: root.fire("<Unmap>"))
+    phase("restored, then idle", 600.0, lambda: root.fire("<Map>"))
+    print(f"  wake-ups per minute (old: {60_000 // 100} in every phase)")
+    for name, rate in phases:
+        print(f"    {name:<22} {rate:8.1f}")
+    total = dog.wakeups / 10
+    print(f"    {'over the ten minutes':<22} {total:8.1f}")
+    assert not dog.running
+    assert abs(phases[0][1] - 60_000 / (sum(durations) / len(durations))) < 2
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+# bench/bench_intents.py
+
+"""
+Accuracy and latency of the embedding intent classifier (intents.py).
+
+Held-out paraphrases (never used as examples) measure recall, the
+recorded transcripts that are not argument-free commands measure false
+accepts, and a corpus of thousands of transcripts is classified both one
+at a time (as dispatch does) and in batches.
+
+    python bench/bench_intents.py [--n 5000] [--batch 256]
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import intents  # noqa: E402
+import model_engine  # noqa: E402
+from bench_dispatch import build_registry, exact_phrases, load_transcripts, synthetic_apps  # noqa: E402
+
+HELD_OUT = [
+    ("volume.up", "turn the volume up"), ("volume.up", "make it louder"), ("volume.up", "малко по-силно"),
+    ("volume.up", "up the volume a bit"), ("volume.up", "усили малко"),
+    ("volume.down", "turn volume down"), ("volume.down", "make it quieter"), ("volume.down", "малко по-тихо"),
+    ("volume.down", "намали малко"),
+    ("volume.mute", "mute it"), ("volume.mute", "заглуши звука"),
+    ("volume.unmute", "unmute the sound"), ("volume.unmute", "върни звука моля"),
+    ("media.pause", "pause music"), ("media.pause", "сложи на пауза"),
+    ("media.play", "resume music"), ("media.play", "продължи песента"),
+    ("media.next", "skip the song"), ("media.next", "next one"), ("media.next", "следваща"),
+    ("media.previous", "previous one"), ("media.previous", "предишната песен"),
+    ("media.stop", "stop the song"), ("media.stop", "спри музиката моля"),
+]
+
+
+def make_classifier(model, threshold=intents.THRESHOLD):
+    clf = intents.IntentClassifier(model, threshold=threshold)
+    for label, phrases in exact_phrases().items():
+        clf.add(label, phrases)
+    for label, phrases in intents.EXAMPLES.items():
+        clf.add(label, phrases)
+    return clf.build()
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--n", type=int, default=5000, help="transcripts to classify")
+    ap.add_argument("--batch", type=int, default=256)
+    args = ap.parse_args()
+
+    model = model_engine.load_model()
+    exact = {p for ps in exact_phrases().values() for p in ps}
+    negatives = [t.lower() for t in load_transcripts() if t.lower() not in exact]
+    clf = make_classifier(model)
+    print(f"{len(clf)} prototype phrases, {len(HELD_OUT)} held-out paraphrases, "
+          f"{len(negatives)} non-command transcripts")
+
+    print(f"\n{'threshold':>9}{'recall':>9}{'wrong':>8}{'false accepts':>15}")
+    for th in (0.70, 0.74, 0.78, 0.82, 0.86):
+        clf.threshold = th
+        got = clf.classify([t for _, t in HELD_OUT])
+        hit = sum(g == l for (l, _), (g, _) in zip(HELD_OUT, got))
+        wrong = sum(g is not None and g != l for (l, _), (g, _) in zip(HELD_OUT, got))
+        fa = sum(g is not None for g, _ in clf.classify(negatives))
+        mark = " ←" if th == intents.THRESHOLD else ""
+        print(f"{th:>9.2f}{hit / len(HELD_OUT):>9.0%}{wrong:>8d}{fa:>9d}/{len(negatives)}{mark}")
+    clf.threshold = intents.THRESHOLD
+
+    rnd = random.Random(0)
+    pool = [t.lower() for t in load_transcripts()] + [t for _, t in HELD_OUT]
+    corpus = [rnd.choice(pool) for _ in range(args.n)]
+
+    lat = []
+    for t in corpus:
+        t0 = time.perf_counter()
+        clf.classify_one(t)
+        lat.append((time.perf_counter() - t0) * 1e6)
+    lat.sort()
+    t0 = time.perf_counter()
+    for i in range(0, len(corpus), args.batch):
+        clf.classify(corpus[i:i + args.batch])
+    batched = (time.perf_counter() - t0) / len(corpus) * 1e6
+
+    reg = build_registry(synthetic_apps())
+    reg.set_intents(make_classifier(model))
+    t0 = time.perf_counter()
+    for t in corpus:
+        reg.dispatch(t)
+    dispatch = (time.perf_counter() - t0) / len(corpus) * 1e6
+
+    print(f"\n{len(corpus)} transcripts")
+    print(f"  single:   mean {np.mean(lat):7.1f} µs  p50 {lat[len(lat) // 2]:7.1f}  "
+          f"p95 {lat[int(len(lat) * 0.95)]:7.1f}  p99 {lat[int(len(lat) * 0.99)]:7.1f}")
+    print(f"  batch {args.batch}: {batched:7.1f} µs per transcript")
+    print(f"  full dispatch with intents: {dispatch:7.1f} µs per transcript")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+# bench/bench_kws.py
+
+"""
+Accuracy and CPU cost of the on-device keyword spotter (kws.py).
+
+The fixture corpus is synthesized deterministically: every "word" is a
+fixed sequence of voiced (formant-shaped harmonics) and unvoiced (noise)
+segments, and each rendition varies tempo, pitch, loudness and background
+noise.  Templates are enrolled from a few renditions; the rest are
+classified.  Distractors are words that were never enrolled, half of
+them a command with one segment swapped; other words, as the app would
+hear them in ordinary speech, fill the garbage model (kws.OTHER).
+
+False accepts are also counted under the old rule (no garbage model,
+1.35 × spread, only the other commands to lose to).  The single-command
+run is the worst case for it: one command enrolled, nothing to lose to.
+
+    python bench/bench_kws.py [--enroll 4] [--tests 30] [--distractors 10] [--other 12]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import kws  # noqa: E402
+from bench_vad import Clip  # noqa: E402
+
+RATE = 16000
+COMMANDS = ["volume up", "volume down", "pause", "next", "previous"]
+
+
+def make_word(rnd):
+    """A word = list of (kind, seconds, f1, f2)."""
+    segs = []
+    for _ in range(rnd.integers(3, 6)):
+        if rnd.random() < 0.25:
+            segs.append(("noise", rnd.uniform(0.05, 0.12), rnd.uniform(2000, 6000), 0))
+        else:
+            segs.append(("voiced", rnd.uniform(0.08, 0.2), rnd.uniform(250, 850), rnd.uniform(800, 2500)))
+    return segs
+
+
+def near(word, rnd):
+    """`word` with one segment replaced: a different phrase that sounds close."""
+    i = rnd.integers(len(word))
+    return word[:i] + make_word(rnd)[:1] + word[i + 1:]
+
+
+def render(word, rnd):
+    f0 = rnd.uniform(100, 220)
+    tempo = rnd.uniform(0.85, 1.15)
+    out = [np.zeros(int(rnd.uniform(0.02, 0.08) * RATE))]
+    for kind, dur, f1, f2 in word:
+        n = int(dur * tempo * rnd.uniform(0.9, 1.1) * RATE)
+        t = np.arange(n) / RATE
+        if kind == "noise":
+            spec = np.fft.rfft(rnd.normal(0, 1, n))
+            freqs = np.fft.rfftfreq(n, 1 / RATE)
+            spec *= np.exp(-((freqs - f1) / 1500) ** 2)
+            seg = np.fft.irfft(spec, n) * 0.5
+        else:
+            seg = np.zeros(n)
+            for k in range(1, int(4000 / f0)):
+                fk = k * f0
+                gain = np.exp(-((fk - f1) / 150) ** 2) + 0.6 * np.exp(-((fk - f2) / 200) ** 2) + 0.02
+                seg += gain * np.sin(2 * np.pi * fk * t + rnd.uniform(0, 6.3))
+        env = np.minimum(1, np.minimum(t, t[::-1]) * 80) if n else t
+        out.append(seg * env / (np.abs(seg).max() + 1e-9) * 0.3 * rnd.uniform(0.6, 1.4))
+    out.append(np.zeros(int(rnd.uniform(0.02, 0.08) * RATE)))
+    x = np.concatenate(out)
+    return x + rnd.normal(0, 0.003, len(x))
+
+
+def clip(x):
+    return Clip((np.clip(x, -1, 1) * 32767).astype("<i2").tobytes(), RATE, 2)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--enroll", type=int, default=kws.MIN_COMMAND_TEMPLATES, help="templates per word")
+    ap.add_argument("--tests", type=int, default=30, help="test renditions per word")
+    ap.add_argument("--distractors", type=int, default=10)
+    ap.add_argument("--other", type=int, default=12, help="non-command utterances in the garbage model")
+    args = ap.parse_args()
+
+    rnd = np.random.default_rng(7)
+    words = {label: make_word(rnd) for label in [kws.WAKE] + COMMANDS}
+    distractors = [make_word(rnd) if i % 2 else near(words[COMMANDS[i // 2 % len(COMMANDS)]], rnd)
+                   for i in range(args.distractors)]
+    other = [make_word(rnd) for _ in range(args.other)]
+
+    spotter = kws.KeywordSpotter()
+    for label, word in words.items():
+        for _ in range(args.enroll):
+            spotter.enroll(label, clip(render(word, rnd)), save=False)
+    for word in other:
+        spotter.enroll(kws.OTHER, clip(render(word, rnd)), save=False)
+
+    # direct commands
+    correct = wrong = missed = false_accept = 0
+    cpu, audio_s = 0.0, 0.0
+    for label in COMMANDS:
+        for _ in range(args.tests):
+            x = render(words[label], rnd)
+            t0 = time.process_time()
+            got = spotter.match_command(clip(x))
+            cpu += time.process_time() - t0
+            audio_s += len(x) / RATE
+            correct += got == label
+            wrong += got not in (None, label)
+            missed += got is None
+    n_distractor = old_accept = 0
+    for word in distractors:
+        for _ in range(max(1, args.tests // 3)):
+            x = clip(render(word, rnd))
+            false_accept += spotter.match_command(x) is not None
+            old_accept += spotter.classify(kws.mfcc(*kws.audio_samples(x)), COMMANDS)[0] is not None
+            n_distractor += 1
+
+    # wake word: "wake + command" should be spotted, bare commands should not
+    wake_hit = wake_fa = 0
+    for _ in range(args.tests):
+        label = COMMANDS[rnd.integers(len(COMMANDS))]
+        wake_hit += spotter.spot_wake(clip(np.concatenate(
+            [render(words[kws.WAKE], rnd), render(words[label], rnd)]))) is not None
+        wake_fa += spotter.spot_wake(clip(render(words[label], rnd))) is not None
+
+    # one command enrolled: the garbage model is its only competitor
+    single = kws.KeywordSpotter()
+    for _ in range(args.enroll):
+        single.enroll(COMMANDS[0], clip(render(words[COMMANDS[0]], rnd)), save=False)
+    for word in other:
+        single.enroll(kws.OTHER, clip(render(word, rnd)), save=False)
+    single_hit = single_fa = old_fa = 0
+    for _ in range(args.tests):
+        single_hit += single.match_command(clip(render(words[COMMANDS[0]], rnd))) == COMMANDS[0]
+    for word in distractors + [words[l] for l in COMMANDS[1:]]:
+        for _ in range(max(1, args.tests // 3)):
+            x = clip(render(word, rnd))
+            single_fa += single.match_command(x) is not None
+            old_fa += single.classify(kws.mfcc(*kws.audio_samples(x)), [COMMANDS[0]])[0] is not None
+    n_single = (len(distractors) + len(COMMANDS) - 1) * max(1, args.tests // 3)
+
+    n = len(COMMANDS) * args.tests
+    print(f"direct commands ({len(COMMANDS)} labels, {args.enroll} templates each, {n} tests)")
+    print(f"  accuracy        : {correct / n:.1%}  (wrong label {wrong}, fell back to cloud {missed})")
+    print(f"  false accepts   : {false_accept}/{n_distractor} distractor phrases "
+          f"(old rule: {old_accept})")
+    print(f"  CPU             : {cpu / n * 1e3:.1f} ms per phrase, RTF {cpu / audio_s:.3f}")
+    print(f"single command ({args.enroll} templates, garbage model of {args.other})")
+    print(f"  detected        : {single_hit}/{args.tests}")
+    print(f"  false accepts   : {single_fa}/{n_single} other phrases (old rule: {old_fa})")
+    print("wake word")
+    print(f"  detected        : {wake_hit}/{args.tests}")
+    print(f"  false triggers  : {wake_fa}/{args.tests}")
+
+
+if __name__ == "__main__":
+    main()
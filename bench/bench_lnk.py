@@ -0,0 +1,195 @@
+# bench/bench_lnk.py
+
+"""
+Checks lnk.py against the fixture shortcuts in bench/fixtures/lnk and
+compares in-process parsing with the old one-powershell-per-shortcut path.
+
+The subprocess cost model is: measured process spawn (a bare interpreter,
+the cheapest possible child) + --ps-startup-ms of PowerShell/COM start-up.
+
+    python bench/bench_lnk.py [--shortcuts 400] [--ps-startup-ms 250]
+    python bench/bench_lnk.py --write-fixtures
+"""
+
+import argparse
+import json
+import os
+import struct
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import lnk  # noqa: E402
+
+FIXTURES = Path(__file__).parent / "fixtures" / "lnk"
+
+
+# ─── Minimal .lnk writer (spec layout, used to produce the fixtures) ─────
+
+def _header(flags):
+    return (struct.pack("<I", 0x4C) + lnk.LINK_CLSID + struct.pack("<II", flags, 0x20)
+            + b"\0" * 24 + struct.pack("<IiIHHII", 0, 0, 1, 0, 0, 0, 0))
+
+
+def _link_info_local(path, unicode_path=False):
+    base = path.encode("cp1252", "replace") + b"\0"
+    volume = struct.pack("<IIII", 0x11, 3, 0x1234ABCD, 0x10) + b"\0"
+    hdr_size = 0x24 if unicode_path else 0x1C
+    vol_off = hdr_size
+    base_off = vol_off + len(volume)
+    suffix_off = base_off + len(base)
+    body = volume + base + b"\0"
+    uni = b""
+    if unicode_path:
+        uni_base = suffix_off + 1
+        wide = path.encode("utf-16-le") + b"\0\0"
+        uni = struct.pack("<II", uni_base, uni_base + len(wide))
+        body += wide + b"\0\0"
+    size = hdr_size + len(body)
+    return struct.pack("<7I", size, hdr_size, lnk.VOLUME_ID_AND_LOCAL_BASE_PATH,
+                       vol_off, base_off, 0, suffix_off) + uni + body
+
+
+def _link_info_network(share, suffix):
+    net_name = share.encode("cp1252") + b"\0"
+    cnrl = struct.pack("<5I", 0x14 + len(net_name), 0x2, 0x14, 0, 0x00020000) + net_name
+    hdr_size = 0x1C
+    net_off = hdr_size
+    suffix_off = net_off + len(cnrl)
+    body = cnrl + suffix.encode("cp1252") + b"\0"
+    return struct.pack("<7I", hdr_size + len(body), hdr_size, lnk.COMMON_NETWORK_RELATIVE_LINK,
+                       0, 0, net_off, suffix_off) + body
+
+
+def _string(s):
+    return struct.pack("<H", len(s)) + s.encode("utf-16-le")
+
+
+def _id_list(drive, names):
+    items = [struct.pack("<H", 20) + b"\x1f\x50" + bytes.fromhex("e04fd020ea3a6910a2d808002b30309d")]
+    vol = b"\x2f" + drive.encode("ascii") + b"\0" * (20 - len(drive))
+    items.append(struct.pack("<H", 2 + len(vol)) + vol)
+    for name in names:
+        short = name[:8].upper().encode("ascii", "replace") + b"\0"
+        if len(short) % 2:
+            short += b"\0"
+        wide = name.encode("utf-16-le") + b"\0\0"
+        ext = struct.pack("<HHI", 0, 9, 0xBEEF0004) + b"\0" * 8 + struct.pack("<H", 0x2E)
+        ext += b"\0" * 2 + b"\0" * 8 + b"\0" * 8 + struct.pack("<H", 0) + b"\0" * 4 + wide + b"\0\0"
+        ext = struct.pack("<H", len(ext)) + ext[2:]
+        body = b"\x32\0" + struct.pack("<I", 0) + b"\0" * 4 + struct.pack("<H", 0x20) + short + ext
+        items.append(struct.pack("<H", 2 + len(body)) + body)
+    data = b"".join(items) + b"\0\0"
+    return struct.pack("<H", len(data)) + data
+
+
+def _env_block(target):
+    ansi = target.encode("cp1252").ljust(260, b"\0")
+    wide = target.encode("utf-16-le").ljust(520, b"\0")
+    return struct.pack("<II", 0x314, lnk.ENV_BLOCK_SIGNATURE) + ansi + wide
+
+
+def build_fixtures():
+    F = lnk
+    return {
+        "local_ansi.lnk": (
+            _header(F.HAS_LINK_INFO | F.HAS_NAME | F.IS_UNICODE)
+            + _link_info_local(r"C:\Program Files\Google\Chrome\Application\chrome.exe")
+            + _string("Google Chrome") + b"\0" * 4,
+            r"C:\Program Files\Google\Chrome\Application\chrome.exe"),
+        "local_unicode.lnk": (
+            _header(F.HAS_LINK_INFO | F.HAS_ARGUMENTS | F.IS_UNICODE)
+            + _link_info_local(r"C:\Програми\Плейър\player.exe", unicode_path=True)
+            + _string("--minimized") + b"\0" * 4,
+            r"C:\Програми\Плейър\player.exe"),
+        "id_list_only.lnk": (
+            _header(F.HAS_ID_LIST | F.IS_UNICODE)
+            + _id_list("C:\\", ["Program Files", "Discord", "Update.exe"]) + b"\0" * 4,
+            r"C:\Program Files\Discord\Update.exe"),
+        "network.lnk": (
+            _header(F.HAS_LINK_INFO | F.IS_UNICODE)
+            + _link_info_network(r"\\server\apps", r"tools\putty.exe") + b"\0" * 4,
+            r"\\server\apps\tools\putty.exe"),
+        "env_block.lnk": (
+            _header(F.IS_UNICODE) + _env_block(r"%SystemRoot%\notepad.exe") + b"\0" * 4,
+            None),
+        "relative_only.lnk": (
+            _header(F.HAS_RELATIVE_PATH | F.IS_UNICODE)
+            + _string(r"..\Tools\app.exe") + b"\0" * 4,
+            None),
+        "not_a_link.lnk": (b"this is not a shell link", ""),
+    }
+
+
+def write_fixtures():
+    FIXTURES.mkdir(parents=True, exist_ok=True)
+    expected = {}
+    for name, (data, target) in build_fixtures().items():
+        (FIXTURES / name).write_bytes(data)
+        if target is not None:
+            expected[name] = target
+    (FIXTURES / "expected.json").write_text(json.dumps(expected, indent=2, ensure_ascii=False),
+                                            encoding="utf-8")
+    print(f"wrote {len(expected)} fixtures to {FIXTURES}")
+
+
+def check_fixtures():
+    expected = json.loads((FIXTURES / "expected.json").read_text(encoding="utf-8"))
+    failed = 0
+    for name, want in expected.items():
+        got = lnk.resolve_target(FIXTURES / name)
+        ok = got == want
+        failed += not ok
+        print(f"  {'ok ' if ok else 'BAD'} {name:<20} {got!r}")
+    os.environ.setdefault("SystemRoot", r"C:\Windows")
+    want = os.environ["SystemRoot"] + "\\notepad.exe"
+    got = lnk.resolve_target(FIXTURES / "env_block.lnk")
+    failed += got != want
+    print(f"  {'ok ' if got == want else 'BAD'} {'env_block.lnk':<20} {got!r}")
+    return failed
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--shortcuts", type=int, default=400, help="simulated Start Menu size")
+    ap.add_argument("--ps-startup-ms", type=float, default=250.0)
+    ap.add_argument("--write-fixtures", action="store_true")
+    args = ap.parse_args()
+
+    if args.write_fixtures:
+        write_fixtures()
+        return
+
+    print("fixtures:")
+    failed = check_fixtures()
+
+    blobs = [d for d, t in build_fixtures().values() if t]
+    with tempfile.TemporaryDirectory() as tmp:
+        for i in range(args.shortcuts):
+            Path(tmp, f"app{i}.lnk").write_bytes(blobs[i % len(blobs)])
+        t0 = time.perf_counter()
+        for fn in os.listdir(tmp):
+            lnk.resolve_target(os.path.join(tmp, fn))
+        parse_ms = (time.perf_counter() - t0) * 1e3
+
+    spawns = 20
+    t0 = time.perf_counter()
+    for _ in range(spawns):
+        subprocess.run([sys.executable, "-c", "pass"], check=True)
+    spawn_ms = (time.perf_counter() - t0) * 1e3 / spawns
+    model_ms = args.shortcuts * (spawn_ms + args.ps_startup_ms)
+
+    print(f"\n{args.shortcuts} shortcuts")
+    print(f"  in-process parse : {parse_ms:10.1f} ms  ({parse_ms / args.shortcuts * 1e3:.1f} µs each)")
+    print(f"  subprocess model : {model_ms:10.1f} ms  ({spawn_ms:.1f} ms spawn + "
+          f"{args.ps_startup_ms:.0f} ms PowerShell each)")
+    print(f"  speedup          : {model_ms / parse_ms:10.0f}x")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
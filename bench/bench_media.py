@@ -0,0 +1,117 @@
+# bench/bench_media.py
+
+"""
+Media commands against the in-memory session manager (platforms/fake.py)
+with simulated WinRT latency: the old controller, which requested the
+manager and the current session before every command and waited on the
+caller's thread, against MediaController, which keeps both cached and
+returns a future at once.  Then checks that session-changed and
+playback/media-properties events keep now_playing() current.
+
+    python bench/bench_media.py [--commands 200] [--request-ms 5] [--call-ms 2]
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from media_control import MediaController  # noqa: E402
+from platforms.fake import FakeMediaSessionManager  # noqa: E402
+
+ACTIONS = ("play_pause", "next", "previous", "play", "pause")
+
+
+def pct(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+def old_command(loop, mgr, action):
+    """What media_control.MediaController did before: everything, blocking, every time."""
+    manager = loop.run_until_complete(mgr.request_async())
+    session = manager.get_current_session()
+    if session:
+        return loop.run_until_complete(getattr(session, MediaController.COMMANDS[action])())
+    return False
+
+
+def wait_for(predicate, timeout=2.0):
+    end = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > end:
+            raise AssertionError("timed out")
+        time.sleep(0.001)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--commands", type=int, default=200)
+    ap.add_argument("--request-ms", type=float, default=5.0, help="session manager request latency")
+    ap.add_argument("--call-ms", type=float, default=2.0, help="latency of each session call")
+    args = ap.parse_args()
+
+    rnd = random.Random(0)
+    actions = [rnd.choice(ACTIONS) for _ in range(args.commands)]
+    log = []
+    mgr = FakeMediaSessionManager(log, latency=args.request_ms / 1e3)
+    mgr.open_session("Spotify.exe", title="Intro", artist="The xx", album="xx", latency=args.call_ms / 1e3)
+
+    # old: the caller waits for request + session + command
+    loop = asyncio.new_event_loop()
+    blocked_old = []
+    for action in actions:
+        t0 = time.perf_counter()
+        old_command(loop, mgr, action)
+        blocked_old.append((time.perf_counter() - t0) * 1e3)
+    loop.close()
+    old_requests, mgr.requests = mgr.requests, 0
+
+    # new: the caller only schedules; the command completes on the controller's loop
+    mc = MediaController(mgr.request_async).start()
+    mc.submit(mc.connect()).result()
+    blocked_new, done_new = [], []
+    for action in actions:
+        t0 = time.perf_counter()
+        future = mc.send(action)
+        t1 = time.perf_counter()
+        assert future.result(timeout=5)
+        blocked_new.append((t1 - t0) * 1e3)
+        done_new.append((time.perf_counter() - t0) * 1e3)
+    print(f"{args.commands} commands, request {args.request_ms} ms, session call {args.call_ms} ms")
+    print(f"  old: caller blocked    p50 {pct(blocked_old, .5):8.3f} ms  p95 {pct(blocked_old, .95):8.3f} ms"
+          f"  ({old_requests} manager requests)")
+    print(f"  new: caller blocked    p50 {pct(blocked_new, .5):8.3f} ms  p95 {pct(blocked_new, .95):8.3f} ms"
+          f"  ({mgr.requests} manager request)")
+    print(f"  new: command done      p50 {pct(done_new, .5):8.3f} ms  p95 {pct(done_new, .95):8.3f} ms")
+    assert mgr.requests == 1
+
+    # events keep now_playing current without polling
+    changes = []
+    mc.on_change(changes.append)
+    spotify = mgr.current
+    spotify.set_track("Crystalised", "The xx", "xx")
+    wait_for(lambda: mc.now_playing() and mc.now_playing().title == "Crystalised")
+    vlc = mgr.open_session("vlc.exe", title="Podcast 12", latency=args.call_ms / 1e3)
+    wait_for(lambda: mc.now_playing().app == "vlc.exe")
+    assert len(spotify.playback_info_changed) == 0, "left session still subscribed"
+    mc.send("play").result(timeout=5)
+    wait_for(lambda: mc.now_playing().status == "playing")
+    assert log[-1] == ("media", "play", "vlc.exe")
+    mgr.close_session(vlc)
+    wait_for(lambda: mc.now_playing().app == "Spotify.exe")
+    mgr.close_session(spotify)
+    wait_for(lambda: mc.now_playing() is None)
+    assert mc.send("next").result(timeout=5) is False
+    print(f"  events: {len(changes)} now-playing changes, {mc.stats['binds']} session binds, "
+          f"{mc.stats['info_updates']} info refreshes, {mgr.requests} manager request")
+    mc.close()
+    assert len(mgr.current_session_changed) == 0
+
+
+if __name__ == "__main__":
+    main()
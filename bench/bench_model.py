@@ -0,0 +1,120 @@
+# bench/bench_model.py
+
+"""
+model_state.json vs model_state.bin, and batched vs per-sample inference.
+
+Load cost is measured in a fresh interpreter per format so RSS numbers are
+not polluted by earlier runs: time to a usable model, RSS growth right
+after loading, and RSS growth after touching every tensor.
+
+    python bench/bench_model.py [--batch 256] [--steps 12]
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import model_engine  # noqa: E402
+import model_format  # noqa: E402
+
+CHILD = r"""
+import json, sys, time
+sys.path.insert(0, {root!r})
+import numpy as np
+
+def rss_kb():
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss // 1024
+    except ImportError:
+        for line in open("/proc/self/status"):
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+
+import model_engine, model_format
+base = rss_kb()
+t0 = time.perf_counter()
+if {kind!r} == "json":
+    model = model_engine.Model(*model_format.tensors_from_json({path!r}))
+else:
+    model = model_engine.Model(*model_format.open_mmap({path!r}))
+load_ms = (time.perf_counter() - t0) * 1e3
+opened = rss_kb()
+model.encode(np.zeros(128)); model.seq2seq([[1, 2, 3]])
+print(json.dumps({{"load_ms": load_ms, "rss_open_kb": opened - base, "rss_used_kb": rss_kb() - base}}))
+"""
+
+
+def measure_load(kind, path, repeat=3):
+    runs = []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "-c", CHILD.format(root=str(ROOT), kind=kind, path=str(path))],
+                             capture_output=True, text=True, check=True).stdout
+        runs.append(json.loads(out))
+    return {k: sorted(r[k] for r in runs)[len(runs) // 2] for k in runs[0]}
+
+
+def throughput(fn, batch, items, repeat=3):
+    """Best-of-`repeat` items/second for fn over `items`, in batches of `batch`."""
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for i in range(0, len(items), batch):
+            fn(items[i:i + batch])
+        best = min(best, time.perf_counter() - t0)
+    return len(items) / best
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--batch", type=int, default=256)
+    ap.add_argument("--samples", type=int, default=2048)
+    ap.add_argument("--steps", type=int, default=12, help="seq2seq sequence length")
+    args = ap.parse_args()
+
+    src = model_engine.MODEL_JSON
+    with tempfile.TemporaryDirectory() as tmp:
+        bins = {}
+        for dtype in ("float32", "float16"):
+            bins[dtype] = Path(tmp) / f"model_{dtype}.bin"
+            model_format.convert(src, bins[dtype], dtype)
+
+        print(f"{'format':<14}{'size':>10}{'load':>11}{'RSS open':>11}{'RSS used':>11}")
+        for label, kind, path in (("json", "json", src),
+                                  ("bin float32", "bin", bins["float32"]),
+                                  ("bin float16", "bin", bins["float16"])):
+            r = measure_load(kind, path)
+            print(f"{label:<14}{path.stat().st_size / 1024:>8.0f}KB{r['load_ms']:>9.2f}ms"
+                  f"{r['rss_open_kb']:>9d}KB{r['rss_used_kb']:>9d}KB")
+
+        ref = model_engine.Model(*model_format.tensors_from_json(src))
+        rnd = np.random.default_rng(0)
+        x = rnd.normal(0, 1, (args.samples, ref.input_dim)).astype(np.float32)
+        tokens = rnd.integers(0, 8, (args.samples // 4, args.steps))
+
+        for dtype, path in bins.items():
+            model = model_engine.Model(*model_format.open_mmap(path))
+            err = np.abs(model.reconstruct(x[:256]) - ref.reconstruct(x[:256])).max()
+            same = (model.seq2seq(tokens[:256]) == ref.seq2seq(tokens[:256])).mean()
+            print(f"{dtype}: max |Δ reconstruct| = {err:.2e}, seq2seq token agreement {same:.1%}")
+
+        print(f"\n{'call':<12}{'batch 1':>14}{f'batch {args.batch}':>16}{'speed-up':>10}")
+        for name, fn, items in (("encode", ref.encode, x),
+                                ("reconstruct", ref.reconstruct, x),
+                                ("seq2seq", ref.seq2seq, tokens)):
+            single = throughput(fn, 1, items[:max(64, len(items) // 8)])
+            batched = throughput(fn, args.batch, items)
+            print(f"{name:<12}{single:>10.0f}/s  {batched:>12.0f}/s  {batched / single:>8.1f}×")
+
+
+if __name__ == "__main__":
+    main()
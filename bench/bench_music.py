@@ -0,0 +1,153 @@
+# bench/bench_music.py
+
+"""
+Music library index: cold build, warm start and per-query latency on a
+synthetic tree of N (empty) audio files, against the old os.walk + difflib
+scan that ran on every "play …" command.
+
+    python bench/bench_music.py [--tracks 50000] [--queries 200]
+"""
+
+import argparse
+import difflib
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from contextlib import closing
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from music_library import AUDIO_EXTS, MusicLibrary, write_playlist  # noqa: E402
+
+WORDS = ["love", "night", "fire", "heart", "dance", "rain", "blue", "road", "home",
+         "summer", "лято", "нощ", "море", "песен", "обич", "black", "gold", "river"]
+ALBUMS = ["first light", "северен вятър", "paper moons", "late trains", "стари снимки",
+          "glass harbour", "quiet engines"]
+
+
+def make_tree(root, n, seed=0):
+    rnd = random.Random(seed)
+    names = []
+    for i in range(n):
+        artist = f"artist {i % max(1, n // 200)}"
+        album = ALBUMS[i % len(ALBUMS)]
+        title = " ".join(rnd.sample(WORDS, rnd.randint(2, 4))) + f" {i}"
+        d = os.path.join(root, artist, album)
+        os.makedirs(d, exist_ok=True)
+        open(os.path.join(d, f"{title}{rnd.choice(AUDIO_EXTS)}"), "wb").close()
+        names.append(title)
+    return names
+
+
+def legacy_lookup(folder, fragment):
+    candidates, file_map = [], {}
+    for root_dir, _, files in os.walk(folder):
+        for fn in files:
+            if fn.lower().endswith(AUDIO_EXTS):
+                base = os.path.splitext(fn)[0].lower()
+                candidates.append(base)
+                file_map[base] = os.path.join(root_dir, fn)
+    best = difflib.get_close_matches(fragment.lower(), candidates, n=1, cutoff=0.5)
+    return file_map[best[0]] if best else None
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--tracks", type=int, default=50000)
+    ap.add_argument("--queries", type=int, default=200)
+    ap.add_argument("--legacy-queries", type=int, default=3,
+                    help="old full-scan lookups to time (they are slow)")
+    args = ap.parse_args()
+
+    rnd = random.Random(1)
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = os.path.join(tmp, "Music")
+        db = os.path.join(tmp, "music_index.db")
+        names = make_tree(folder, args.tracks)
+        queries = [rnd.choice(names) if rnd.random() < 0.7 else " ".join(rnd.sample(WORDS, 2))
+                   for _ in range(args.queries)]
+
+        lib = MusicLibrary(db, folder)
+        cold = lib.refresh()
+        # the files are empty: stand in for their tags (album = folder name)
+        with closing(sqlite3.connect(db)) as con, con:
+            con.executemany("UPDATE tracks SET album=?, tagged=1 WHERE path=?",
+                            [(os.path.basename(os.path.dirname(p)), p)
+                             for (p,) in con.execute("SELECT path FROM tracks")])
+
+        t0 = time.perf_counter()
+        lib = MusicLibrary(db, folder)
+        warm = lib.refresh()
+        warm_ms = (time.perf_counter() - t0) * 1e3
+
+        t0 = time.perf_counter()
+        for q in queries:
+            lib.find(q)
+        query_us = (time.perf_counter() - t0) / len(queries) * 1e6
+
+        field_queries = [f"album {rnd.choice(ALBUMS)}" for _ in range(20)]
+        t0 = time.perf_counter()
+        for q in field_queries:
+            lib.search(q, limit=500)
+        field_ms = (time.perf_counter() - t0) / len(field_queries) * 1e3
+
+        # a whole album goes to the player as a playlist, not on the command line
+        field, album = lib.query("албума paper moons")
+        playlist = write_playlist([path for _, path, _ in album], os.path.join(tmp, "queue.m3u8"))
+        with open(playlist, encoding="utf-8") as f:
+            listed = f.read().splitlines()[1:]
+        cmdline = sum(len(path) + 3 for _, path, _ in album)
+        assert field == "album" and listed == [path for _, path, _ in album], (field, len(listed))
+        # "by …" is a title unless it says whose songs; a field query with no hits is a title too
+        title = names[0]
+        for q in (f"by {title}", f"artist {title}"):
+            assert lib.query(q, limit=1)[1][0][2] == title, q
+
+        # Settings → Apply calls set_folder on the Tk thread, maybe while a scan holds the lock
+        with lib._refresh_lock:
+            t0 = time.perf_counter()
+            lib.set_folder(os.path.join(tmp, "Other"), refresh=False)
+            switch_ms = (time.perf_counter() - t0) * 1e3
+        lib.set_folder(folder, refresh=False)
+        back = lib.refresh()
+        assert back["tracks"] == warm["tracks"] and back["dirs_scanned"] == 0, back
+
+        # a retag rewrites a file in place; its directory's mtime does not move
+        with closing(sqlite3.connect(db)) as con, con:
+            con.execute("UPDATE tracks SET tagged=1")
+            path = con.execute("SELECT path FROM tracks LIMIT 1").fetchone()[0]
+        dir_mtime = os.stat(os.path.dirname(path)).st_mtime_ns
+        with open(path, "ab") as f:
+            f.write(b"ID3 retagged")
+        os.utime(os.path.dirname(path), ns=(dir_mtime, dir_mtime))
+        quick = lib.refresh(verify=False)
+        t0 = time.perf_counter()
+        verify = lib.refresh(verify=True)
+        verify_ms = (time.perf_counter() - t0) * 1e3
+        with closing(sqlite3.connect(db)) as con, con:
+            pending = [p for (p,) in con.execute("SELECT path FROM tracks WHERE tagged=0")]
+        assert quick["changed"] == 0 and verify["changed"] == 1 and pending == [path], (quick, verify)
+
+        n_legacy = min(args.legacy_queries, len(queries))
+        t0 = time.perf_counter()
+        for q in queries[:n_legacy]:
+            legacy_lookup(folder, q)
+        legacy_ms = (time.perf_counter() - t0) / max(1, n_legacy) * 1e3
+
+    print(f"{args.tracks} tracks")
+    print(f"  cold build     : {cold['elapsed_ms']:9.1f} ms  ({cold['dirs_scanned']} dirs scanned)")
+    print(f"  warm start     : {warm_ms:9.1f} ms  ({warm['dirs_scanned']} dirs scanned)")
+    print(f"  query (index)  : {query_us / 1e3:9.3f} ms")
+    print(f"  query (album)  : {field_ms:9.3f} ms  ({len(album)} tracks → playlist; "
+          f"{cmdline} chars as arguments, Windows allows 32767)")
+    print(f"  query (legacy) : {legacy_ms:9.1f} ms  (os.walk + difflib)")
+    print(f"  set_folder     : {switch_ms:9.3f} ms  (while a scan holds the refresh lock)")
+    print(f"  verify sweep   : {verify_ms:9.1f} ms  (every dir listed; the retagged file queued for tags)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+# bench/bench_pipeline.py
+
+"""
+Drives RecognitionPipeline with a fake recognizer that sleeps for a
+configurable, jittered "network" delay, and checks that commands are still
+executed in spoken order while several recognitions overlap.
+
+    python bench/bench_pipeline.py [--phrases 60] [--gap-ms 150]
+                                   [--delay-ms 400] [--jitter-ms 300]
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pipeline import STAGES, RecognitionPipeline  # noqa: E402
+
+
+class FakeRecognizer:
+    """'Audio' is just the transcript; recognition sleeps delay ± jitter."""
+
+    def __init__(self, delay_ms, jitter_ms, seed=0):
+        self.delay = delay_ms / 1e3
+        self.jitter = jitter_ms / 1e3
+        self.rnd = random.Random(seed)
+
+    def __call__(self, audio):
+        time.sleep(max(0.0, self.delay + self.rnd.uniform(-self.jitter, self.jitter)))
+        return audio
+
+
+def run(workers, max_pending, args):
+    executed = []
+    p = RecognitionPipeline(FakeRecognizer(args.delay_ms, args.jitter_ms), executed.append,
+                            workers=workers, max_pending=max_pending)
+    spoken = [f"phrase {i}" for i in range(args.phrases)]
+    t0 = time.monotonic()
+    for text in spoken:
+        p.submit(text)
+        time.sleep(args.gap_ms / 1e3)
+    p.drain()
+    wall = time.monotonic() - t0
+    p.stop()
+
+    in_order = executed == [t for t in spoken if t in set(executed)]
+    return p.stats(), executed, in_order, wall
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--phrases", type=int, default=60)
+    ap.add_argument("--gap-ms", type=float, default=150, help="time between spoken phrases")
+    ap.add_argument("--delay-ms", type=float, default=400, help="mean recognition delay")
+    ap.add_argument("--jitter-ms", type=float, default=300)
+    ap.add_argument("--max-pending", type=int, default=4)
+    args = ap.parse_args()
+
+    ok = True
+    for workers in (1, 2, 4):
+        stats, executed, in_order, wall = run(workers, args.max_pending, args)
+        ok &= in_order
+        print(f"workers={workers}: executed {len(executed)}/{args.phrases}, dropped {stats['dropped']}, "
+              f"wall {wall:.2f} s, order {'OK' if in_order else 'VIOLATED'}")
+        for stage in STAGES:
+            if stage in stats:
+                s = stats[stage]
+                print(f"    {stage:<9} p50 {s['p50_ms']:7.1f} ms  p95 {s['p95_ms']:7.1f} ms  "
+                      f"max {s['max_ms']:7.1f} ms")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+# bench/bench_platform.py
+
+"""
+Headless load test of the full command path on the fake platform backend.
+
+Transcripts go through VoiceAssistantApp._handle_text exactly as the
+pipeline executor calls it (exact phrases, typing mode, verbs, intents);
+the fake backend records every OS action instead of performing it.  No
+window is created, so this runs on a Linux box without a display.
+
+    python bench/bench_platform.py [--n 5000] [--apps 300]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+
+os.environ["VA_PLATFORM"] = "fake"
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import voice_assistant_new_ui as va  # noqa: E402
+from bench_dispatch import load_transcripts, synthetic_apps  # noqa: E402
+
+
+def headless_app():
+    """A VoiceAssistantApp with only the command path set up (no Tk)."""
+    app = va.VoiceAssistantApp.__new__(va.VoiceAssistantApp)
+    app.typing_mode = False
+    app.media_player = app.music_folder = ""
+    with contextlib.redirect_stdout(io.StringIO()):
+        app.commands = app._build_commands()
+    return app
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--n", type=int, default=5000, help="utterances to replay")
+    ap.add_argument("--apps", type=int, default=300, help="fake installed apps")
+    args = ap.parse_args()
+
+    apps = {name: f"C:/Programs/{name.replace(' ', '_')}.exe" for name in synthetic_apps(args.apps)}
+    va.PLATFORM.apps.installed.update(apps)
+    with tempfile.TemporaryDirectory() as tmp:
+        va.STORE = va.open_store(tmp)
+        va.init_app_index()
+        va.STORE.flush()
+    print(f"platform {va.PLATFORM.name!r}: {len(va.APP_COMMANDS)} apps indexed")
+
+    app = headless_app()
+    log = va.PLATFORM.apps.log
+    rnd = random.Random(0)
+    transcripts = load_transcripts()
+    corpus = [rnd.choice(transcripts) for _ in range(args.n)]
+
+    lat = []
+    log.clear()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for text in corpus:
+            t0 = time.perf_counter()
+            app._handle_text(text)
+            lat.append((time.perf_counter() - t0) * 1e6)
+        va.OUTPUT.wait()            # typing-mode text is sent from the output thread
+    lat.sort()
+
+    print(f"{len(corpus)} utterances, {len(log)} OS actions recorded")
+    for (component, action), n in sorted(Counter((c, a) for c, a, _ in log).items()):
+        print(f"  {component + '.' + action:<20}{n:6d}")
+    print(f"latency: mean {sum(lat) / len(lat):8.1f} µs  p50 {lat[len(lat) // 2]:8.1f}  "
+          f"p95 {lat[int(len(lat) * 0.95)]:8.1f}  p99 {lat[int(len(lat) * 0.99)]:8.1f}")
+
+    # sanity: a known command reaches the backend (the replay may have left typing mode on;
+    # chrome may already be running, then its window is focused instead)
+    app.typing_mode = False
+    log.clear()
+    app._handle_text("open google chrome")
+    assert log and log[-1][:2] in (("processes", "launch"), ("windows", "activate")), log
+
+
+if __name__ == "__main__":
+    main()
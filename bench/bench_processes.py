@@ -0,0 +1,150 @@
+# bench/bench_processes.py
+
+"""
+Process-aware open/close on the fake backend with a process table of
+thousands of entries: incremental ProcessTracker refreshes and lookups
+against a full by-name scan of the table (what taskkill /im does), the
+cost of spawning one helper process (the old close path), and the
+open → focus / close → close windows → terminate flow.
+
+    python bench/bench_processes.py [--procs 5000] [--apps 300] [--churn 50]
+"""
+
+import argparse
+import os
+import random
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bench_dispatch import synthetic_apps  # noqa: E402
+from platforms import create_platform  # noqa: E402
+from process_tracker import ProcessTracker  # noqa: E402
+from window_registry import WindowRegistry  # noqa: E402
+
+
+def target(name):
+    return f"C:/Programs/{name.replace(' ', '_')}.exe"
+
+
+def scan(procs, name):
+    """Every pid whose image name matches, by walking the whole table."""
+    name = os.path.basename(name).lower()
+    return [pid for pid in procs.running_pids()
+            if os.path.basename(procs.describe(pid)[0]).lower() == name]
+
+
+def _try(fn):
+    try:
+        fn()
+        return []
+    except Exception as e:
+        return [repr(e)]
+
+
+def pct(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--procs", type=int, default=5000, help="processes in the fake table")
+    ap.add_argument("--apps", type=int, default=300)
+    ap.add_argument("--churn", type=int, default=50, help="processes started/exited between refreshes")
+    ap.add_argument("--queries", type=int, default=300)
+    args = ap.parse_args()
+
+    rnd = random.Random(0)
+    apps = synthetic_apps(args.apps)
+    platform = create_platform("fake")
+    procs = platform.processes
+    for i in range(args.procs):
+        procs.spawn(target(rnd.choice(apps)), window=i % 4 == 0)     # most have no window
+
+    tracker = ProcessTracker(procs, max_age=60)
+    cold = tracker.refresh()
+    warm = tracker.refresh()
+    churn = []
+    for _ in range(20):
+        for pid in rnd.sample(sorted(procs.running), args.churn):
+            procs.terminate(pid)
+        for _ in range(args.churn):
+            procs.spawn(target(rnd.choice(apps)), window=False)
+        churn.append(tracker.refresh()["elapsed_ms"])
+    print(f"{len(procs.running)} processes, {len(apps)} apps")
+    print(f"  cold refresh           {cold['elapsed_ms']:9.2f} ms  ({cold['added']} described)")
+    print(f"  refresh, no change     {warm['elapsed_ms']:9.2f} ms")
+    print(f"  refresh, ±{args.churn:<4d} procs   {sum(churn) / len(churn):9.2f} ms")
+
+    # overlapping refreshes (stop() on its thread, pids_for() on the executor) see the same changes
+    describe = procs.describe
+    procs.describe = lambda pid: (time.sleep(0.0002), describe(pid))[1]
+    errors = []
+    for _ in range(5):
+        for pid in rnd.sample(sorted(procs.running), args.churn):
+            procs.terminate(pid)
+        for _ in range(args.churn):
+            procs.spawn(target(rnd.choice(apps)), window=False)
+        workers = [threading.Thread(target=lambda: errors.extend(_try(tracker.refresh))) for _ in range(4)]
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join()
+    procs.describe = describe
+    assert not errors, errors
+    assert sorted(tracker._procs) == sorted(procs.running_pids())
+    print("  4 overlapping refreshes ×5: no errors, table matches")
+
+    queries = [rnd.choice(apps) for _ in range(args.queries)]
+    lat_tracker, lat_scan = [], []
+    for q in queries:
+        t0 = time.perf_counter()
+        a = tracker.pids_for(target(q))
+        t1 = time.perf_counter()
+        b = scan(procs, target(q))
+        t2 = time.perf_counter()
+        assert sorted(a) == sorted(b), q
+        lat_tracker.append((t1 - t0) * 1e6)
+        lat_scan.append((t2 - t1) * 1e6)
+    print(f"  pids_for (tracker)     p50 {pct(lat_tracker, .5):9.1f} µs  p95 {pct(lat_tracker, .95):9.1f} µs")
+    print(f"  by-name table scan     p50 {pct(lat_scan, .5):9.1f} µs  p95 {pct(lat_scan, .95):9.1f} µs")
+    if shutil.which("true"):
+        t0 = time.perf_counter()
+        for _ in range(20):
+            subprocess.run(["true"], check=True)
+        print(f"  spawning one helper    {(time.perf_counter() - t0) / 20 * 1e3:9.2f} ms  (old close path, before its own work)")
+
+    # the command flow: open a running app focuses it, close asks its windows, then terminates
+    windows = WindowRegistry(platform.windows)
+    log = procs.log
+    name = apps[0]
+    pid = procs.spawn(target(name))
+    tracker.refresh()                                 # max_age has passed in real use
+    log.clear()
+    hwnds = windows.owned_by(tracker.pids_for(target(name)))
+    platform.windows.activate(hwnds[0])
+    assert ("windows", "activate", platform.windows.titles[hwnds[0]]) in log and \
+        not any(a == "launch" for _, a, _ in log)
+
+    pids = tracker.pids_for(target(name))
+    stubborn = pids[0]
+    platform.windows.ignore_close.add(stubborn)       # one instance ignores WM_CLOSE
+    for h in windows.owned_by(pids):
+        platform.windows.close(h)
+    t0 = time.perf_counter()
+    forced = tracker.stop(pids, grace=0.05, wait=True)
+    print(f"  close {name!r}: {len(pids)} pids, {sum(a == 'close' for _, a, _ in log)} windows asked to close, "
+          f"{sum(a == 'terminate' for _, a, _ in log)} terminated after the grace period "
+          f"({(time.perf_counter() - t0) * 1e3:.0f} ms), {len(forced)} killed")
+    assert stubborn not in procs.running and not tracker.pids_for(target(name))
+    assert pid not in procs.running
+
+
+if __name__ == "__main__":
+    main()
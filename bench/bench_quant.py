@@ -0,0 +1,64 @@
+# bench/bench_quant.py
+
+"""
+float32 vs float16 vs int8 seq2seq (model_quant.py).
+
+Accuracy is measured against the float32 reference on a fixed, seeded set
+of token sequences: worst and mean logit error, and how many greedy
+output tokens agree.  Footprint is the bytes of the prepared weight
+matrices; latency is wall time per recurrent step (encoder + decoder).
+
+    python bench/bench_quant.py [--sequences 512] [--steps 12]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import model_engine  # noqa: E402
+import model_quant  # noqa: E402
+
+
+def step_latency_us(model, tokens, repeat=20):
+    model.seq2seq(tokens)                               # warm the prepared weights
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        model.seq2seq(tokens)
+        best = min(best, time.perf_counter() - t0)
+    return best / (2 * tokens.shape[1]) * 1e6          # encoder + decoder steps
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sequences", type=int, default=512)
+    ap.add_argument("--steps", type=int, default=12)
+    args = ap.parse_args()
+
+    ref = model_engine.load_model()
+    variants = {
+        "float32": ref,
+        "float16": model_quant.Float16Model.from_model(ref),
+        "int8": model_quant.QuantizedModel.from_model(ref),
+    }
+    tokens = np.random.default_rng(1234).integers(0, 8, (args.sequences, args.steps))
+    ref_out, ref_logits = ref.seq2seq(tokens, return_logits=True)
+
+    print(f"{args.sequences} fixed sequences × {args.steps} steps\n")
+    print(f"{'variant':<9}{'weights':>10}{'max |Δ|':>10}{'mean |Δ|':>10}{'tokens':>9}"
+          f"{'step b=1':>11}{'step b=64':>11}")
+    for name, model in variants.items():
+        out, logits = model.seq2seq(tokens, return_logits=True)
+        err = np.abs(logits - ref_logits)
+        print(f"{name:<9}{model_quant.weight_nbytes(model) / 1024:>8.1f}KB"
+              f"{err.max():>10.2e}{err.mean():>10.2e}{(out == ref_out).mean():>9.2%}"
+              f"{step_latency_us(model, tokens[:1]):>9.1f}µs{step_latency_us(model, tokens[:64]):>9.1f}µs")
+
+
+if __name__ == "__main__":
+    main()
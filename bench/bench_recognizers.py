@@ -0,0 +1,125 @@
+# bench/bench_recognizers.py
+
+"""
+Runs a corpus of WAV files through every available recognizer backend and
+reports real-time factor, recognition latency and end-to-end command
+latency (recognition + dispatch through the command registry).
+
+A corpus is a directory of .wav files plus transcripts.json
+({"file.wav": "reference transcript"}).  Without --corpus a synthetic one
+is generated from bench/transcripts.txt; only the fixture backend can
+"understand" that one, but it still exercises the whole path.
+
+    python bench/bench_recognizers.py [--corpus DIR] [--google] [--vosk-model DIR]
+"""
+
+import argparse
+import json
+import math
+import struct
+import sys
+import tempfile
+import time
+import wave
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import speech_recognition as sr  # noqa: E402
+
+from bench_dispatch import build_registry, load_transcripts, synthetic_apps  # noqa: E402
+from recognizers import FixtureBackend, GoogleBackend, VoskBackend  # noqa: E402
+
+
+def write_tone_wav(path, seconds, freq, rate=16000):
+    n = int(seconds * rate)
+    frames = b"".join(struct.pack("<h", int(8000 * math.sin(2 * math.pi * freq * i / rate)))
+                      for i in range(n))
+    with wave.open(str(path), "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(frames)
+
+
+def synthetic_corpus(root):
+    refs = {}
+    for i, text in enumerate(load_transcripts()):
+        name = f"utt{i:03d}.wav"
+        write_tone_wav(Path(root, name), 0.6 + 0.05 * len(text.split()), 200 + 13 * i)
+        refs[name] = text
+    Path(root, "transcripts.json").write_text(json.dumps(refs, ensure_ascii=False), encoding="utf-8")
+    return Path(root)
+
+
+def load_corpus(root):
+    refs = json.loads(Path(root, "transcripts.json").read_text(encoding="utf-8"))
+    corpus = []
+    for name, text in sorted(refs.items()):
+        with sr.AudioFile(str(Path(root, name))) as src:
+            corpus.append((name, sr.Recognizer().record(src), text))
+    return corpus
+
+
+def pct(values, q):
+    v = sorted(values)
+    return v[min(len(v) - 1, int(len(v) * q))] if v else 0.0
+
+
+def bench_backend(backend, corpus, registry):
+    rtf, rec_ms, e2e_ms, text_ok, action_ok = [], [], [], 0, 0
+    for _, audio, ref in corpus:
+        t0 = time.perf_counter()
+        res = backend.recognize(audio)
+        label = registry.dispatch(res.text.lower()) if res.text else None
+        e2e_ms.append((time.perf_counter() - t0) * 1e3)
+        rec_ms.append(res.elapsed_s * 1e3)
+        rtf.append(res.rtf)
+        text_ok += bool(res.text) and res.text.lower().strip() == ref.lower().strip()
+        action_ok += label == registry.dispatch(ref.lower())
+    n = len(corpus)
+    return {
+        "backend": backend.name, "utterances": n,
+        "rtf_mean": sum(rtf) / n,
+        "recognize_p50_ms": pct(rec_ms, 0.5), "recognize_p95_ms": pct(rec_ms, 0.95),
+        "e2e_p50_ms": pct(e2e_ms, 0.5), "e2e_p95_ms": pct(e2e_ms, 0.95),
+        "text_accuracy": text_ok / n, "action_accuracy": action_ok / n,
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--corpus", help="directory with *.wav + transcripts.json")
+    ap.add_argument("--google", action="store_true", help="include Google (needs network)")
+    ap.add_argument("--vosk-model", help="include Vosk with this model directory")
+    ap.add_argument("--fixture-delay-ms", type=float, default=0.0)
+    ap.add_argument("--json", action="store_true", help="print results as JSON")
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus = load_corpus(args.corpus or synthetic_corpus(tmp))
+
+    fixture = FixtureBackend(delay_s=args.fixture_delay_ms / 1e3)
+    for _, audio, ref in corpus:
+        fixture.add(audio, ref)
+    backends = [fixture]
+    if args.google:
+        backends.append(GoogleBackend(language="bg-BG"))
+    if args.vosk_model:
+        backends.append(VoskBackend(args.vosk_model))
+
+    registry = build_registry(synthetic_apps())
+    results = [bench_backend(b, corpus, registry) for b in backends]
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{len(corpus)} utterances")
+    for r in results:
+        print(f"  {r['backend']:<8} RTF {r['rtf_mean']:.4f}  "
+              f"recognize p50 {r['recognize_p50_ms']:7.1f} ms p95 {r['recognize_p95_ms']:7.1f} ms  "
+              f"e2e p50 {r['e2e_p50_ms']:7.1f} ms p95 {r['e2e_p95_ms']:7.1f} ms  "
+              f"text {r['text_accuracy']:.0%}  action {r['action_accuracy']:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,345 @@
+# bench/bench_replay.py
+
+"""
+End-to-end replay: a corpus of (audio or transcript, expected action)
+pairs goes through VoiceAssistantApp._callback → VAD → RecognitionPipeline
+→ _handle_text on the fake platform backend, with a FixtureBackend that
+maps each clip to its transcript.  Measures throughput, per-stage latency
+(from the telemetry spans the app records anyway) and how many phrases
+produced the expected OS action.
+
+Clips without an "audio" file are synthesized (speech-like or noise-only,
+see bench_vad), so no microphone or network is needed.  The app index and
+music library are synthetic with a configurable size.
+
+    python bench/bench_replay.py [--n 600] [--apps 300] [--tracks 2000]
+                                 [--rate 20] [--delay-ms 50] [--json out.json]
+                                 [--baseline previous.json]
+
+The JSON report is meant to be kept per release and compared with
+--baseline.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import platform
+import random
+import sys
+import tempfile
+import threading
+import time
+import wave
+import zlib
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(HERE.parent))
+
+from bench_platform import headless_app, va  # noqa: E402  (selects the fake platform)
+from bench_dispatch import synthetic_apps  # noqa: E402
+from bench_music import make_tree  # noqa: E402
+from bench_vad import RATE, Clip, background, noise_event, speech  # noqa: E402
+from kws import KeywordSpotter  # noqa: E402
+from music_library import MusicLibrary  # noqa: E402
+from pipeline import RecognitionPipeline  # noqa: E402
+from recognizers import FixtureBackend  # noqa: E402
+from telemetry import percentile  # noqa: E402
+from vad import VoiceActivityDetector  # noqa: E402
+
+CORPUS = HERE / "fixtures" / "replay_corpus.json"
+REPORT_VERSION = 1
+
+
+# ─── Corpus ───────────────────────────────────────────────────────────────
+
+def load_corpus(path):
+    items = json.loads(Path(path).read_text(encoding="utf-8"))["items"]
+    base = Path(path).parent
+    for item in items:
+        if item.get("audio"):
+            item["audio"] = str(base / item["audio"])
+    return items
+
+
+def read_wav(path):
+    with wave.open(str(path)) as w:
+        assert w.getsampwidth() == 2 and w.getnchannels() == 1, path
+        return Clip(w.readframes(w.getnframes()), w.getframerate(), 2)
+
+
+def synth_clip(key, noise):
+    """A 1–2.5 s clip seeded by `key`, so every replayed phrase has its own audio."""
+    rnd = np.random.default_rng(zlib.crc32(key.encode()))
+    n = int(rnd.uniform(1.0, 2.5) * RATE)
+    x = background(n, rnd) + (noise_event(n, rnd) if noise else speech(n, rnd))
+    return Clip((np.clip(x, -1, 1) * 32767).astype("<i2").tobytes(), RATE, 2)
+
+
+def expand(corpus, n, apps, tracks, seed=0):
+    """n replay items in corpus order (cycled), placeholders filled at random."""
+    rnd = random.Random(seed)
+    out, prev_app = [], apps[0]
+    for i in range(n):
+        item = corpus[i % len(corpus)]
+        fill = {"app": rnd.choice(apps), "prev_app": prev_app, "track": rnd.choice(tracks) if tracks else ""}
+        prev_app = fill["app"]
+        say = item.get("say", "").format(**fill) if not item.get("noise") else None
+        expect = item.get("expect")
+        if expect:
+            actions = expect["action"]
+            expect = {"action": [actions] if isinstance(actions, str) else list(actions),
+                      "arg": expect.get("arg", "").format(**fill).lower()}
+        audio = read_wav(item["audio"]) if item.get("audio") else synth_clip(f"{i}:{say}", not say)
+        out.append({"say": say, "expect": expect, "audio": audio})
+    return out
+
+
+def _norm(text):
+    # fake launch targets spell app names with underscores
+    return str(text).lower().replace("_", " ")
+
+
+def matches(expect, actions):
+    if expect is None:
+        return not actions
+    return any(f"{component}.{op}" in expect["action"] and _norm(expect["arg"]) in _norm(arg)
+               for component, op, arg in actions)
+
+
+# ─── Harness ──────────────────────────────────────────────────────────────
+
+class SpanCollector:
+    """Pulls spans out of the tracer's ring buffer before they are overwritten."""
+
+    def __init__(self, tracer, interval=0.05):
+        self.tracer, self.interval = tracer, interval
+        self.spans = []
+        self._next = tracer.spans()[1]
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _pull(self):
+        spans, self._next = self.tracer.spans(self._next)
+        self.spans.extend(spans)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._pull()
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self._pull()
+
+    def stages(self):
+        """{stage: {"n", "mean_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms"}}; dispatch split by kind."""
+        by_stage = {}
+        for _, _, stage, start, end, attrs in self.spans:
+            if stage == "dispatch" and attrs.get("kind"):
+                stage = f"dispatch.{attrs['kind']}"
+            elif stage in ("fuzzy_match", "os_action"):
+                stage = f"{stage}.{attrs.get('index') or attrs.get('component')}"
+            by_stage.setdefault(stage, []).append((end - start) * 1e3)
+        out = {}
+        for stage, v in sorted(by_stage.items()):
+            v.sort()
+            out[stage] = {"n": len(v), "mean_ms": sum(v) / len(v), "p50_ms": percentile(v, .5),
+                          "p95_ms": percentile(v, .95), "p99_ms": percentile(v, .99), "max_ms": v[-1]}
+        return out
+
+
+class TrimAwareVAD(VoiceActivityDetector):
+    """The VAD trims the clip, which changes its fixture key; carry the transcript over."""
+
+    def __init__(self, backend, **kw):
+        super().__init__(**kw)
+        self.backend = backend
+
+    def process(self, audio):
+        out = super().process(audio)
+        text = self.backend.transcripts.get(self.backend.key(audio))
+        if out is not None and text:
+            self.backend.add(out, text)
+        return out
+
+
+def replay_app(tmp, apps, tracks, items, args):
+    """headless_app() plus the recognizer side of _init_recognizer and a music library."""
+    app = headless_app()
+    app.wake_cfg = dict(va.WAKE_DEFAULTS)
+    app._wake_until = 0.0
+    app.direct_commands = args.direct_commands
+    app.backend = FixtureBackend(delay_s=args.delay_ms / 1e3)
+    app.vad = TrimAwareVAD(app.backend)
+    app.kws = KeywordSpotter(None)
+    for item in items:
+        if item["say"]:
+            app.backend.add(item["audio"], item["say"])
+
+    app.media_player = os.path.join(tmp, "player.exe")
+    open(app.media_player, "wb").close()
+    app.music_folder = os.path.join(tmp, "Music")
+    os.makedirs(app.music_folder, exist_ok=True)
+    app.music = MusicLibrary(os.path.join(tmp, "music_index.db"), app.music_folder)
+    app.music.refresh()
+
+    va.PLATFORM.apps.installed.clear()
+    va.PLATFORM.apps.installed.update(apps)
+    va.STORE = va.open_store(tmp)
+    va.init_app_index()
+    va.STORE.flush()
+    return app
+
+
+def run(app, items, args):
+    """Replay `items` through _callback; returns (OS actions per item, timings)."""
+    log = va.PLATFORM.apps.log
+    actions = {}                    # trace → OS actions logged while executing it
+
+    def execute(text):
+        start = len(log)
+        app._handle_text(text)
+        va.OUTPUT.wait()            # typed text is sent from the output thread
+        actions[va.TRACER.current] = log[start:]
+
+    app.pipeline = RecognitionPipeline(app._recognize, execute, workers=args.workers,
+                                       max_pending=args.max_pending, tracer=va.TRACER)
+    interval = 1.0 / args.rate if args.rate > 0 else 0.0
+    traces, callback_ms = [], []
+    t0 = time.perf_counter()
+    for i, item in enumerate(items):
+        due = t0 + i * interval
+        if due > time.perf_counter():
+            time.sleep(due - time.perf_counter())
+        t = time.perf_counter()
+        app._callback(None, item["audio"])
+        callback_ms.append((time.perf_counter() - t) * 1e3)
+        traces.append(va.TRACER.current)
+    app.pipeline.drain()
+    wall = time.perf_counter() - t0
+    app.pipeline.stop(timeout=1)
+    return [actions.get(trace, []) for trace in traces], {"wall_s": wall, "callback_ms": callback_ms,
+                                                          "executed": len(actions)}
+
+
+# ─── Report ───────────────────────────────────────────────────────────────
+
+def report(items, got, timing, stages, pipeline, args):
+    by_action = Counter()
+    hits = Counter()
+    misses = []
+    for item, acts in zip(items, got):
+        label = "none" if item["expect"] is None else "|".join(item["expect"]["action"])
+        if item["say"] is None:
+            label = "noise"
+        by_action[label] += 1
+        if matches(item["expect"], acts):
+            hits[label] += 1
+        elif len(misses) < args.show_misses:
+            misses.append({"say": item["say"], "expect": item["expect"],
+                           "got": [[c, o, str(a)] for c, o, a in acts]})
+    cb = sorted(timing["callback_ms"])
+    correct = sum(hits.values())
+    return {
+        "version": REPORT_VERSION,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "config": {k: getattr(args, k) for k in ("n", "apps", "tracks", "rate", "delay_ms", "workers",
+                                                 "max_pending", "direct_commands", "seed")},
+        "throughput": {
+            "phrases": len(items),
+            "wall_s": timing["wall_s"],
+            "phrases_per_s": len(items) / timing["wall_s"],
+            "executed": timing["executed"],
+            "executed_per_s": timing["executed"] / timing["wall_s"],
+            "dropped": pipeline.dropped,
+            "callback_ms": {"mean": sum(cb) / len(cb), "p50": percentile(cb, .5),
+                            "p95": percentile(cb, .95), "max": cb[-1]},
+        },
+        "stages": stages,
+        "accuracy": {
+            "correct": correct,
+            "total": len(items),
+            "rate": correct / len(items),
+            "by_action": {k: {"correct": hits[k], "total": v, "rate": hits[k] / v}
+                          for k, v in sorted(by_action.items())},
+        },
+        "misses": misses,
+    }
+
+
+def print_report(r, baseline=None):
+    tp, acc = r["throughput"], r["accuracy"]
+    print(f"{tp['phrases']} phrases in {tp['wall_s']:.2f} s ({tp['phrases_per_s']:.1f}/s offered), "
+          f"{tp['executed']} executed ({tp['executed_per_s']:.1f}/s), {tp['dropped']} dropped by the pipeline")
+    print(f"_callback p50 {tp['callback_ms']['p50']:.2f} ms  p95 {tp['callback_ms']['p95']:.2f} ms")
+    print(f"accuracy {acc['correct']}/{acc['total']} = {acc['rate']:.1%}")
+    for label, a in acc["by_action"].items():
+        print(f"  {label:<36}{a['correct']:5d}/{a['total']:<5d} {a['rate']:6.1%}")
+    print(f"{'stage':<24}{'n':>6}{'p50':>10}{'p95':>10}{'p99':>10}  ms")
+    for stage, s in r["stages"].items():
+        line = f"{stage:<24}{s['n']:6d}{s['p50_ms']:10.3f}{s['p95_ms']:10.3f}{s['p99_ms']:10.3f}"
+        old = (baseline or {}).get("stages", {}).get(stage)
+        if old and old["p95_ms"] > 0:
+            line += f"   p95 {s['p95_ms'] / old['p95_ms'] - 1:+7.1%}"
+        print(line)
+    if baseline:
+        old = baseline["accuracy"]["rate"]
+        print(f"vs baseline ({baseline.get('timestamp', '?')}): accuracy {acc['rate'] - old:+.1%}, "
+              f"executed/s {tp['executed_per_s'] / baseline['throughput']['executed_per_s'] - 1:+.1%}")
+    for m in r["misses"]:
+        print("  miss:", json.dumps(m, ensure_ascii=False))
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Replay a phrase corpus through the full command path")
+    ap.add_argument("--corpus", default=str(CORPUS))
+    ap.add_argument("--n", type=int, default=600, help="phrases to replay (the corpus is cycled)")
+    ap.add_argument("--apps", type=int, default=300, help="synthetic installed apps")
+    ap.add_argument("--tracks", type=int, default=2000, help="synthetic music library size")
+    ap.add_argument("--rate", type=float, default=20, help="phrases/s offered (0 = as fast as possible)")
+    ap.add_argument("--delay-ms", type=float, default=50, help="simulated recognizer latency")
+    ap.add_argument("--workers", type=int, default=2)
+    ap.add_argument("--max-pending", type=int, default=4)
+    ap.add_argument("--direct-commands", action="store_true", help="let the KWS learn and answer fixed phrases")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--show-misses", type=int, default=10)
+    ap.add_argument("--json", help="write the report here ('-' = stdout only the JSON)")
+    ap.add_argument("--baseline", help="earlier --json report to compare against")
+    args = ap.parse_args()
+
+    va.logger.setLevel(logging.WARNING)
+    with tempfile.TemporaryDirectory() as tmp:
+        apps = {name: f"C:/Programs/{name.replace(' ', '_')}.exe" for name in synthetic_apps(args.apps)}
+        tracks = make_tree(os.path.join(tmp, "Music"), args.tracks, seed=args.seed)
+        items = expand(load_corpus(args.corpus), args.n, list(apps), tracks, args.seed)
+        with contextlib.redirect_stdout(io.StringIO()):
+            app = replay_app(tmp, apps, tracks, items, args)
+            with SpanCollector(va.TRACER) as spans:
+                got, timing = run(app, items, args)
+    r = report(items, got, timing, spans.stages(), app.pipeline, args)
+
+    if args.json == "-":
+        print(json.dumps(r, indent=2, ensure_ascii=False))
+        return
+    baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8")) if args.baseline else None
+    print_report(r, baseline)
+    if args.json:
+        Path(args.json).write_text(json.dumps(r, indent=2, ensure_ascii=False), encoding="utf-8")
+        print("report written to", args.json)
+
+
+if __name__ == "__main__":
+    main()
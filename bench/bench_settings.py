@@ -0,0 +1,163 @@
+# bench/bench_settings.py
+
+"""
+Tk-thread stalls of the settings dialog, measured with an instrumented
+event loop (telemetry.UIStallMonitor) on the fake platform: a simulated
+PortAudio probe and ambient-noise calibration, and an app index of a few
+thousand entries.
+
+  old: probe the microphones and scan APP_COMMANDS for players on every
+       open; Apply restarts the listener, calibrating on the Tk thread.
+  new: devices.DeviceCache (probed at start-up, re-probed on hot-plug),
+       lists delivered with after(); calibration on a thread, then a
+       hand-over on the Tk thread.
+
+Needs a display (Tk).
+
+    python bench/bench_settings.py [--apps 3000] [--probe-ms 300] [--calibrate-ms 500]
+"""
+
+import argparse
+import sys
+import threading
+import time
+import tkinter as tk
+from pathlib import Path
+from tkinter import ttk
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bench_dispatch import synthetic_apps  # noqa: E402
+from devices import DeviceCache, find_players  # noqa: E402
+from platforms import create_platform  # noqa: E402
+from telemetry import UIStallMonitor  # noqa: E402
+
+MICS = ["Microphone (Realtek Audio)", "Headset (USB Audio)", "Stereo Mix", "Line In"]
+
+
+def measure(root, monitor, start, done, timeout=10.0):
+    """Run start() from the Tk loop, pump events until done(); the monitor's report."""
+    root.update()
+    monitor.reset()
+    root.after(0, start)
+    end = time.monotonic() + timeout
+    while not done():
+        if time.monotonic() > end:
+            raise AssertionError("timed out")
+        root.update()
+        time.sleep(0.001)
+    root.update()
+    return monitor.report()
+
+
+def dialog(root):
+    win = tk.Toplevel(root)
+    mics, players = ttk.Combobox(win), ttk.Combobox(win)
+    mics.pack(), players.pack()
+    return win, mics, players
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--apps", type=int, default=3000)
+    ap.add_argument("--probe-ms", type=float, default=300.0, help="one PortAudio device probe")
+    ap.add_argument("--calibrate-ms", type=float, default=500.0, help="adjust_for_ambient_noise")
+    ap.add_argument("--opens", type=int, default=5)
+    args = ap.parse_args()
+
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        sys.exit(f"needs a display: {e}")
+    root.withdraw()
+    platform = create_platform("fake")
+    audio = platform.audio
+    audio.names, audio.probe_s = list(MICS), args.probe_ms / 1e3
+    apps = {name: f"C:/Programs/{name}.exe" for name in synthetic_apps(args.apps) + ["vlc media player"]}
+    monitor = UIStallMonitor(root).start()
+    rows = []
+
+    # ── old ──────────────────────────────────────────────────────
+    state = {}
+
+    def old_open():
+        win, mics, players = dialog(root)
+        mics.config(values=audio.input_names())
+        players.config(values=[n for n in apps if any(k in n for k in ("player", "vlc", "spotify"))])
+        state["win"] = win
+
+    opens = [measure(root, monitor, old_open, lambda: "win" in state and not state.pop("win").destroy())
+             for _ in range(args.opens)]
+    rows.append(("old: open dialog", opens))
+
+    def old_apply():
+        time.sleep(args.calibrate_ms / 1e3)         # stop_listening(); start_listening()
+        state["done"] = True
+    rows.append(("old: apply mic switch", [measure(root, monitor, old_apply, lambda: state.pop("done", False))]))
+
+    # ── new ──────────────────────────────────────────────────────
+    cache = DeviceCache(audio, poll_s=0.05)
+    cache.start()                                   # VoiceAssistantApp._init_audio
+    while cache.cached_microphones() is None:
+        time.sleep(0.01)
+
+    def new_open():
+        win, mics, players = dialog(root)
+        got = state["got"] = []
+
+        def on_tk(fn):
+            return lambda *a: root.after(0, lambda: win.winfo_exists() and fn(*a))
+
+        def show_mics(names):
+            mics.config(values=names); got.append("mics")
+
+        def show_players(found):
+            players.config(values=list(found)); got.append("players")
+        cache.microphones(on_tk(show_mics))
+        show = on_tk(show_players)
+        threading.Thread(target=lambda: show(cache.players(apps)), daemon=True).start()
+        state["win"] = win, mics
+
+    def opened():
+        if len(state.get("got", ())) < 2:
+            return False
+        state.pop("got")
+        state.pop("win")[0].destroy()
+        return True
+    rows.append(("new: open dialog", [measure(root, monitor, new_open, opened) for _ in range(args.opens)]))
+
+    def new_apply():
+        def run():
+            time.sleep(args.calibrate_ms / 1e3)     # _use_microphone: open + calibrate
+            root.after(0, lambda: state.update(done=True))      # _switch_microphone
+        threading.Thread(target=run, daemon=True).start()
+    rows.append(("new: apply mic switch", [measure(root, monitor, new_apply, lambda: state.pop("done", False))]))
+
+    # hot-plug while the dialog is open: the list updates itself
+    win, mics, _ = dialog(root)
+    listener = lambda names: root.after(0, lambda: mics.config(values=names))   # noqa: E731
+    cache.on_change(listener)
+    plugged = "USB Microphone (Blue Yeti)"
+    probes = cache.stats["probes"]
+    rows.append(("new: hot-plug re-probe", [measure(
+        root, monitor, lambda: audio.names.append(plugged),
+        lambda: plugged in root.tk.splitlist(mics.cget("values")))]))
+    cache.remove_listener(listener)
+    win.destroy()
+    assert cache.stats["probes"] == probes + 1 and cache.stats["invalidations"] == 1
+    assert "vlc media player" in find_players(apps)
+
+    print(f"{len(apps)} apps, probe {args.probe_ms:.0f} ms, calibration {args.calibrate_ms:.0f} ms "
+          f"(simulated); Tk stalls ≥ {monitor.threshold_ms:.0f} ms")
+    for label, reports in rows:
+        worst = max(r["max_ms"] for r in reports)
+        total = sum(r["total_ms"] for r in reports) / len(reports)
+        print(f"  {label:<24} worst stall {worst:8.1f} ms   stalled {total:8.1f} ms per run  (n={len(reports)})")
+    print(f"  device cache: {cache.stats['probes']} probes, {cache.stats['hits']} hits, "
+          f"{cache.stats['invalidations']} hot-plug invalidations")
+    monitor.stop()
+    root.destroy()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+# bench/bench_store.py
+
+"""
+Stress test of settings_store.SettingsStore.
+
+  threads    many threads hammer update()/put() at once.  Reports what a
+             caller (e.g. the Tk thread) pays per change against the old
+             synchronous save_json, how many writes the debouncing left,
+             and checks that a fresh store reads every thread's last value.
+  kill       writer processes (two at a time, on the same files) write in
+             a loop and are killed at random moments, often mid-write.
+             After every kill a fresh store has to load complete,
+             self-consistent documents, recovering from the write-ahead
+             tmp file or the .bak when needed.
+  corrupt    a truncated file and a garbage file are recovered from the
+             last good copy, and an old-schema file is migrated.
+
+    python bench/bench_store.py [--threads 8] [--updates 2000] [--kills 40]
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from settings_store import Document, SettingsStore, read_json  # noqa: E402
+
+
+def _v2(data, folder):
+    data = dict(data)
+    data.setdefault("mic_index", (read_json(folder / "selected_mic.json") or {}).get("device_index"))
+    return data
+
+
+DOCS = {
+    "settings": Document("va_settings.json", version=2, migrations=(_v2,)),
+    "apps":     Document("apps_index.json"),
+}
+
+
+def payload(seq, size):
+    """An apps-index-sized document whose checksum says whether it is whole."""
+    items = {f"app {seq} {i}": f"C:/Programs/app_{seq}_{i}.exe" for i in range(size)}
+    return {"seq": seq, "items": items, "check": checksum(items)}
+
+
+def checksum(items):
+    return hashlib.sha1(json.dumps(items, sort_keys=True).encode()).hexdigest()
+
+
+def pct(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+# ── writer process (kill test) ───────────────────────────────────────────
+
+def child(folder, name, size):
+    store = SettingsStore(folder, DOCS, delay=0.0)
+    seq = 0
+    while True:
+        seq += 1
+        store.put("apps", payload(seq, size))
+        store.update("settings", **{name: seq, "last": name})
+        store.flush()
+
+
+# ── tests ────────────────────────────────────────────────────────────────
+
+def threads_test(args):
+    with tempfile.TemporaryDirectory() as folder:
+        store = SettingsStore(folder, DOCS, delay=0.05, max_delay=0.5)
+        big = payload(0, args.size)
+        lat = []
+
+        def hammer(t):
+            for n in range(1, args.updates + 1):
+                t0 = time.perf_counter()
+                if n % 100 == 0:
+                    store.put("apps", dict(big, seq=n))
+                else:
+                    store.update("settings", **{f"t{t}": n})
+                lat.append((time.perf_counter() - t0) * 1e6)
+        workers = [threading.Thread(target=hammer, args=(t,)) for t in range(args.threads)]
+        t0 = time.perf_counter()
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join()
+        elapsed = time.perf_counter() - t0
+        store.close()
+        again = SettingsStore(folder, DOCS).get("settings")
+        last = max(n for n in range(1, args.updates + 1) if n % 100)
+        assert all(again[f"t{t}"] == last for t in range(args.threads)), again
+
+        # the old way: every change rewrites the file on the caller's thread
+        old, path = [], Path(folder) / "old.json"
+        data = {f"t{t}": 0 for t in range(args.threads)}
+        for n in range(200):
+            data["t0"] = n
+            t1 = time.perf_counter()
+            path.write_text(json.dumps(data, indent=2))
+            old.append((time.perf_counter() - t1) * 1e6)
+    print(f"threads: {args.threads} × {args.updates} changes in {elapsed:.2f} s")
+    print(f"  per change, caller    p50 {pct(lat, .5):8.1f} µs  p95 {pct(lat, .95):8.1f} µs")
+    print(f"  old save_json         p50 {pct(old, .5):8.1f} µs  p95 {pct(old, .95):8.1f} µs  (small file, no fsync)")
+    print(f"  {store.stats['updates']} changes → {store.stats['writes']} file writes; "
+          "a fresh store read every thread's last value")
+
+
+def kill_test(args):
+    rnd = random.Random(0)
+    recovered = killed_mid = 0
+    with tempfile.TemporaryDirectory() as folder:
+        for k in range(args.kills):
+            before = set(Path(folder).glob("*.tmp"))
+            procs = [subprocess.Popen([sys.executable, __file__, "--child", folder, f"w{i}", str(args.size)])
+                     for i in range(2)]
+            time.sleep(rnd.uniform(0.15, 0.6))          # interpreter start-up, then writes
+            for p in procs:
+                p.kill()
+            for p in procs:
+                p.wait()
+            killed_mid += bool(set(Path(folder).glob("*.tmp")) - before)
+            store = SettingsStore(folder, DOCS)
+            apps, settings = store.get("apps"), store.get("settings")
+            if k > 0 or apps:
+                assert apps and apps["check"] == checksum(apps["items"]), f"round {k}: torn apps_index.json"
+                assert settings.get("last") in ("w0", "w1"), f"round {k}: settings {settings}"
+            recovered += store.stats["recovered"]
+            store.close()
+    print(f"kill: {args.kills} rounds of two writer processes killed at random; killed mid-write "
+          f"(tmp file left behind) in {killed_mid}, recovered from tmp/.bak {recovered} times; "
+          "every load complete and consistent")
+
+
+def corrupt_test(args):
+    with tempfile.TemporaryDirectory() as folder:
+        f = Path(folder)
+        (f / "selected_mic.json").write_text('{"device_index": 3}')
+        (f / "va_settings.json").write_text('{"media_player": "vlc.exe"}')        # version 1
+        store = SettingsStore(folder, DOCS)
+        assert store.get("settings") == {"media_player": "vlc.exe", "mic_index": 3}
+        store.close()
+        assert read_json(f / "va_settings.json")["_schema"] == 2
+        for n in (1, 2):
+            store = SettingsStore(folder, DOCS)
+            store.put("apps", payload(n, args.size))
+            store.close()
+        text = (f / "apps_index.json").read_text()
+        for broken in (text[:len(text) // 2], "\x00garbage"):
+            (f / "apps_index.json").write_text(broken)
+            store = SettingsStore(folder, DOCS)
+            apps = store.get("apps")
+            assert apps["seq"] == 1 and apps["check"] == checksum(apps["items"]), apps.get("seq")
+            assert store.problems and "recovered from apps_index.json.bak" in store.problems[0], store.problems
+            store.close()
+            assert read_json(f / "apps_index.json")["seq"] == 1
+    print("corrupt: truncated and garbage files recovered from .bak; v1 settings migrated to v2")
+
+
+def main():
+    if len(sys.argv) == 5 and sys.argv[1] == "--child":
+        child(sys.argv[2], sys.argv[3], int(sys.argv[4]))
+        return
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--threads", type=int, default=8)
+    ap.add_argument("--updates", type=int, default=2000)
+    ap.add_argument("--kills", type=int, default=40)
+    ap.add_argument("--size", type=int, default=2000, help="entries in the apps document")
+    args = ap.parse_args()
+    threads_test(args)
+    kill_test(args)
+    corrupt_test(args)
+
+
+if __name__ == "__main__":
+    main()
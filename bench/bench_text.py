@@ -0,0 +1,117 @@
+# bench/bench_text.py
+
+"""
+Typing mode on a fake input sink: characters per second, time to the
+last character, and how long the pipeline executor is held up.
+
+The sink is platforms.fake.FakeTextInput with a cost per OS call and per
+key event.  The old path is pyautogui.write, which pressed one character
+per call; the new one is text_output.TextOutput, which hands whatever is
+queued to the backend as one write().  The cost model is an assumption
+(see --call-ms / --key-us), not a measurement of Windows.
+
+Also checks that a dictation with voice edits ("изтрий последната дума",
+"new line", "scratch that", …) leaves the expected text on the sink.
+
+    python bench/bench_text.py [--call-ms 0.5] [--key-us 20] [--runs 3]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from platforms.fake import FakeTextInput  # noqa: E402
+from text_output import TextOutput  # noqa: E402
+
+SENTENCE = ("The quarterly report is attached, the numbers for March are still preliminary "
+            "and we will send the corrected version together with the summary for the board "
+            "before the end of next week, please let me know if anything is missing")
+BURST = ["здравей", "как си", "днес ще закъснея малко", "see you at the meeting",
+         "the file is on the shared drive", "благодаря", "call me when you can",
+         "ще се видим утре", "regards", "Иван"]
+EDIT_SCRIPT = [
+    ("здравей Мария", "здравей Мария "),
+    ("how are you today", "здравей Мария how are you today "),
+    ("delete last word", "здравей Мария how are you "),
+    ("нов ред", "здравей Мария how are you \n"),
+    ("ще закъснея", "здравей Мария how are you \nще закъснея "),
+    ("scratch that", "здравей Мария how are you \n"),
+    ("ще дойда навреме", "здравей Мария how are you \nще дойда навреме "),
+    ("Изтрий последната дума.", "здравей Мария how are you \nще дойда "),
+    ("new paragraph", "здравей Мария how are you \nще дойда \n\n"),
+    ("поздрави", "здравей Мария how are you \nще дойда \n\nпоздрави "),
+    ("ентър", "здравей Мария how are you \nще дойда \n\nпоздрави \n"),
+]
+
+
+def old_write(sink, text):
+    """pyautogui.write: one press (its own OS call) per character."""
+    for ch in text:
+        sink.write(ch)
+
+
+def measure_old(sink, phrases):
+    """(seconds the executor was held per phrase, time to last char)."""
+    held, t0 = [], time.perf_counter()
+    for p in phrases:
+        t = time.perf_counter()
+        old_write(sink, p + " ")
+        held.append(time.perf_counter() - t)
+    return held, time.perf_counter() - t0
+
+
+def measure_new(sink, phrases):
+    out = TextOutput(sink).start()
+    out.wait()
+    calls = len(sink.log)
+    held, t0 = [], time.perf_counter()
+    for p in phrases:
+        t = time.perf_counter()
+        out.dictate(p)
+        held.append(time.perf_counter() - t)
+    out.wait()
+    return held, time.perf_counter() - t0, len(sink.log) - calls
+
+
+def best(fn, runs):
+    results = [fn() for _ in range(runs)]
+    return min(results, key=lambda r: r[1])
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--call-ms", type=float, default=0.5, help="cost of one OS input call")
+    ap.add_argument("--key-us", type=float, default=20.0, help="cost per key event in a call")
+    ap.add_argument("--runs", type=int, default=3)
+    args = ap.parse_args()
+    cost = {"call_s": args.call_ms / 1e3, "key_s": args.key_us / 1e6}
+
+    print(f"fake sink: {args.call_ms} ms per call + {args.key_us} µs per key")
+    print(f"  {'':<28}{'old held':>10}{'new held':>10}{'old TTLC':>10}{'new TTLC':>10}"
+          f"{'old cps':>9}{'new cps':>9}  OS calls old → new")
+    for label, phrases in ((f"one sentence ({len(SENTENCE)} chars)", [SENTENCE]),
+                           (f"burst of {len(BURST)} phrases", BURST)):
+        chars = sum(len(p) + 1 for p in phrases)
+        old_held, old_ttlc = best(lambda: measure_old(FakeTextInput([], **cost), phrases), args.runs)
+        new_held, new_ttlc, calls = best(lambda: measure_new(FakeTextInput([], **cost), phrases), args.runs)
+        print(f"  {label:<28}{sum(old_held) * 1e3:8.1f}ms{sum(new_held) * 1e3:8.2f}ms"
+              f"{old_ttlc * 1e3:8.1f}ms{new_ttlc * 1e3:8.2f}ms"
+              f"{chars / old_ttlc:9.0f}{chars / new_ttlc:9.0f}  {chars} → {calls}")
+    print("  held: time the pipeline executor spends per dictation (the next command waits for it)")
+    print("  TTLC: from the first phrase being handed over to the last character reaching the sink")
+
+    sink = FakeTextInput([])
+    out = TextOutput(sink)
+    for phrase, expect in EDIT_SCRIPT:
+        out.dictate(phrase)
+        out.wait()
+        assert sink.screen == expect, (phrase, sink.screen, expect)
+    print(f"edits: {len(EDIT_SCRIPT)} phrases ({out.stats['edits']} edits) leave the expected text; "
+          f"{out.stats['calls']} sink calls")
+
+
+if __name__ == "__main__":
+    main()
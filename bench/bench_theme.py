@@ -0,0 +1,122 @@
+# bench/bench_theme.py
+
+"""
+Theme switch time on a window with a few thousand widgets: the old
+recursive apply_theme (a Python walk that configures every widget)
+against theme_engine.ThemeEngine (one Tcl call to list the tree, one
+batched script for the widgets whose options changed).
+
+Needs a display (Tk).
+
+    python bench/bench_theme.py [--widgets 3000] [--runs 5]
+"""
+
+import argparse
+import sys
+import time
+import tkinter as tk
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from theme_engine import ThemeEngine, normalize  # noqa: E402
+
+LIGHT = {"bg": "#f0f0f0", "fg": "#000000", "button_bg": "#e0e0e0", "button_fg": "#000000"}
+DARK = {"bg": "#000000", "fg": "#FFFFFF", "button_bg": "#333333", "button_fg": "#FFFFFF",
+        "module": "themes.darkmode"}
+DARK_BLUE_BUTTONS = dict(DARK, button_bg="#1e3a5f")
+
+
+def old_apply_theme(root, th):
+    """voice_assistant_new_ui.apply_theme before the theme engine (with the key fixed)."""
+    bg, fg = th["bg"], th["fg"]
+    bb, bf = th.get("btn_bg"), th.get("btn_fg")
+    root.configure(bg=bg)
+
+    def walk(w):
+        for c in w.winfo_children():
+            cls = c.__class__.__name__
+            if cls in ("Frame", "Toplevel"):
+                c.configure(bg=bg)
+            if cls == "Label":
+                c.configure(bg=bg, fg=fg)
+            if cls == "Button":
+                c.configure(bg=bb, fg=bf)
+            walk(c)
+    walk(root)
+
+
+def build(root, n):
+    """Rows of frames holding labels, buttons, entries and check buttons: about n widgets."""
+    count = 0
+    while count < n:
+        row = tk.Frame(root)
+        row.pack()
+        for _ in range(4):
+            cell = tk.Frame(row)
+            cell.pack(side=tk.LEFT)
+            tk.Label(cell, text="label").pack()
+            tk.Button(cell, text="button").pack()
+            tk.Entry(cell).pack()
+            tk.Checkbutton(cell, text="check").pack()
+            count += 5
+        count += 1
+    root.update_idletasks()
+    return count
+
+
+def best_ms(fn, runs):
+    best = float("inf")
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1e3
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--widgets", type=int, default=3000)
+    ap.add_argument("--runs", type=int, default=5)
+    args = ap.parse_args()
+
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        sys.exit(f"needs a display: {e}")
+    n = build(root, args.widgets)
+    themes = {name: normalize(name, t)[0] for name, t in
+              (("light", LIGHT), ("dark", DARK), ("dark, blue buttons", DARK_BLUE_BUTTONS))}
+    light, dark, blue = themes["light"], themes["dark"], themes["dark, blue buttons"]
+
+    flip = iter(range(10 ** 9))
+    old = best_ms(lambda: old_apply_theme(root, (light, dark)[next(flip) % 2]), args.runs)
+
+    engine = ThemeEngine(root)
+    t0 = time.perf_counter()
+    first = engine.apply(light)
+    cold = (time.perf_counter() - t0) * 1e3
+    stats = {}
+
+    def switch(theme):
+        stats.update(engine.apply(theme))
+    results = []
+    for label, a, b in (("switch light ↔ dark", light, dark), ("buttons only", dark, blue)):
+        flip = iter(range(10 ** 9))
+        results.append((label, best_ms(lambda: switch((a, b)[next(flip) % 2]), args.runs), dict(stats)))
+    results.append(("same theme again", best_ms(lambda: switch(blue), args.runs), dict(stats)))
+
+    print(f"{n} widgets")
+    print(f"  old apply_theme (switch)        {old:9.2f} ms   configures every widget")
+    print(f"  engine, first apply             {cold:9.2f} ms   {first['configured']} configured")
+    for label, ms, s in results:
+        print(f"  engine, {label:<24}{ms:9.2f} ms   {s['configured']} of {s['widgets']} configured")
+    assert results[-1][2]["configured"] == 0
+    b = next(w for w in root.winfo_children()[0].winfo_children()[0].winfo_children()
+             if isinstance(w, tk.Button))
+    assert b.cget("background") == blue["btn_bg"], "buttons got the theme colour"
+    root.destroy()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+# bench/bench_windows.py
+
+"""
+"switch to …" lookups: the old enumerate-and-substring-match against the
+event-driven WindowRegistry, on the fake window backend holding thousands
+of windows.  Also churns windows (open / rename / close) through the event
+path and checks the registry still matches the backend, and that focus
+recency picks between windows of the same app.
+
+    python bench/bench_windows.py [--windows 5000] [--queries 500]
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bench_dispatch import synthetic_apps  # noqa: E402
+from platforms import create_platform  # noqa: E402
+from window_registry import WindowRegistry, program_name  # noqa: E402
+
+DOCS = ["report", "inbox", "notes", "budget", "todo", "draft", "invoice", "plan", "photos", "music"]
+
+
+def populate(wm, n, apps, rnd):
+    """n windows spread over `apps`; titles look like "doc 12 - App Name".  Returns the apps used."""
+    used = set()
+    for h in range(1, n + 1):
+        name = rnd.choice(apps)
+        used.add(name)
+        wm.open_window(h, f"{rnd.choice(DOCS)} {h} - {name.title()}", h, f"C:/Programs/{name.replace(' ', '_')}.exe")
+    return sorted(used)
+
+
+def timed(fn, queries):
+    lat = []
+    for q in queries:
+        t0 = time.perf_counter()
+        fn(q)
+        lat.append((time.perf_counter() - t0) * 1e6)
+    lat.sort()
+    return lat[len(lat) // 2], lat[int(len(lat) * 0.95)]
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--windows", type=int, default=5000)
+    ap.add_argument("--apps", type=int, default=300)
+    ap.add_argument("--queries", type=int, default=500)
+    args = ap.parse_args()
+
+    rnd = random.Random(0)
+    apps = synthetic_apps(args.apps)
+    wm = create_platform("fake").windows
+    with_windows = populate(wm, args.windows, apps, rnd)
+
+    t0 = time.perf_counter()
+    reg = WindowRegistry(wm)
+    reg.start()
+    print(f"{args.windows} windows, {len(apps)} apps; registry built in "
+          f"{(time.perf_counter() - t0) * 1e3:.1f} ms (events: {reg.evented})")
+
+    queries = [rnd.choice(with_windows) for _ in range(args.queries)]
+    legacy = timed(wm.find, queries)
+    registry = timed(lambda q: reg.best(q, f"C:/Programs/{q.replace(' ', '_')}.exe"), queries)
+    title_only = timed(reg.best, queries)
+    print(f"  legacy find (scan)       p50 {legacy[0]:9.1f} µs  p95 {legacy[1]:9.1f} µs")
+    print(f"  registry (title + exe)   p50 {registry[0]:9.1f} µs  p95 {registry[1]:9.1f} µs")
+    print(f"  registry (title only)    p50 {title_only[0]:9.1f} µs  p95 {title_only[1]:9.1f} µs")
+
+    # the chosen window belongs to the requested app
+    right = sum(program_name(wm.info(reg.best(q, f"C:/Programs/{q.replace(' ', '_')}.exe")).exe)
+                == q.replace(" ", "_") for q in queries)
+    print(f"  picked a window of the requested app: {right}/{len(queries)}")
+
+    # churn through events, then compare with the backend
+    next_handle, alive = args.windows + 1, list(wm.titles)
+    t0 = time.perf_counter()
+    for _ in range(args.windows // 2):
+        op = rnd.random()
+        if op < 0.4 or not alive:
+            name = rnd.choice(apps)
+            wm.open_window(next_handle, f"new {next_handle} - {name.title()}", next_handle,
+                           f"C:/Programs/{name.replace(' ', '_')}.exe")
+            alive.append(next_handle)
+            next_handle += 1
+        elif op < 0.7:
+            h = rnd.choice(alive)
+            wm.set_title(h, f"{rnd.choice(DOCS)} renamed {h} - {wm.titles[h].rsplit(' - ', 1)[-1]}")
+        else:
+            i = rnd.randrange(len(alive))
+            alive[i], alive[-1] = alive[-1], alive[i]
+            wm.close_window(alive.pop())
+    churn_ms = (time.perf_counter() - t0) * 1e3
+    consistent = {w.handle: w for w in reg.windows()} == {w.handle: w for w in wm.windows()}
+    print(f"  {args.windows // 2} window events applied in {churn_ms:.1f} ms; registry matches backend: {consistent}")
+    assert consistent
+
+    # recency: of two windows of one app with equal titles, the one focused last wins
+    exe = "C:/Programs/recency_test.exe"
+    wm.open_window("a", "recency test", 1, exe)
+    wm.open_window("b", "recency test", 2, exe)
+    wm.activate("a"); wm.activate("b")
+    first = reg.best("recency test", exe)
+    wm.activate("a")
+    second = reg.best("recency test", exe)
+    print(f"  most recently focused wins: {first == 'b' and second == 'a'}")
+    assert first == "b" and second == "a"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+# commands.py
+
+"""
+Table-driven command dispatcher.
+
+Phrases are registered as data instead of another `if lower in (...)` branch:
+  1) exact phrases   → one dict lookup on the normalized utterance
+  2) verb + argument → word trie, longest verb prefix wins ("смени на …")
+  3) intents         → optional classifier (intents.py) mapping paraphrases
+                        onto the labels of exact phrases
+  4) fallbacks       → tried in order, only when nothing above matched
+"""
+
+
+def normalize(text: str) -> str:
+    """Lower-case and collapse whitespace so lookups are stable."""
+    return " ".join(text.lower().split())
+
+
+class CommandRegistry:
+    def __init__(self):
+        self._exact = {}       # phrase → (label, handler())
+        self._trie = {}        # word → {..., None: (label, handler(rest))}
+        self._fallbacks = []   # [(label, handler(text) -> bool)]
+        self._labels = {}      # label → handler() of exact phrases
+        self._intents = None
+
+    # ── Registration ─────────────────────────────────────────────
+
+    def add_exact(self, phrases, handler, label=None):
+        """Register `handler()` for every phrase in `phrases`."""
+        if isinstance(phrases, str):
+            phrases = (phrases,)
+        for p in phrases:
+            self._exact[normalize(p)] = (label or p, handler)
+            self._labels[label or p] = handler
+
+    def add_prefix(self, verbs, handler, label=None):
+        """
+        Register `handler(rest)` for utterances starting with any of `verbs`.
+        A handler may return False to let dispatch continue to the fallbacks.
+        """
+        if isinstance(verbs, str):
+            verbs = (verbs,)
+        for v in verbs:
+            node = self._trie
+            for w in normalize(v).split():
+                node = node.setdefault(w, {})
+            node[None] = (label or v, handler)
+
+    def add_fallback(self, handler, label=None):
+        """Register `handler(text) -> bool`, tried after exact & prefix."""
+        self._fallbacks.append((label or getattr(handler, "__name__", "fallback"), handler))
+
+    def set_intents(self, classifier):
+        """
+        Use `classifier` (an intents.IntentClassifier) for utterances no
+        exact phrase or verb took.  It is seeded with every exact phrase
+        under its label; extra examples can be added to it directly.
+        """
+        for label, phrases in self.exact_phrases().items():
+            classifier.add(label, phrases)
+        self._intents = classifier.build()
+
+    def exact_phrases(self):
+        """{label: [phrases]} of everything registered with add_exact."""
+        out = {}
+        for phrase, (label, _) in self._exact.items():
+            out.setdefault(label, []).append(phrase)
+        return out
+
+    def prefix_verbs(self):
+        """{verb: label} of everything registered with add_prefix."""
+        out = {}
+
+        def walk(node, words):
+            for w, child in node.items():
+                if w is None:
+                    out[" ".join(words)] = child[0]
+                else:
+                    walk(child, words + [w])
+        walk(self._trie, [])
+        return out
+
+    # ── Lookup ───────────────────────────────────────────────────
+
+    def match_exact(self, text):
+        """Return (label, handler) for an exact phrase, or None."""
+        return self._exact.get(normalize(text))
+
+    def match_prefix(self, text):
+        """Return (label, handler, rest) for the longest verb prefix, or None."""
+        return self._match_words(text.lower().split())
+
+    def _match_words(self, words):
+        node, best = self._trie, None
+        for i, w in enumerate(words):
+            node = node.get(w)
+            if node is None:
+                break
+            if None in node:
+                best = node[None] + (" ".join(words[i + 1:]),)
+        return best
+
+    def dispatch(self, text, exact_only=False):
+        """
+        Route `text` to the first matching handler.
+        Returns the label of the handler that took it, or None.
+        """
+        # normalized once: the exact lookup and the trie walk share the words
+        words = text.lower().split()
+        key = " ".join(words)
+        hit = self._exact.get(key)
+        if hit:
+            label, handler = hit
+            handler()
+            return label
+        if exact_only:
+            return None
+
+        hit = self._match_words(words)
+        if hit:
+            label, handler, rest = hit
+            if handler(rest) is not False:
+                return label
+
+        if self._intents is not None:
+            label, _ = self._intents.classify_one(key)
+            if label in self._labels:
+                self._labels[label]()
+                return label
+
+        for label, handler in self._fallbacks:
+            if handler(text):
+                return label
+        return None
+
+    def __len__(self):
+        def count(node):
+            return sum(1 if k is None else count(v) for k, v in node.items())
+        return len(self._exact) + count(self._trie) + len(self._fallbacks)
@@ -0,0 +1,134 @@
+# devices.py
+
+"""
+Microphones and media players for the settings dialog, cached.
+
+open_settings used to probe every audio device through PyAudio and scan
+all of APP_COMMANDS for player keywords on the Tk thread each time the
+window opened.  DeviceCache probes once in the background (at start-up)
+and keeps the names.  It polls the platform's device signature (cheap:
+winmm, /dev/snd) every poll_s seconds and only re-probes when it changes,
+i.e. a device was plugged in or removed.  The player list is recomputed
+only when the app index has been swapped.
+
+Results go to callbacks, on whichever thread produced them; the dialog
+forwards them to the Tk thread.
+"""
+
+import threading
+import time
+
+PLAYER_KEYWORDS = ("player", "vlc", "spotify", "itunes", "winamp", "foobar")
+
+
+def find_players(apps):
+    """{friendly name: target} of the apps whose name looks like a media player."""
+    return {name: target for name, target in apps.items()
+            if any(k in name for k in PLAYER_KEYWORDS)}
+
+
+class DeviceCache:
+    def __init__(self, audio, poll_s=2.0):
+        self.audio = audio              # platforms AudioDevices
+        self.poll_s = poll_s
+        self._lock = threading.Lock()
+        self._mics = None               # input_names() of the last probe
+        self._sig = None                # device signature at that probe
+        self._probing = False
+        self._waiters = []              # callbacks for the probe in flight
+        self._listeners = []
+        self._players = (None, {})      # (apps dict they were found in, players)
+        self._started = False
+        self.stats = {"probes": 0, "hits": 0, "invalidations": 0}
+
+    # ── Lifecycle ────────────────────────────────────────────────
+
+    def start(self):
+        """Probe now and watch for hot-plug in the background.  Safe to call twice."""
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        self.microphones(lambda names: None)
+        threading.Thread(target=self._watch, daemon=True, name="device-cache").start()
+
+    def _watch(self):
+        if self._signature() is None:
+            return                      # the backend cannot tell; invalidate() by hand
+        while True:
+            time.sleep(self.poll_s)
+            sig = self._signature()
+            with self._lock:
+                changed = self._mics is not None and sig != self._sig
+            if changed:
+                self.invalidate()
+
+    def _signature(self):
+        try:
+            return self.audio.signature()
+        except Exception:
+            return None
+
+    # ── Microphones ──────────────────────────────────────────────
+
+    def microphones(self, callback):
+        """callback(names): right away if cached, else from the probe thread once it is done."""
+        with self._lock:
+            names = self._mics
+            if names is None:
+                self._waiters.append(callback)
+                if self._probing:
+                    return
+                self._probing = True
+            else:
+                self.stats["hits"] += 1
+        if names is not None:
+            callback(names)
+            return
+        threading.Thread(target=self._probe, daemon=True, name="device-probe").start()
+
+    def cached_microphones(self):
+        """The cached names, or None until a probe has finished."""
+        return self._mics
+
+    def invalidate(self):
+        """Forget the names and re-probe; on_change listeners get the new list."""
+        with self._lock:
+            self._mics = None
+            self.stats["invalidations"] += 1
+        self.microphones(self._notify)
+
+    def on_change(self, callback):
+        """Call callback(names) after every re-probe caused by invalidate()."""
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def _notify(self, names):
+        for cb in list(self._listeners):
+            cb(names)
+
+    def _probe(self):
+        sig = self._signature()         # taken first: a change during the probe is caught next poll
+        try:
+            names = list(self.audio.input_names())
+        except Exception:
+            names = []
+        with self._lock:
+            self.stats["probes"] += 1
+            self._mics, self._sig, self._probing = names, sig, False
+            waiters, self._waiters = self._waiters, []
+        for cb in waiters:
+            cb(names)
+
+    # ── Players ──────────────────────────────────────────────────
+
+    def players(self, apps):
+        """find_players(apps), reused while `apps` is the same dict (it is replaced, never edited)."""
+        src, players = self._players
+        if src is not apps:
+            players = find_players(apps)
+            self._players = (apps, players)
+        return players
@@ -0,0 +1,172 @@
+# gif_frames.py
+
+"""
+Animated GIF frames, decoded once per file and size, and played without
+needless wake-ups.
+
+VoiceAssistantApp used to decode and LANCZOS-resize every frame of
+annoying_dog.gif on every start.  load_frames() stores the scaled RGBA
+frames and their durations in one file under cache_dir.  The file is
+keyed by a hash of the GIF bytes and the target size, so later starts
+read raw pixels back instead of decoding.  Loaded frames are also kept
+in memory per key, so every widget that shows the same GIF shares them.
+
+Layout of a .frames file:
+
+    8 bytes   magic  b"VAFRAME1"
+    4 bytes   little-endian header length N
+    N bytes   UTF-8 JSON header: {"size": [w, h], "durations": [ms, …]}
+    …         w*h*4 bytes of RGBA per frame
+
+GifAnimator plays frames on a Tk label, each for its own duration.  It
+stops scheduling while the window is minimized, or once nothing has
+happened for idle_s seconds.  poke() (any activity) starts it again.
+"""
+
+import hashlib
+import json
+import os
+import struct
+import threading
+import time
+from pathlib import Path
+
+MAGIC = b"VAFRAME1"
+DEFAULT_DELAY_MS = 100      # GIFs with no (or a ≤10 ms) delay play at 10 fps, as browsers do
+MIN_DELAY_MS = 20
+
+_loaded = {}                # cache key → [(PIL image, duration ms)], shared by every caller
+_lock = threading.Lock()
+
+
+def cache_key(path, size):
+    digest = hashlib.sha1(Path(path).read_bytes()).hexdigest()[:16]
+    return f"{digest}_{size[0]}x{size[1]}"
+
+
+def decode(path, size):
+    """[(RGBA image scaled to `size`, duration ms)] straight from the GIF."""
+    from PIL import Image, ImageSequence
+    out = []
+    with Image.open(path) as img:
+        for frame in ImageSequence.Iterator(img):
+            ms = frame.info.get("duration") or 0
+            out.append((frame.convert("RGBA").resize(size, Image.LANCZOS),
+                        ms if ms > 10 else DEFAULT_DELAY_MS))
+    return out
+
+
+def write(path, frames):
+    """Store decode() output in the .frames layout (temp file, then rename)."""
+    size = frames[0][0].size
+    header = json.dumps({"size": list(size), "durations": [ms for _, ms in frames]}).encode()
+    tmp = Path(f"{path}.tmp")
+    with open(tmp, "wb") as f:
+        f.write(MAGIC + struct.pack("<I", len(header)) + header)
+        for img, _ in frames:
+            f.write(img.tobytes())
+    os.replace(tmp, path)
+
+
+def read(path):
+    """decode() output back from a .frames file."""
+    from PIL import Image
+    data = Path(path).read_bytes()
+    if data[:8] != MAGIC:
+        raise ValueError(f"{path}: not a frames file")
+    (n,) = struct.unpack_from("<I", data, 8)
+    header = json.loads(data[12:12 + n])
+    w, h = header["size"]
+    step, off = w * h * 4, 12 + n
+    if len(data) != off + step * len(header["durations"]):
+        raise ValueError(f"{path}: truncated")
+    return [(Image.frombytes("RGBA", (w, h), data[off + i * step:off + (i + 1) * step]), ms)
+            for i, ms in enumerate(header["durations"])]
+
+
+def load_frames(path, size, cache_dir):
+    """
+    [(PIL image, duration ms)] of the GIF at `path` scaled to `size`: from
+    memory, else from cache_dir, else decoded (and written to cache_dir).
+    """
+    key = cache_key(path, size)
+    with _lock:
+        frames = _loaded.get(key)
+    if frames is not None:
+        return frames
+    cached = Path(cache_dir) / f"{key}.frames"
+    try:
+        frames = read(cached)
+    except (OSError, ValueError):
+        frames = decode(path, size)
+        try:
+            cached.parent.mkdir(parents=True, exist_ok=True)
+            for old in cached.parent.glob(f"*_{size[0]}x{size[1]}.frames"):
+                old.unlink()            # an earlier version of the GIF
+            write(cached, frames)
+        except OSError:
+            pass
+    with _lock:
+        return _loaded.setdefault(key, frames)
+
+
+class GifAnimator:
+    def __init__(self, root, label, images, durations, idle_s=60.0, clock=time.monotonic):
+        self.root = root                # the window whose minimizing pauses the animation
+        self.label = label
+        self.images = images            # PhotoImages, one per frame
+        self.durations = [max(MIN_DELAY_MS, int(ms)) for ms in durations]
+        self.idle_s = idle_s
+        self._clock = clock
+        self._i = 0
+        self._job = None
+        self._visible = True
+        self._active = clock()          # last poke()
+        self.wakeups = 0                # after() callbacks run, for measuring
+
+    def start(self):
+        self.label.config(image=self.images[0])
+        self.root.bind("<Unmap>", self._on_unmap, add="+")
+        self.root.bind("<Map>", self._on_map, add="+")
+        self.root.bind("<Enter>", lambda e: self.poke(), add="+")
+        self._schedule()
+        return self
+
+    def stop(self):
+        if self._job is not None:
+            self.root.after_cancel(self._job)
+            self._job = None
+
+    def poke(self):
+        """Something happened: keep animating for another idle_s.  Any thread."""
+        self._active = self._clock()
+        if self._job is None:
+            self.root.after(0, self._schedule)
+
+    @property
+    def running(self):
+        return self._job is not None
+
+    def _schedule(self):
+        if self._job is None and self._visible and len(self.images) > 1 and not self._idle():
+            self._job = self.root.after(self.durations[self._i], self._tick)
+
+    def _idle(self):
+        return self._clock() - self._active > self.idle_s
+
+    def _tick(self):
+        self._job = None
+        self.wakeups += 1
+        self._i = (self._i + 1) % len(self.images)
+        self.label.config(image=self.images[self._i])
+        self._schedule()
+
+    def _on_unmap(self, event):
+        if event.widget is self.root:
+            self._visible = False
+            self.stop()
+
+    def _on_map(self, event):
+        if event.widget is self.root:
+            self._visible = True
+            self.poke()
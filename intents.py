@@ -0,0 +1,167 @@
+# intents.py
+
+"""
+Embedding-based intent classification for argument-free commands.
+
+Exact phrases only catch what was registered word for word; this stage
+catches paraphrases ("turn it up a bit", "дай по-силно") and mixed
+Bulgarian/English phrasing.  A transcript is hashed into a 128-dim bag of
+character trigrams and words (Cyrillic transliterated, so "плей" and
+"play" share features), encoded with the autoencoder from
+model_state.json, and compared by cosine similarity against a prototype
+matrix holding the encoding of every example phrase of every command.
+Classifying a batch is one matrix multiply plus a per-label max.
+
+Below the confidence threshold, or too close to a second label, the
+transcript is left to the usual rules.
+"""
+
+import zlib
+from functools import lru_cache
+
+import numpy as np
+
+THRESHOLD = 0.78    # minimum cosine similarity to accept
+MARGIN = 0.04       # … and at least this much above the best other label
+
+_TRANSLIT = str.maketrans({
+    "а": "a", "б": "b", "в": "v", "г": "g", "д": "d", "е": "e", "ж": "zh", "з": "z",
+    "и": "i", "й": "y", "к": "k", "л": "l", "м": "m", "н": "n", "о": "o", "п": "p",
+    "р": "r", "с": "s", "т": "t", "у": "u", "ф": "f", "х": "h", "ц": "ts", "ч": "ch",
+    "ш": "sh", "щ": "sht", "ъ": "a", "ь": "y", "ю": "yu", "я": "ya",
+})
+
+# filler that carries no intent; dropped unless nothing else is left
+STOPWORDS = frozenset((
+    "a", "the", "it", "this", "bit", "little", "please", "make", "one", "to", "some",
+    "моля", "малко", "на", "го", "ми", "я", "ги", "това", "още",
+))
+
+# Paraphrases per command label, on top of the phrases the label was
+# registered with.  Kept short: each one is a row in the prototype matrix.
+EXAMPLES = {
+    "volume.up": ("turn it up", "turn it up a bit", "louder", "a bit louder", "increase volume",
+                  "volume higher", "по-силно", "дай по-силно", "усили звука", "увеличи звука",
+                  "пусни по-силно", "звук нагоре", "volume нагоре"),
+    "volume.down": ("turn it down", "turn it down a bit", "quieter", "a bit quieter", "lower the volume",
+                    "decrease volume", "по-тихо", "дай по-тихо", "намали звука", "звук надолу",
+                    "volume надолу"),
+    "volume.mute": ("mute the sound", "silence", "спри звука", "заглуши", "без звук", "mute звука"),
+    "volume.unmute": ("sound back on", "turn the sound back on", "пусни звука", "върни звука",
+                      "включи звука"),
+    "media.pause": ("pause the music", "pause the song", "hold on pause", "пауза на музиката",
+                    "паузирай", "сложи пауза", "pause песента"),
+    "media.play": ("continue playing", "resume the music", "play the music", "продължи музиката",
+                   "пусни музиката", "resume песента"),
+    "media.next": ("next song", "next track", "skip", "skip this song", "skip track",
+                   "следващата", "пусни следващата", "прескочи", "next песен"),
+    "media.previous": ("previous song", "previous track", "go back a song", "last song",
+                       "предишната", "пусни предишната", "върни песента", "previous песен"),
+    "media.stop": ("stop the music", "stop playing", "спри музиката", "спри песента", "stop музиката"),
+}
+
+
+def _tokens(text):
+    """Character trigrams of each padded word, plus the words themselves."""
+    words = text.lower().split()
+    words = [w for w in words if w not in STOPWORDS] or words
+    words = [w.translate(_TRANSLIT) for w in words]
+    grams = []
+    for w in words:
+        p = f" {w} "
+        grams.extend(p[i:i + 3] for i in range(len(p) - 2))
+    return grams, words
+
+
+@lru_cache(maxsize=65536)
+def _slot(token, dim):
+    """Stable (index, ±1) for a token.  crc32, not hash(): that is salted per process."""
+    h = zlib.crc32(token.encode("utf-8"))
+    return h % dim, 1.0 if h & 0x80000000 else -1.0
+
+
+def featurize(texts, dim=128, word_weight=2.0):
+    """(len(texts), dim) L2-normalized hashed feature vectors."""
+    rows, cols, vals = [], [], []
+    for r, text in enumerate(texts):
+        grams, words = _tokens(text)
+        for tokens, weight in ((grams, 1.0), (words, word_weight)):
+            for tok in tokens:
+                c, sign = _slot(tok, dim)
+                rows.append(r)
+                cols.append(c)
+                vals.append(sign * weight)
+    x = np.zeros((len(texts), dim), dtype=np.float32)
+    np.add.at(x, (np.array(rows, dtype=np.intp), np.array(cols, dtype=np.intp)), vals)
+    norms = np.linalg.norm(x, axis=1, keepdims=True)
+    return x / np.maximum(norms, 1e-8)
+
+
+class IntentClassifier:
+    def __init__(self, model, threshold=THRESHOLD, margin=MARGIN):
+        self.model = model
+        self.threshold = threshold
+        self.margin = margin
+        self._examples = {}         # label → [phrases]
+        self._protos = None         # (n_examples, code_dim), rows grouped by label
+        self._labels = []           # label of each group
+        self._starts = None         # first row of each group (for reduceat)
+        # encoding of the empty transcript; subtracted so the shared bias of
+        # the code layer does not dominate every cosine
+        self._origin = model.encode(np.zeros((1, model.input_dim), dtype=np.float32))[0]
+
+    # ── Prototypes ───────────────────────────────────────────────
+
+    def add(self, label, phrases):
+        if isinstance(phrases, str):
+            phrases = (phrases,)
+        self._examples.setdefault(label, []).extend(phrases)
+        self._protos = None
+
+    def _embed(self, texts):
+        z = self.model.encode(featurize(texts, self.model.input_dim)) - self._origin
+        return z / np.maximum(np.linalg.norm(z, axis=1, keepdims=True), 1e-8)
+
+    def build(self):
+        """Encode every example once into the prototype matrix."""
+        labels, phrases, starts = [], [], []
+        for label, ps in self._examples.items():
+            if ps:
+                labels.append(label)
+                starts.append(len(phrases))
+                phrases.extend(ps)
+        self._labels = labels
+        self._starts = np.array(starts, dtype=np.intp)
+        self._protos = np.ascontiguousarray(self._embed(phrases).T) if phrases else None
+        return self
+
+    def __len__(self):
+        return sum(len(p) for p in self._examples.values())
+
+    # ── Classification ───────────────────────────────────────────
+
+    def scores(self, texts):
+        """(len(texts), n_labels) best cosine similarity per label."""
+        if self._protos is None:
+            self.build()
+        if self._protos is None:
+            return np.zeros((len(texts), 0), dtype=np.float32)
+        sims = self._embed(texts) @ self._protos
+        return np.maximum.reduceat(sims, self._starts, axis=1)
+
+    def classify(self, texts):
+        """[(label or None, score)] for each text."""
+        s = self.scores(texts)
+        if not s.shape[1]:
+            return [(None, 0.0)] * len(texts)
+        best = s.argmax(1)
+        top = s[np.arange(len(s)), best]
+        if s.shape[1] > 1:
+            second = np.partition(s, -2, axis=1)[:, -2]
+        else:
+            second = np.full(len(s), -1.0)
+        ok = (top >= self.threshold) & (top - second >= self.margin)
+        return [(self._labels[b] if k else None, float(t)) for b, t, k in zip(best, top, ok)]
+
+    def classify_one(self, text):
+        return self.classify([text])[0]
@@ -0,0 +1,234 @@
+# kws.py
+
+"""
+On-device keyword spotting with NumPy: MFCC features + nearest-template
+classification under dynamic time warping.
+
+Two jobs, both before any audio leaves the machine:
+  - wake word: with it enabled, a phrase only goes to the cloud recognizer
+    if it starts with the wake word (or follows one said on its own);
+  - direct commands: short fixed phrases (volume, media) are matched
+    against templates of earlier utterances of the same phrase and
+    executed without a cloud call.
+
+Templates are enrolled from the user's own audio (a recorded wake word,
+and every fixed-phrase command the cloud recognizer confirmed) and kept
+in kws_templates.npz.  Phrases the cloud recognizer heard as anything
+else are kept under OTHER, a garbage model: a direct command is only
+taken when it is closer to a command than to those.
+"""
+
+import os
+import threading
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+
+WAKE = "__wake__"
+OTHER = "__other__"     # utterances that were not a fixed phrase
+MIN_TEMPLATES = 2       # a label needs this many before it is used
+MIN_COMMAND_TEMPLATES = 4   # … before it runs a command without the cloud
+MAX_TEMPLATES = 6       # per label, oldest dropped first
+MAX_OTHER = 24          # OTHER covers every non-command, so it keeps more
+THRESHOLD_SCALE = 1.35  # accept if distance ≤ this × the label's own spread
+COMMAND_SCALE = 0.8     # … for a direct command: a miss only costs a cloud call
+MARGIN = 0.85           # … and ≤ this × the best distance of any other label
+
+
+# ─── Features ────────────────────────────────────────────────────────────
+
+@lru_cache(maxsize=8)
+def _mel_dct(rate, n_fft, n_mels, n_mfcc):
+    def hz_to_mel(f):
+        return 2595 * np.log10(1 + f / 700.0)
+
+    def mel_to_hz(m):
+        return 700 * (10 ** (m / 2595.0) - 1)
+
+    mels = np.linspace(hz_to_mel(20), hz_to_mel(rate / 2), n_mels + 2)
+    bins = np.floor((n_fft + 1) * mel_to_hz(mels) / rate).astype(int)
+    fb = np.zeros((n_mels, n_fft // 2 + 1))
+    for m in range(1, n_mels + 1):
+        lo, mid, hi = bins[m - 1], bins[m], bins[m + 1]
+        if mid > lo:
+            fb[m - 1, lo:mid] = (np.arange(lo, mid) - lo) / (mid - lo)
+        if hi > mid:
+            fb[m - 1, mid:hi] = (hi - np.arange(mid, hi)) / (hi - mid)
+    k = np.arange(n_mels)
+    dct = np.cos(np.pi / n_mels * (k + 0.5)[None, :] * np.arange(n_mfcc)[:, None])
+    return fb.T, dct.T
+
+
+def mfcc(samples, rate, n_mfcc=13, n_mels=26, frame_ms=25, hop_ms=10):
+    """(frames × n_mfcc) cepstra with per-utterance mean removed."""
+    x = np.asarray(samples, dtype=np.float32)
+    x = np.append(x[:1], x[1:] - 0.97 * x[:-1])
+    n, hop = int(rate * frame_ms / 1000), int(rate * hop_ms / 1000)
+    if len(x) < n:
+        x = np.pad(x, (0, n - len(x)))
+    count = 1 + (len(x) - n) // hop
+    frames = x[np.arange(n)[None, :] + hop * np.arange(count)[:, None]] * np.hamming(n)
+    n_fft = 1 << (n - 1).bit_length()
+    power = np.abs(np.fft.rfft(frames, n_fft)) ** 2 / n_fft
+    fb, dct = _mel_dct(rate, n_fft, n_mels, n_mfcc)
+    cep = np.log(power @ fb + 1e-10) @ dct
+    return (cep - cep.mean(axis=0)).astype(np.float32)
+
+
+def dtw_distance(a, b):
+    """
+    Length-normalized DTW distance between two feature sequences.  The
+    horizontal step of each row is solved with a prefix-sum + running-min
+    scan, so the only Python loop is over the rows of `a`.
+    """
+    cost = np.sqrt(np.maximum(
+        (a * a).sum(1)[:, None] + (b * b).sum(1)[None, :] - 2 * a @ b.T, 0))
+    prev = np.full(len(b) + 1, np.inf)
+    prev[0] = 0.0
+    for row in cost:
+        diag = np.minimum(prev[1:], prev[:-1])          # from (i-1, j) or (i-1, j-1)
+        s = np.cumsum(row)
+        cur = s + np.minimum.accumulate(diag - np.concatenate(([0.0], s[:-1])))
+        prev = np.concatenate(([np.inf], cur))
+    return float(prev[-1]) / (len(a) + len(b))
+
+
+def audio_samples(audio):
+    """Float samples in -1..1 and the rate of a speech_recognition.AudioData."""
+    raw = audio.get_raw_data(convert_width=2)
+    return np.frombuffer(raw, dtype="<i2").astype(np.float32) / 32768.0, audio.sample_rate
+
+
+# ─── Spotter ─────────────────────────────────────────────────────────────
+
+class KeywordSpotter:
+    def __init__(self, path=None):
+        self.path = Path(path) if path else None
+        self._templates = {}            # label → [feature arrays]
+        self._spreads = {}              # label → cached _spread()
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()  # one writer of self.path at a time
+        if self.path and self.path.exists():
+            self.load()
+
+    # ── Templates ────────────────────────────────────────────────
+
+    def count(self, label):
+        return len(self._templates.get(label, ()))
+
+    def labels(self, min_templates=MIN_TEMPLATES):
+        return [l for l, t in self._templates.items() if len(t) >= min_templates]
+
+    def enroll(self, label, audio, save=True):
+        """Add one utterance of `label` (AudioData) as a template."""
+        feats = mfcc(*audio_samples(audio))
+        with self._lock:
+            ts = self._templates.setdefault(label, [])
+            ts.append(feats)
+            del ts[:-(MAX_OTHER if label == OTHER else MAX_TEMPLATES)]
+            self._spreads.pop(label, None)
+        if save and self.path:
+            self.save()
+
+    def forget(self, label):
+        with self._lock:
+            self._templates.pop(label, None)
+            self._spreads.pop(label, None)
+        if self.path:
+            self.save()
+
+    def _spread(self, label):
+        """Largest distance between two templates of `label` (cached)."""
+        if label not in self._spreads:
+            ts = self._templates[label]
+            self._spreads[label] = max(dtw_distance(a, b) for i, a in enumerate(ts) for b in ts[i + 1:])
+        return self._spreads[label]
+
+    def save(self):
+        """
+        Write every template to self.path.  enroll() calls this from the
+        pipeline workers, so writes are serialized and go through a tmp
+        file + os.replace: a reader never sees half an archive.
+        """
+        with self._save_lock:
+            with self._lock:
+                labels, arrays = [], {}
+                for label, ts in self._templates.items():
+                    for t in ts:
+                        arrays[f"t{len(labels)}"] = t
+                        labels.append(label)
+            tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+            with open(tmp, "wb") as f:          # a file object: savez would append ".npz" to a name
+                np.savez_compressed(f, labels=np.array(labels, dtype=str), **arrays)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.path)
+
+    def load(self):
+        # no pickles: the file sits in a user-writable folder.  An archive from
+        # before labels were saved as plain strings fails here and is re-learned.
+        try:
+            with np.load(self.path, allow_pickle=False) as z:
+                for i, label in enumerate(z["labels"]):
+                    self._templates.setdefault(str(label), []).append(z[f"t{i}"])
+        except (OSError, KeyError, ValueError):
+            self._templates = {}
+
+    # ── Matching ─────────────────────────────────────────────────
+
+    def classify(self, feats, labels=None, scale=THRESHOLD_SCALE):
+        """(label, distance) of the best accepted match, or (None, best distance)."""
+        with self._lock:
+            labels = [l for l in (labels or self.labels()) if len(self._templates.get(l, ())) >= MIN_TEMPLATES]
+            if not labels:
+                return None, float("inf")
+            best = {l: min(dtw_distance(feats, t) for t in self._templates[l]) for l in labels}
+            label = min(best, key=best.get)
+            d = best[label]
+            others = [v for l, v in best.items() if l != label]
+            if label == OTHER:                  # garbage wins: no spread needed
+                return label, d
+            if d > scale * self._spread(label):
+                return None, d
+            if others and d > MARGIN * min(others):
+                return None, d
+            return label, d
+
+    def match_command(self, audio):
+        """
+        Direct-command grammar: the phrase label, or None → use the cloud.
+        Only commands with MIN_COMMAND_TEMPLATES take part, and only once
+        OTHER has templates to lose to: without it one enrolled command
+        would have no competitor.  Phrases that sound close to a command
+        (one word swapped) are not in OTHER yet, so the accept threshold
+        is also tighter than for the wake word.
+        """
+        commands = [l for l in self.labels(MIN_COMMAND_TEMPLATES) if l not in (WAKE, OTHER)]
+        if not commands or self.count(OTHER) < MIN_TEMPLATES:
+            return None
+        label = self.classify(mfcc(*audio_samples(audio)), commands + [OTHER], COMMAND_SCALE)[0]
+        return None if label == OTHER else label
+
+    def spot_wake(self, audio, hop_ms=10):
+        """
+        If the phrase starts with the wake word, return the sample offset
+        where it ends; otherwise None.  Prefixes from 0.8× to 1.25× the
+        template length are tried.
+        """
+        if WAKE not in self.labels():
+            return None
+        samples, rate = audio_samples(audio)
+        feats = mfcc(samples, rate, hop_ms=hop_ms)
+        with self._lock:
+            lengths = sorted({int(len(t) * f) for t in self._templates[WAKE] for f in (0.8, 1.0, 1.25)})
+        best_end, best_d = None, float("inf")
+        for n in lengths:
+            if n > len(feats):
+                continue
+            label, d = self.classify(feats[:n] - feats[:n].mean(0), [WAKE])
+            if label and d < best_d:
+                best_end, best_d = n, d
+        if best_end is None:
+            return None
+        return min(len(samples), best_end * int(rate * hop_ms / 1000))
@@ -0,0 +1,181 @@
+# lnk.py
+
+"""
+Pure-Python reader for Windows Shell Link (.lnk) files ([MS-SHLLINK]).
+
+Replaces spawning `powershell (New-Object -COM WScript.Shell).CreateShortcut()`
+per shortcut.  Only what we need to find the target is parsed:
+LinkInfo local/network path, the environment-variable block, the
+LinkTargetIDList file-system items and the relative path.
+"""
+
+import ntpath
+import os
+import re
+import struct
+
+LINK_CLSID = bytes.fromhex("0114020000000000c000000000000046")
+
+# LinkFlags
+HAS_ID_LIST       = 0x0001
+HAS_LINK_INFO     = 0x0002
+HAS_NAME          = 0x0004
+HAS_RELATIVE_PATH = 0x0008
+HAS_WORKING_DIR   = 0x0010
+HAS_ARGUMENTS     = 0x0020
+HAS_ICON_LOCATION = 0x0040
+IS_UNICODE        = 0x0080
+
+# LinkInfoFlags
+VOLUME_ID_AND_LOCAL_BASE_PATH = 0x1
+COMMON_NETWORK_RELATIVE_LINK  = 0x2
+
+ENV_BLOCK_SIGNATURE = 0xA0000001
+
+
+class LnkError(ValueError):
+    pass
+
+
+def _cstr(buf, off, unicode=False):
+    """Null-terminated string at `off` (ANSI or UTF-16LE)."""
+    if unicode:
+        end = off
+        while end + 1 < len(buf) and buf[end:end + 2] != b"\0\0":
+            end += 2
+        return buf[off:end].decode("utf-16-le", "replace")
+    end = buf.find(b"\0", off)
+    if end < 0:
+        end = len(buf)
+    return buf[off:end].decode("mbcs" if os.name == "nt" else "cp1252", "replace")
+
+
+def _expand_env(path):
+    """Expand %VAR% the way Windows does, leaving unknown vars untouched."""
+    return re.sub(r"%([^%]+)%", lambda m: os.environ.get(m.group(1), m.group(0)), path)
+
+
+def _parse_id_list(buf):
+    """Best-effort path from LinkTargetIDList: drive item + file entry items."""
+    parts, off = [], 0
+    while off + 2 <= len(buf):
+        size = struct.unpack_from("<H", buf, off)[0]
+        if size < 2 or off + size > len(buf):
+            break
+        item = buf[off:off + size]
+        kind = item[2] & 0x70 if len(item) > 2 else 0
+        if kind == 0x20 and len(item) > 3:            # volume: "C:\"
+            parts = [_cstr(item, 3)]
+        elif kind == 0x30 and len(item) > 14:         # file entry
+            name = _cstr(item, 14)
+            # long name lives in the 0xBEEF0004 extension block
+            ext = item.find(b"\x04\x00\xef\xbe")
+            if ext >= 4:
+                _, version = struct.unpack_from("<HH", item, ext - 4)
+                name_off = ext - 4 + (20 if version < 7 else 38 if version < 9 else 42)
+                if name_off < len(item):
+                    long_name = _cstr(item, name_off, unicode=True)
+                    if long_name:
+                        name = long_name
+            if name:
+                parts.append(name)
+        off += size
+    if not parts or not parts[0].endswith(("\\", ":")):
+        return ""
+    return ntpath.join(*parts)
+
+
+class ShellLink:
+    """Parsed fields of a .lnk file.  `target` is what TargetPath returns."""
+
+    def __init__(self, data: bytes, lnk_path=None):
+        if len(data) < 0x4C or struct.unpack_from("<I", data, 0)[0] != 0x4C \
+                or data[4:20] != LINK_CLSID:
+            raise LnkError("not a shell link")
+        self.flags = struct.unpack_from("<I", data, 0x14)[0]
+        self.local_path = ""
+        self.network_path = ""
+        self.id_list_path = ""
+        self.env_target = ""
+        self.name = self.relative_path = self.working_dir = ""
+        self.arguments = self.icon_location = ""
+        self._lnk_path = lnk_path
+
+        off = 0x4C
+        if self.flags & HAS_ID_LIST:
+            size = struct.unpack_from("<H", data, off)[0]
+            self.id_list_path = _parse_id_list(data[off + 2:off + 2 + size])
+            off += 2 + size
+
+        if self.flags & HAS_LINK_INFO:
+            size = struct.unpack_from("<I", data, off)[0]
+            self._parse_link_info(data[off:off + size])
+            off += size
+
+        unicode = bool(self.flags & IS_UNICODE)
+        for flag, attr in ((HAS_NAME, "name"), (HAS_RELATIVE_PATH, "relative_path"),
+                           (HAS_WORKING_DIR, "working_dir"), (HAS_ARGUMENTS, "arguments"),
+                           (HAS_ICON_LOCATION, "icon_location")):
+            if self.flags & flag:
+                count = struct.unpack_from("<H", data, off)[0]
+                off += 2
+                nbytes = count * 2 if unicode else count
+                raw = data[off:off + nbytes]
+                setattr(self, attr, raw.decode("utf-16-le" if unicode else "cp1252", "replace"))
+                off += nbytes
+
+        # ExtraData blocks until the 4-byte terminal block
+        while off + 8 <= len(data):
+            size, sig = struct.unpack_from("<II", data, off)
+            if size < 8:
+                break
+            if sig == ENV_BLOCK_SIGNATURE and size >= 0x314:
+                self.env_target = (_cstr(data, off + 8 + 260, unicode=True)
+                                   or _cstr(data, off + 8))
+            off += size
+
+    def _parse_link_info(self, info):
+        if len(info) < 0x1C:
+            return
+        (_, hdr_size, flags, _, base_off, net_off, suffix_off) = struct.unpack_from("<7I", info, 0)
+        uni_base = uni_suffix = 0
+        if hdr_size >= 0x24:
+            uni_base, uni_suffix = struct.unpack_from("<II", info, 0x1C)
+        suffix = (_cstr(info, uni_suffix, True) if uni_suffix else
+                  _cstr(info, suffix_off) if suffix_off else "")
+
+        if flags & VOLUME_ID_AND_LOCAL_BASE_PATH:
+            base = _cstr(info, uni_base, True) if uni_base else _cstr(info, base_off)
+            self.local_path = base + suffix
+        elif flags & COMMON_NETWORK_RELATIVE_LINK and net_off:
+            net_name_off = struct.unpack_from("<I", info, net_off + 8)[0]
+            net_name = _cstr(info, net_off + net_name_off)
+            self.network_path = ntpath.join(net_name, suffix) if suffix else net_name
+
+    @property
+    def target(self):
+        if self.local_path:
+            return self.local_path
+        if self.network_path:
+            return self.network_path
+        if self.env_target:
+            return _expand_env(self.env_target)
+        if self.id_list_path:
+            return self.id_list_path
+        if self.relative_path and self._lnk_path:
+            base = ntpath.dirname(str(self._lnk_path))
+            return ntpath.normpath(ntpath.join(base, self.relative_path))
+        return ""
+
+
+def read_lnk(path) -> ShellLink:
+    with open(path, "rb") as f:
+        return ShellLink(f.read(), lnk_path=path)
+
+
+def resolve_target(path) -> str:
+    """Target path of the shortcut at `path`, or "" if it can't be read."""
+    try:
+        return read_lnk(path).target
+    except (OSError, LnkError, struct.error):
+        return ""
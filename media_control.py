@@ -1,71 +1,222 @@
 # media_control.py
 
-from winsdk.windows.media.control import (
-    GlobalSystemMediaTransportControlsSessionManager
-)
+"""
+Play/pause/next/previous through the system media session manager, on an
+asyncio loop of its own.
+
+The old controller ran request_async().get_results() and
+get_current_session() before every command, blocking the caller and
+asking the session manager again each time.  MediaController requests
+the manager once, keeps the current session cached and follows its
+current-session-changed, playback-info-changed and
+media-properties-changed events, so now_playing() is always at hand.
+
+Commands are coroutines on the controller's loop; from any other thread
+send()/submit() schedule one and return a concurrent.futures.Future at
+once.  The manager is anything shaped like winsdk's
+GlobalSystemMediaTransportControlsSessionManager (platforms/fake.py has
+an in-memory one):
+
+    mc = MediaController(FakeMediaSessionManager(log).request_async).start()
+    mc.send("next").result()
+"""
+
+import asyncio
+import threading
+from typing import NamedTuple
+
+
+# GlobalSystemMediaTransportControlsSessionPlaybackStatus
+STATUS = {0: "closed", 1: "opened", 2: "changing", 3: "stopped", 4: "playing", 5: "paused"}
+
+
+class NowPlaying(NamedTuple):
+    app: str                    # source app user model id ("Spotify.exe", …)
+    title: str
+    artist: str
+    album: str
+    status: str                 # one of STATUS, "" if unknown
+
+
+async def request_winsdk_manager():
+    from winsdk.windows.media.control import (
+        GlobalSystemMediaTransportControlsSessionManager
+    )
+    return await GlobalSystemMediaTransportControlsSessionManager.request_async()
+
 
 class MediaController:
-    def __init__(self):
-        # don’t call request_async() yet
+    # action → session method (each returns an awaitable bool)
+    COMMANDS = {
+        "play":       "try_play_async",
+        "pause":      "try_pause_async",
+        "play_pause": "try_toggle_play_pause_async",
+        "stop":       "try_stop_async",
+        "next":       "try_skip_next_async",
+        "previous":   "try_skip_previous_async",
+    }
+
+    def __init__(self, request=request_winsdk_manager):
+        self._request = request         # coroutine function → session manager
+        self._loop = None
+        self._owns_loop = False
         self._mgr = None
+        self._mgr_token = None
+        self._connecting = None         # asyncio.Lock, made on the loop
         self._session = None
+        self._session_tokens = []       # (remove method, token) on the bound session
+        self._now = None                # NowPlaying of the bound session
+        self._listeners = []
+        self.stats = {"requests": 0, "binds": 0, "info_updates": 0}
 
-    def _ensure_mgr(self):
-        if not self._mgr:
-            try:
-                op = GlobalSystemMediaTransportControlsSessionManager.request_async()
-                self._mgr = op.get_results()
-            except OSError as e:
-                # “method called at unexpected time” → defer until next call
-                self._mgr = None
-                raise
-
-    def _update_session(self):
-        self._ensure_mgr()
-        self._session = self._mgr.get_current_session()
-
-    def play(self):
-        try:
-            self._update_session()
-            if self._session:
-                op = self._session.try_play_async()
-                op.get_results()
-        except OSError:
-            # if we hit it again, we’ll just swallow and retry next time
-            pass
+    # ── Lifecycle ────────────────────────────────────────────────
 
-    def pause(self):
-        try:
-            self._update_session()
-            if self._session:
-                op = self._session.try_pause_async()
-                op.get_results()
-        except OSError:
-            pass
+    def start(self, loop=None):
+        """Run on `loop`, or on a new one in a daemon thread.  Safe to call twice."""
+        if self._loop is None:
+            if loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, daemon=True, name="media-control").start()
+                self._owns_loop = True
+            self._loop = loop
+        return self
 
-    def stop(self):
-        try:
-            self._update_session()
-            if self._session:
-                op = self._session.try_stop_async()
-                op.get_results()
-        except OSError:
-            pass
+    def close(self):
+        """Drop the event subscriptions and stop the loop if start() made it."""
+        if self._loop is None:
+            return
+        self.submit(self._disconnect()).result(timeout=5)
+        if self._owns_loop:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+        self._loop = None
+
+    def submit(self, coro):
+        """Schedule a coroutine on the controller's loop; returns a concurrent Future."""
+        self.start()
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    def send(self, action):
+        """command(action) from any thread, without waiting for it."""
+        return self.submit(self.command(action))
+
+    # ── Commands (on the loop) ───────────────────────────────────
 
-    def next(self):
+    async def connect(self):
+        """Request the session manager and bind the current session (once)."""
+        if self._connecting is None:
+            self._connecting = asyncio.Lock()
+        async with self._connecting:
+            if self._mgr is None:
+                self.stats["requests"] += 1
+                mgr = await self._request()
+                self._mgr = mgr
+                self._mgr_token = mgr.add_current_session_changed(self._on_session_changed)
+                await self._bind(mgr.get_current_session())
+        return self._mgr
+
+    async def command(self, action):
+        """Run one of COMMANDS on the current session.  False if there is none or it refused."""
+        method = self.COMMANDS[action]
         try:
-            self._update_session()
-            if self._session:
-                op = self._session.try_skip_next_async()
-                op.get_results()
+            await self.connect()
+            session = self._session
+            return session is not None and bool(await getattr(session, method)())
         except OSError:
-            pass
+            # "method called at unexpected time": request the manager again next time
+            await self._disconnect()
+            return False
+
+    async def play(self):
+        return await self.command("play")
+
+    async def pause(self):
+        return await self.command("pause")
+
+    async def stop(self):
+        return await self.command("stop")
+
+    async def next(self):
+        return await self.command("next")
+
+    async def previous(self):
+        return await self.command("previous")
+
+    # ── Now playing ──────────────────────────────────────────────
+
+    def now_playing(self):
+        """NowPlaying of the current session, or None.  Never blocks."""
+        return self._now
+
+    def on_change(self, callback):
+        """Call callback(NowPlaying or None) on the controller's loop whenever it changes."""
+        self._listeners.append(callback)
+
+    # ── Events ───────────────────────────────────────────────────
+
+    # WinRT raises these on its own threads; the work is moved onto the loop
 
-    def previous(self):
+    def _on_session_changed(self, sender, args):
+        asyncio.run_coroutine_threadsafe(self._rebind(), self._loop)
+
+    def _on_info_changed(self, session):
+        def handler(sender, args):
+            asyncio.run_coroutine_threadsafe(self._refresh(session), self._loop)
+        return handler
+
+    async def _rebind(self):
+        if self._mgr is not None:
+            try:
+                await self._bind(self._mgr.get_current_session())
+            except OSError:
+                await self._disconnect()
+
+    async def _bind(self, session):
+        self.stats["binds"] += 1
+        self._unbind()
+        self._session = session
+        if session is None:
+            self._set_now(None)
+            return
+        handler = self._on_info_changed(session)
+        self._session_tokens = [
+            (session.remove_playback_info_changed, session.add_playback_info_changed(handler)),
+            (session.remove_media_properties_changed, session.add_media_properties_changed(handler)),
+        ]
+        await self._refresh(session)
+
+    def _unbind(self):
+        for remove, token in self._session_tokens:
+            try:
+                remove(token)
+            except OSError:
+                pass
+        self._session_tokens = []
+
+    async def _refresh(self, session):
+        if session is not self._session:
+            return                      # an event of a session we have since left
         try:
-            self._update_session()
-            if self._session:
-                op = self._session.try_skip_previous_async()
-                op.get_results()
+            status = STATUS.get(int(session.get_playback_info().playback_status), "")
+            props = await session.try_get_media_properties_async()
         except OSError:
-            pass
+            return
+        if session is self._session:
+            self.stats["info_updates"] += 1
+            self._set_now(NowPlaying(session.source_app_user_model_id or "", props.title or "",
+                                     props.artist or "", props.album_title or "", status))
+
+    def _set_now(self, now):
+        if now != self._now:
+            self._now = now
+            for cb in self._listeners:
+                cb(now)
+
+    async def _disconnect(self):
+        self._unbind()
+        if self._mgr is not None and self._mgr_token is not None:
+            try:
+                self._mgr.remove_current_session_changed(self._mgr_token)
+            except OSError:
+                pass
+        self._mgr = self._mgr_token = self._session = None
+        self._set_now(None)
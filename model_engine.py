@@ -0,0 +1,172 @@
+# model_engine.py
+
+"""
+NumPy inference for the networks in model_state.json.
+
+  - autoencoder: 128 → 64 → 64 → 128 dense layers (tanh hidden, linear
+    output).  encode() is the first two layers, decode() the last.
+  - seq2seq: token embedding (vocab 8, 64 wide), an encoder and a decoder
+    of two stacked 2-gate recurrent layers (update + reset gate, hidden 64),
+    layer norm on the encoder state and on the decoder output, and a 64 → 8
+    output projection.  Decoding is greedy, starting from token 0.
+
+Weights come from model_state.bin (see model_format.py) through np.memmap,
+so load_model() is cheap and tensors are paged in on first use.  If there
+is no .bin yet (or it is older than the JSON) it is converted once.
+
+All calls are batched: encode(x) takes (batch, 128) or (128,), seq2seq()
+takes (batch, steps) token ids.
+"""
+
+import os
+from pathlib import Path
+
+import numpy as np
+
+import model_format
+
+BASE_DIR = Path(__file__).parent
+MODEL_JSON = BASE_DIR / "model_state.json"
+MODEL_BIN = Path(os.environ.get("VA_DATA_DIR") or BASE_DIR) / "model_state.bin"    # converted cache
+
+LAYERS = 2
+NORM_EPS = 1e-5
+
+
+def _sigmoid(x):
+    return 0.5 * (np.tanh(0.5 * x) + 1.0)
+
+
+def _layer_norm(x, gamma, beta):
+    mu = x.mean(-1, keepdims=True)
+    var = x.var(-1, keepdims=True)
+    return (x - mu) / np.sqrt(var + NORM_EPS) * gamma + beta
+
+
+class Model:
+    def __init__(self, tensors, meta=None):
+        self._raw = tensors         # name → array or memmap view (any float dtype)
+        self._f32 = {}              # name → float32 copy, made on first use
+        self._cells = {}
+        self.meta = meta or {}
+        self.input_dim = int(self.meta.get("input_dim", 128))
+
+    def t(self, name):
+        """Tensor `name` as float32 (views of float32 memmaps are not copied)."""
+        a = self._f32.get(name)
+        if a is None:
+            a = self._f32[name] = np.asarray(self._raw[name], dtype=np.float32)
+        return a
+
+    def nbytes(self):
+        return sum(a.nbytes for a in self._raw.values())
+
+    # ── Autoencoder ──────────────────────────────────────────────
+
+    def encode(self, x):
+        """(batch, 128) → (batch, 64) codes.  A single vector gives a single code."""
+        x = np.asarray(x, dtype=np.float32)
+        h = np.tanh(x @ self.t("ae.w0") + self.t("ae.b0"))
+        return np.tanh(h @ self.t("ae.w1") + self.t("ae.b1"))
+
+    def decode(self, z):
+        return np.asarray(z, dtype=np.float32) @ self.t("ae.w2") + self.t("ae.b2")
+
+    def reconstruct(self, x):
+        return self.decode(self.encode(x))
+
+    # ── Seq2seq ──────────────────────────────────────────────────
+
+    # Weight matrices of the seq2seq go through _weight() once and are
+    # multiplied with _mm(); model_quant.py overrides both.
+    def _weight(self, w):
+        return np.ascontiguousarray(w)
+
+    def _mm(self, x, w):
+        return x @ w
+
+    def _cell(self, side, layer):
+        """
+        Per-layer weights with the three input projections fused into one
+        (in, 3·hidden) matrix so a step costs one input and two recurrent
+        matmuls.
+        """
+        key = (side, layer)
+        if key not in self._cells:
+            p = f"s2s.{side}."
+            wx = np.concatenate([self.t(p + g)[:, layer] for g in ("wz", "wr", "wh")], axis=1)
+            bx = np.concatenate([self.t(p + g)[layer] for g in ("bz", "br", "bh")])
+            self._cells[key] = (self._weight(wx), bx, self._weight(self.t(p + "u")[layer]))
+        return self._cells[key]
+
+    def _out(self):
+        if "out" not in self._cells:
+            self._cells["out"] = self._weight(self.t("s2s.out.w"))
+        return self._cells["out"]
+
+    def _step(self, xp, h, u):
+        """One recurrent step given the precomputed input projection xp = x·Wx + b."""
+        hid = h.shape[-1]
+        hu = self._mm(h, u)
+        z = _sigmoid(xp[:, :hid] + hu)
+        r = _sigmoid(xp[:, hid:2 * hid] + hu)
+        cand = np.tanh(xp[:, 2 * hid:] + self._mm(r * h, u))
+        return h + z * (cand - h)
+
+    def _encode_seq(self, tokens):
+        """Final top-layer state for (batch, steps) token ids."""
+        x = self.t("s2s.enc.embed")[tokens]                   # (batch, steps, 64)
+        batch, steps, _ = x.shape
+        for layer in range(LAYERS):
+            wx, bx, u = self._cell("enc", layer)
+            hid = len(bx) // 3
+            # input projections of all steps in one matmul
+            xp = (self._mm(x.reshape(batch * steps, -1), wx) + bx).reshape(batch, steps, -1)
+            h = np.broadcast_to(self.t("s2s.enc.h0"), (batch, hid)).astype(np.float32)
+            out = np.empty((batch, steps, hid), dtype=np.float32)
+            for i in range(steps):
+                h = out[:, i] = self._step(xp[:, i], h, u)
+            x = out
+        return _layer_norm(h, self.t("s2s.enc.norm.gamma"), self.t("s2s.enc.norm.beta"))
+
+    def seq2seq(self, tokens, steps=None, return_logits=False):
+        """
+        Greedy decode of (batch, steps_in) token ids → (batch, steps) ids,
+        `steps` defaulting to the input length.  With return_logits the
+        per-step (batch, steps, vocab) logits are returned as well.
+        """
+        tokens = np.atleast_2d(np.asarray(tokens, dtype=np.intp))
+        steps = tokens.shape[1] if steps is None else steps
+        state = self._encode_seq(tokens)
+        hs = [state] * LAYERS
+        cells = [self._cell("dec", layer) for layer in range(LAYERS)]
+        embed, w_out, b_out = self.t("s2s.dec.embed"), self._out(), self.t("s2s.out.b")
+        gamma, beta = self.t("s2s.dec.norm.gamma"), self.t("s2s.dec.norm.beta")
+
+        prev = np.zeros(len(tokens), dtype=np.intp)
+        out = np.empty((len(tokens), steps), dtype=np.intp)
+        logits = np.empty((len(tokens), steps, len(b_out)), dtype=np.float32)
+        for i in range(steps):
+            x = embed[prev]
+            for layer, (wx, bx, u) in enumerate(cells):
+                x = hs[layer] = self._step(self._mm(x, wx) + bx, hs[layer], u)
+            logits[:, i] = self._mm(_layer_norm(x, gamma, beta), w_out) + b_out
+            prev = out[:, i] = logits[:, i].argmax(-1)
+        return (out, logits) if return_logits else out
+
+
+def load_model(path=None, source=MODEL_JSON):
+    """
+    Memory-map the .bin at `path` (default model_state.bin), converting
+    `source` first if the .bin is missing or stale.  Falls back to parsing
+    the JSON in memory when the .bin cannot be written.
+    """
+    path = Path(path or MODEL_BIN)
+    source = Path(source)
+    if source.exists() and (not path.exists() or path.stat().st_mtime < source.stat().st_mtime):
+        try:
+            model_format.convert(source, path)
+        except OSError as e:
+            print("[Model] cannot write", path, "-", e)
+            return Model(*model_format.tensors_from_json(source))
+    return Model(*model_format.open_mmap(path))
@@ -0,0 +1,116 @@
+# model_format.py
+
+"""
+Compact, memory-mappable storage for model_state.json.
+
+Layout of a .bin file:
+
+    8 bytes   magic  b"VAMODEL1"
+    4 bytes   little-endian header length N
+    N bytes   UTF-8 JSON header: {"meta": {...}, "tensors": {name: {dtype, shape, offset}}}
+    …         tensor data, each tensor 64-byte aligned, offsets relative to file start
+
+Readers np.memmap the file, so opening it costs a header parse and tensors
+are paged in only when they are touched.
+
+    python model_format.py model_state.json model_state.bin [--dtype float16]
+"""
+
+import argparse
+import json
+import struct
+from pathlib import Path
+
+import numpy as np
+
+MAGIC = b"VAMODEL1"
+ALIGN = 64
+
+# model_state.json is a bare list of arrays; these names are how the rest of
+# the code refers to them (see model_engine.py for what each one does).
+AE_NAMES = ["ae.w0", "ae.b0", "ae.w1", "ae.b1", "ae.w2", "ae.b2"]
+S2S_BLOCK = ["wz", "bz", "wr", "br", "wh", "bh", "u", "h0"]
+S2S_NAMES = (
+    ["s2s.enc.embed"] + [f"s2s.enc.{n}" for n in S2S_BLOCK]
+    + ["s2s.dec.embed", "s2s.enc.norm.gamma", "s2s.enc.norm.beta"]
+    + [f"s2s.dec.{n}" for n in S2S_BLOCK]
+    + ["s2s.dec.norm.gamma", "s2s.dec.norm.beta", "s2s.out.w", "s2s.out.b"]
+)
+
+
+def tensors_from_json(path):
+    """({name: float32 array}, meta) from model_state.json."""
+    d = json.loads(Path(path).read_text())
+    tensors = {}
+    for names, arrays in ((AE_NAMES, d["weights"]), (S2S_NAMES, d.get("seq2seq_weights", []))):
+        if arrays and len(arrays) != len(names):
+            raise ValueError(f"expected {len(names)} arrays, got {len(arrays)}")
+        for name, a in zip(names, arrays):
+            tensors[name] = np.asarray(a, dtype=np.float32)
+    return tensors, {"input_dim": d.get("input_dim", 128)}
+
+
+def write(path, tensors, meta=None, dtype="float32"):
+    """Write `tensors` ({name: array}) in the .bin layout, cast to `dtype`."""
+    table, blobs, offset = {}, [], 0
+    for name, a in tensors.items():
+        a = np.ascontiguousarray(a, dtype=dtype)
+        pad = (-offset) % ALIGN
+        offset += pad
+        table[name] = {"dtype": a.dtype.str, "shape": list(a.shape), "offset": offset}
+        blobs.append((pad, a.tobytes()))
+        offset += a.nbytes
+
+    # header length is only known once offsets are; fix up in a second pass
+    header = {"meta": dict(meta or {}, dtype=dtype), "tensors": table}
+    for _ in range(2):
+        raw = json.dumps(header, separators=(",", ":")).encode()
+        base = len(MAGIC) + 4 + len(raw)
+        base += (-base) % ALIGN
+        for name in table:
+            table[name]["abs"] = base + table[name]["offset"]
+    raw = json.dumps(header, separators=(",", ":")).encode()
+
+    with open(path, "wb") as f:
+        f.write(MAGIC + struct.pack("<I", len(raw)) + raw)
+        f.write(b"\0" * (base - f.tell()))
+        for pad, data in blobs:
+            f.write(b"\0" * pad)
+            f.write(data)
+
+
+def open_mmap(path):
+    """({name: read-only memmap view}, meta).  Nothing is read but the header."""
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a model file")
+        (n,) = struct.unpack("<I", f.read(4))
+        header = json.loads(f.read(n))
+    mm = np.memmap(path, dtype=np.uint8, mode="r")
+    tensors = {}
+    for name, t in header["tensors"].items():
+        dt = np.dtype(t["dtype"])
+        count = int(np.prod(t["shape"])) if t["shape"] else 1
+        tensors[name] = mm[t["abs"]:t["abs"] + count * dt.itemsize].view(dt).reshape(t["shape"])
+    return tensors, header["meta"]
+
+
+def convert(src, dst, dtype="float32"):
+    tensors, meta = tensors_from_json(src)
+    write(dst, tensors, meta, dtype)
+    return dst
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("src", help="model_state.json")
+    ap.add_argument("dst", help="output .bin")
+    ap.add_argument("--dtype", choices=("float32", "float16"), default="float32")
+    args = ap.parse_args()
+    convert(args.src, args.dst, args.dtype)
+    print(f"{args.src} ({Path(args.src).stat().st_size / 1e6:.2f} MB) → "
+          f"{args.dst} ({Path(args.dst).stat().st_size / 1e6:.2f} MB, {args.dtype})")
+
+
+if __name__ == "__main__":
+    main()
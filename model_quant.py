@@ -0,0 +1,106 @@
+# model_quant.py
+
+"""
+Post-training int8 quantization of the seq2seq model (model_engine.py).
+
+Every weight matrix is stored as int8 with one float32 scale per output
+channel (symmetric, max-abs).  Activations are quantized on the fly with
+one scale per row, the product is an int8 × int8 → int32 matmul, and the
+result is rescaled by row scale × channel scale.  Biases, layer norms and
+the embedding tables stay float32; they are tiny.
+
+NumPy has no BLAS kernel for integer matmul (its int32 loop is ~40× slower
+than sgemm at batch 64), so when the reduction is short enough for every
+partial sum to be exact in float32 (k · 127² < 2²⁴, i.e. k ≤ 1040) the
+integer-valued operands are multiplied with sgemm instead.  The result is
+bit-identical to the int32 product.
+
+    model = QuantizedModel.from_model(model_engine.load_model())
+    model.seq2seq(tokens)
+"""
+
+import numpy as np
+
+from model_engine import LAYERS, Model
+
+
+EXACT_F32_K = (1 << 24) // (127 * 127)
+
+
+class QuantizedWeight:
+    __slots__ = ("q", "scale")
+
+    def __init__(self, w):
+        w = np.asarray(w, dtype=np.float32)
+        amax = np.abs(w).max(axis=0)
+        self.scale = np.where(amax > 0, amax / 127.0, 1.0).astype(np.float32)
+        self.q = np.ascontiguousarray(np.clip(np.rint(w / self.scale), -127, 127).astype(np.int8))
+
+    @property
+    def nbytes(self):
+        return self.q.nbytes + self.scale.nbytes
+
+    def dequantize(self):
+        return self.q.astype(np.float32) * self.scale
+
+
+def quantize_rows(x):
+    """
+    (values in -127..127, per-row float32 scales) for a 2-D activation
+    batch.  The values are integers kept in a float32 array.
+    """
+    amax = np.abs(x).max(axis=1, keepdims=True)
+    scale = np.where(amax > 0, amax / 127.0, 1.0).astype(np.float32)
+    return np.clip(np.rint(x / scale), -127, 127), scale
+
+
+def int8_matmul(xq, wq):
+    """Exact integer product of two int8-valued operands, as float32."""
+    if xq.shape[1] <= EXACT_F32_K:
+        return xq.astype(np.float32, copy=False) @ wq.astype(np.float32)
+    return np.matmul(xq.astype(np.int8), wq, dtype=np.int32).astype(np.float32)
+
+
+class QuantizedModel(Model):
+    """A Model whose seq2seq matmuls run on int8 weights."""
+
+    @classmethod
+    def from_model(cls, model):
+        return cls(model._raw, model.meta)
+
+    def _weight(self, w):
+        return QuantizedWeight(w)
+
+    def _mm(self, x, w):
+        xq, xs = quantize_rows(x)
+        return int8_matmul(xq, w.q) * xs * w.scale
+
+
+class Float16Model(Model):
+    """
+    Seq2seq weights held as float16 (half the memory), upcast per product:
+    NumPy's float16 matmul has no BLAS kernel either.
+    """
+
+    @classmethod
+    def from_model(cls, model):
+        return cls(model._raw, model.meta)
+
+    def _weight(self, w):
+        return np.ascontiguousarray(w, dtype=np.float16)
+
+    def _mm(self, x, w):
+        return x @ w.astype(np.float32)
+
+
+def weight_nbytes(model):
+    """Bytes of the prepared matrices a model's seq2seq multiplies with."""
+    model._out()
+    for side in ("enc", "dec"):
+        for layer in range(LAYERS):
+            model._cell(side, layer)
+    total = 0
+    for v in model._cells.values():
+        for w in (v if isinstance(v, tuple) else (v,)):
+            total += w.nbytes
+    return total
@@ -0,0 +1,370 @@
+# music_library.py
+
+"""
+Persistent index of the music folder for "play …" commands.
+
+Tracks live in a small SQLite file next to va_settings.json.  A refresh only
+lists directories whose mtime changed since the last run, so a warm start
+on a big library is a few stat() calls per folder.  Files edited in place
+(a retag) leave their directory's mtime alone, so every VERIFY_INTERVAL
+a refresh also lists the unchanged directories and re-reads the tags of
+files whose mtime or size moved.  Lookups go through in-memory trigram
+indexes (app_index.AppNameIndex) and never touch the disk.
+
+Artist/album/title tags are read once with mutagen (optional) in a process
+pool, in batches that are committed as they finish, so a first index of a
+large library runs in the background and picks up where it left off after
+a restart.
+"""
+
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+
+from app_index import AppNameIndex
+
+try:
+    import mutagen
+except ImportError:   # tags are optional; filenames still work
+    mutagen = None
+
+AUDIO_EXTS = (".mp3", ".wav", ".flac", ".aac", ".ogg", ".m4a")
+SCHEMA_VERSION = "3"
+REFRESH_INTERVAL = 30.0   # seconds between mtime sweeps triggered by lookups
+VERIFY_INTERVAL = 300.0   # seconds between sweeps that also stat files in unchanged dirs
+TAG_BATCH = 256
+
+# "play album X" / "play songs by Y" (after the play verb is stripped).  A bare
+# "by"/"от" is not one: "play by the way" is a title.
+FIELD_PREFIXES = (
+    ("album",  ("the album ", "album ", "албума ", "албум ")),
+    ("artist", ("songs by ", "music by ", "artist ",
+                "песни на ", "песни от ", "музика от ", "изпълнител ")),
+)
+# free-text queries: field → weight applied to its match ratio
+FREE_FIELDS = (("title", 1.0), ("artist_title", 1.0), ("stem", 0.95),
+               ("album", 0.85), ("artist", 0.85))
+
+
+def read_tags(path):
+    """(artist, album, title) from ID3/Vorbis/MP4 tags; blanks if unreadable."""
+    try:
+        f = mutagen.File(path, easy=True)
+    except Exception:
+        f = None
+    if not f or not f.tags:
+        return "", "", ""
+
+    def first(key):
+        v = f.tags.get(key)
+        return str(v[0]).strip().lower() if v else ""
+
+    return first("artist") or first("albumartist"), first("album"), first("title")
+
+
+def write_playlist(paths, dest=None):
+    """
+    Write `paths` to an .m3u8 playlist and return its path.  Players get
+    this instead of the tracks on the command line: Windows caps a command
+    line at 32767 characters, a few hundred full paths.
+    """
+    dest = dest or os.path.join(tempfile.gettempdir(), "voice_assistant_queue.m3u8")
+    tmp = f"{dest}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8", newline="\r\n") as f:
+        f.write("#EXTM3U\n")
+        f.writelines(f"{p}\n" for p in paths)
+    os.replace(tmp, dest)
+    return dest
+
+
+def parse_query(text):
+    """Split "album X" / "songs by Y" into (field, value); else (None, text)."""
+    t = " ".join(text.lower().split())
+    for field, prefixes in FIELD_PREFIXES:
+        for p in prefixes:
+            if t.startswith(p) and len(t) > len(p):
+                return field, t[len(p):]
+    return None, t
+
+
+class _SearchIndex:
+    """Immutable per-field trigram indexes over one snapshot of the tracks."""
+
+    def __init__(self, rows):
+        self.tracks = []                                       # [(path, display name)]
+        self.values = defaultdict(lambda: defaultdict(list))   # field → value → ids
+        for path, stem, artist, album, title in rows:
+            i = len(self.tracks)
+            name = f"{artist} - {title}" if artist and title else title or stem
+            self.tracks.append((path, name))
+            fields = {"stem": stem, "title": title, "artist": artist, "album": album,
+                      "artist_title": f"{artist} {title}" if artist and title else ""}
+            for field, value in fields.items():
+                if value:
+                    self.values[field][value].append(i)
+        self.indexes = {f: AppNameIndex(v) for f, v in self.values.items()}
+
+    def __len__(self):
+        return len(self.tracks)
+
+    def match(self, field, text, n, cutoff):
+        idx = self.indexes.get(field)
+        return idx.scored_matches(text, n=n, cutoff=cutoff) if idx else []
+
+    def search(self, query, limit=10, cutoff=0.5):
+        """(field or None, hits); a field query that finds nothing is searched as free text."""
+        field, text = parse_query(query)
+        scores = {}
+        if field:
+            # best album / artist, all of its tracks in folder order
+            for score, value in self.match(field, text, 1, cutoff):
+                for i in self.values[field][value]:
+                    scores[i] = score
+            if scores:
+                ranked = sorted(scores, key=lambda i: self.tracks[i][0])
+                return field, [(scores[i],) + self.tracks[i] for i in ranked]
+            text = " ".join(query.lower().split())
+        for f, weight in FREE_FIELDS:
+            for score, value in self.match(f, text, limit, cutoff):
+                for i in self.values[f][value]:
+                    scores[i] = max(scores.get(i, 0.0), score * weight)
+        ranked = sorted(scores, key=lambda i: (-scores[i], self.tracks[i][0]))[:limit]
+        return None, [(scores[i],) + self.tracks[i] for i in ranked]
+
+
+class MusicLibrary:
+    def __init__(self, db_path, folder=""):
+        self.db_path = str(db_path)
+        self.folder = os.path.normpath(folder) if folder else ""   # where the library should point
+        self._indexed = None                                         # the folder the tables hold
+        self._search = _SearchIndex([])
+        self._retired = None                                         # index dropped by set_folder
+        self._refresh_lock = threading.Lock()
+        self._tag_lock = threading.Lock()
+        self._last_refresh = 0.0
+        self._last_verify = time.monotonic()
+        self._init_db()
+        with self._refresh_lock, self._connect() as con:
+            self._sync_folder(con)
+
+    # ── Storage ──────────────────────────────────────────────────
+
+    @contextmanager
+    def _connect(self):
+        """One transaction: committed (rolled back on error), then the connection is closed."""
+        con = sqlite3.connect(self.db_path, timeout=10)
+        try:
+            with con:
+                yield con
+        finally:
+            con.close()
+
+    def _init_db(self):
+        with self._connect() as con:
+            try:
+                row = con.execute("SELECT value FROM meta WHERE key='schema'").fetchone()
+            except sqlite3.OperationalError:
+                row = None
+            if row and row[0] != SCHEMA_VERSION:
+                con.executescript("DROP TABLE IF EXISTS dirs; DROP TABLE IF EXISTS tracks;"
+                                  "DROP TABLE IF EXISTS meta;")
+            con.executescript("""
+                CREATE TABLE IF NOT EXISTS meta   (key TEXT PRIMARY KEY, value TEXT);
+                CREATE TABLE IF NOT EXISTS dirs   (path TEXT PRIMARY KEY, parent TEXT, mtime INTEGER);
+                CREATE TABLE IF NOT EXISTS tracks (path TEXT PRIMARY KEY, dir TEXT, stem TEXT,
+                                                   artist TEXT DEFAULT '', album TEXT DEFAULT '',
+                                                   title TEXT DEFAULT '', tagged INTEGER DEFAULT 0,
+                                                   mtime INTEGER DEFAULT 0, size INTEGER DEFAULT 0);
+                CREATE INDEX IF NOT EXISTS tracks_dir ON tracks(dir);
+                CREATE INDEX IF NOT EXISTS tracks_tagged ON tracks(tagged);
+            """)
+            con.execute("INSERT OR REPLACE INTO meta VALUES ('schema', ?)", (SCHEMA_VERSION,))
+
+    def set_folder(self, folder, refresh=True):
+        """
+        Point the library at `folder`.  Returns at once (it is called from
+        the Tk thread while a scan may hold the refresh lock for seconds):
+        lookups stop answering from the old folder now, and the next
+        refresh drops the old index and scans the new folder.
+        """
+        folder = os.path.normpath(folder) if folder else ""
+        if folder != self.folder:
+            self.folder = folder
+            self._indexed = None            # the next refresh re-syncs (and reloads) the tables
+            # freeing a big index takes ~20 ms: leave that to the refresh thread too
+            self._retired, self._search = self._search, _SearchIndex([])
+        if refresh:
+            self.refresh_async()
+
+    def _sync_folder(self, con):
+        """Make the tables hold self.folder (under the refresh lock)."""
+        self._retired = None
+        folder = self.folder
+        if folder == self._indexed:
+            return
+        row = con.execute("SELECT value FROM meta WHERE key='folder'").fetchone()
+        if not row or row[0] != folder:
+            con.executescript("DELETE FROM dirs; DELETE FROM tracks;")
+            con.execute("INSERT OR REPLACE INTO meta VALUES ('folder', ?)", (folder,))
+        self._indexed = folder
+        self._load_index(con)
+
+    def _load_index(self, con):
+        rows = con.execute("SELECT path, stem, artist, album, title FROM tracks ORDER BY path")
+        self._search = _SearchIndex(rows)
+
+    # ── Refresh ──────────────────────────────────────────────────
+
+    def refresh(self, verify=None):
+        """
+        Bring the index in line with the folder.  Returns stats:
+        tracks, added, removed, changed, dirs_scanned, elapsed_ms.
+        With verify (default: when VERIFY_INTERVAL has passed) unchanged
+        directories are listed too, to find files edited in place.
+        """
+        t0 = time.perf_counter()
+        stats = {"tracks": 0, "added": 0, "removed": 0, "changed": 0, "dirs_scanned": 0}
+        with self._refresh_lock, self._connect() as con:
+            self._sync_folder(con)
+            folder = self.folder
+            self._last_refresh = time.monotonic()
+            if verify is None:
+                verify = self._last_refresh - self._last_verify > VERIFY_INTERVAL
+            if verify:
+                self._last_verify = self._last_refresh
+            if not folder or not os.path.isdir(folder):
+                stats["elapsed_ms"] = (time.perf_counter() - t0) * 1e3
+                return stats
+
+            known, children = {}, defaultdict(list)
+            for path, parent, mtime in con.execute("SELECT path, parent, mtime FROM dirs"):
+                known[path] = mtime
+                children[parent].append(path)
+
+            seen, stack = set(), [(folder, None)]
+            while stack:
+                d, parent = stack.pop()
+                try:
+                    mtime = os.stat(d).st_mtime_ns
+                except OSError:
+                    continue
+                seen.add(d)
+                if known.get(d) == mtime and not verify:
+                    stack.extend((c, d) for c in children[d])
+                    continue
+
+                stats["dirs_scanned"] += 1
+                subdirs, tracks = [], {}
+                try:
+                    with os.scandir(d) as it:
+                        for e in it:
+                            if e.is_dir():
+                                subdirs.append(e.path)
+                            elif e.name.lower().endswith(AUDIO_EXTS):
+                                st = e.stat()   # free on Windows: scandir already has it
+                                tracks[e.path] = (st.st_mtime_ns, st.st_size)
+                except OSError:
+                    continue
+                old = {p: (m, n) for p, m, n in
+                       con.execute("SELECT path, mtime, size FROM tracks WHERE dir=?", (d,))}
+                gone = old.keys() - tracks.keys()
+                new = tracks.keys() - old.keys()
+                changed = [p for p in tracks.keys() & old.keys() if tracks[p] != old[p]]
+                con.executemany("DELETE FROM tracks WHERE path=?", [(p,) for p in gone])
+                con.executemany(
+                    "INSERT OR REPLACE INTO tracks (path, dir, stem, mtime, size) VALUES (?,?,?,?,?)",
+                    [(p, d, os.path.splitext(os.path.basename(p))[0].lower()) + tracks[p] for p in new],
+                )
+                # edited in place: read the tags again
+                con.executemany("UPDATE tracks SET mtime=?, size=?, tagged=0 WHERE path=?",
+                                [tracks[p] + (p,) for p in changed])
+                con.execute("INSERT OR REPLACE INTO dirs VALUES (?,?,?)", (d, parent, mtime))
+                stats["added"] += len(new)
+                stats["removed"] += len(gone)
+                stats["changed"] += len(changed)
+                stack.extend((s, d) for s in subdirs)
+
+            for d in set(known) - seen:
+                stats["removed"] += con.execute("DELETE FROM tracks WHERE dir=?", (d,)).rowcount
+                con.execute("DELETE FROM dirs WHERE path=?", (d,))
+
+            if stats["added"] or stats["removed"] or not len(self):
+                self._load_index(con)
+            stats["tracks"] = len(self)
+        stats["elapsed_ms"] = (time.perf_counter() - t0) * 1e3
+        return stats
+
+    def tag_pending(self, workers=None, on_batch=None):
+        """
+        Read tags for every track not tagged yet, TAG_BATCH files at a time
+        in a process pool.  Each batch is committed before the next starts,
+        so an interrupted run resumes where it stopped.  Returns files tagged.
+        """
+        if mutagen is None or not self._tag_lock.acquire(blocking=False):
+            return 0
+        done = 0
+        try:
+            workers = workers or max(1, (os.cpu_count() or 2) - 1)
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                while True:
+                    with self._connect() as con:
+                        paths = [p for (p,) in con.execute(
+                            "SELECT path FROM tracks WHERE tagged=0 LIMIT ?", (TAG_BATCH,))]
+                    if not paths:
+                        break
+                    tags = list(pool.map(read_tags, paths, chunksize=16))
+                    with self._refresh_lock, self._connect() as con:
+                        con.executemany(
+                            "UPDATE tracks SET artist=?, album=?, title=?, tagged=1 WHERE path=?",
+                            [t + (p,) for p, t in zip(paths, tags)],
+                        )
+                    done += len(paths)
+                    if on_batch:
+                        on_batch(done)
+            if done:
+                with self._refresh_lock, self._connect() as con:
+                    self._load_index(con)
+        finally:
+            self._tag_lock.release()
+        return done
+
+    def refresh_async(self, on_done=None):
+        """Refresh, then read tags for new files; both off the calling thread."""
+        def run():
+            stats = self.refresh()
+            stats["tagged"] = self.tag_pending()
+            if on_done:
+                on_done(stats)
+        threading.Thread(target=run, daemon=True).start()
+
+    # ── Lookup ───────────────────────────────────────────────────
+
+    def __len__(self):
+        return len(self._search)
+
+    def query(self, query, limit=10, cutoff=0.5):
+        """
+        (field, ranked [(score, path, name)]) for a free-text, "album X" or
+        "songs by Y" query.  field is "album"/"artist" when every track of
+        the best album/artist is returned (limit does not apply), None for
+        a free-text ranking.  Never blocks on disk.
+        """
+        if time.monotonic() - self._last_refresh > REFRESH_INTERVAL \
+                and not self._refresh_lock.locked():
+            self._last_refresh = time.monotonic()
+            self.refresh_async()
+        return self._search.search(query, limit=limit, cutoff=cutoff)
+
+    def search(self, query, limit=10, cutoff=0.5):
+        """Ranked [(score, path, name)], see query()."""
+        return self.query(query, limit=limit, cutoff=cutoff)[1]
+
+    def find(self, fragment, cutoff=0.5):
+        """(name, path) of the best-matching track, or None."""
+        hits = self.search(fragment, limit=1, cutoff=cutoff)
+        return (hits[0][2], hits[0][1]) if hits else None
@@ -0,0 +1,152 @@
+# pipeline.py
+
+"""
+Capture → bounded audio queue → recognition workers → ordered executor.
+
+listen_in_background hands each phrase to submit() and goes straight back
+to listening, so a slow recognize_google call no longer delays capture of
+the next phrase.  Several phrases can be in recognition at once, but their
+commands are still executed one at a time in the order they were spoken.
+When the queue is full the oldest waiting phrase is dropped.
+
+With a telemetry.Tracer, each phrase's trace id is bound to the thread
+that recognizes and executes it and the stage timings become spans.
+"""
+
+import threading
+import time
+from collections import deque
+
+STAGES = ("queue", "recognize", "reorder", "execute", "total")
+
+
+class RecognitionPipeline:
+    def __init__(self, recognize, execute, workers=2, max_pending=4,
+                 on_error=None, history=500, tracer=None):
+        """
+        recognize(audio) -> text or None   (runs on a worker thread)
+        execute(text)                      (runs on the executor thread)
+        """
+        self._recognize = recognize
+        self._execute = execute
+        self._on_error = on_error or (lambda stage, e: print(f"[Pipeline] {stage} error:", e))
+        self.max_pending = max_pending
+        self._tracer = tracer
+
+        self._cv = threading.Condition()
+        self._queue = deque()          # (seq, audio, t_captured, trace)
+        self._results = {}             # seq → (text or None, timings, trace) ; None = dropped
+        self._next_seq = 0             # next sequence number to hand out
+        self._next_exec = 0            # next sequence number to execute
+        self._running = True
+
+        self.dropped = 0
+        self.latencies = {s: deque(maxlen=history) for s in STAGES}
+
+        self._threads = [threading.Thread(target=self._worker, daemon=True, name=f"recognizer-{i}")
+                         for i in range(workers)]
+        self._threads.append(threading.Thread(target=self._executor, daemon=True, name="executor"))
+        for t in self._threads:
+            t.start()
+
+    # ── Capture side ─────────────────────────────────────────────
+
+    def submit(self, audio, trace=None):
+        """Queue a captured phrase.  Never blocks the capture thread."""
+        with self._cv:
+            if len(self._queue) >= self.max_pending:
+                seq = self._queue.popleft()[0]
+                self._results[seq] = None
+                self.dropped += 1
+            self._queue.append((self._next_seq, audio, time.monotonic(), trace))
+            self._next_seq += 1
+            self._cv.notify_all()
+
+    def stop(self, timeout=None):
+        with self._cv:
+            self._running = False
+            self._cv.notify_all()
+        for t in self._threads:
+            t.join(timeout)
+
+    def drain(self, timeout=None):
+        """Block until everything submitted so far has been executed or dropped."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cv:
+            while self._next_exec < self._next_seq:
+                left = None if deadline is None else deadline - time.monotonic()
+                if left is not None and left <= 0:
+                    return False
+                self._cv.wait(left)
+        return True
+
+    # ── Stages ───────────────────────────────────────────────────
+
+    def _worker(self):
+        while True:
+            with self._cv:
+                while self._running and not self._queue:
+                    self._cv.wait()
+                if not self._running:
+                    return
+                seq, audio, t_cap, trace = self._queue.popleft()
+            if self._tracer:
+                self._tracer.bind(trace)
+            t_start = time.monotonic()
+            try:
+                text = self._recognize(audio)
+            except Exception as e:
+                self._on_error("recognize", e)
+                text = None
+            t_done = time.monotonic()
+            with self._cv:
+                self._results[seq] = (text, {"captured": t_cap, "start": t_start, "done": t_done}, trace)
+                self._cv.notify_all()
+
+    def _executor(self):
+        while True:
+            with self._cv:
+                while self._running and self._next_exec not in self._results:
+                    self._cv.wait()
+                if not self._running:
+                    return
+                item = self._results.pop(self._next_exec)
+            if item is not None and item[0]:
+                text, t, trace = item
+                if self._tracer:
+                    self._tracer.bind(trace)
+                t_exec = time.monotonic()
+                try:
+                    self._execute(text)
+                except Exception as e:
+                    self._on_error("execute", e)
+                t_end = time.monotonic()
+                self._record(queue=t["start"] - t["captured"], recognize=t["done"] - t["start"],
+                             reorder=t_exec - t["done"], execute=t_end - t_exec,
+                             total=t_end - t["captured"])
+                if self._tracer:
+                    for stage, start, end in (("queue", t["captured"], t["start"]),
+                                              ("recognize", t["start"], t["done"]),
+                                              ("reorder", t["done"], t_exec),
+                                              ("execute", t_exec, t_end),
+                                              ("total", t["captured"], t_end)):
+                        self._tracer.record(stage, start, end, trace)
+            with self._cv:
+                self._next_exec += 1
+                self._cv.notify_all()
+
+    # ── Metrics ──────────────────────────────────────────────────
+
+    def _record(self, **stages):
+        for stage, seconds in stages.items():
+            self.latencies[stage].append(seconds * 1e3)
+
+    def stats(self):
+        """{stage: {"n", "p50_ms", "p95_ms", "max_ms"}} plus dropped count."""
+        out = {"dropped": self.dropped}
+        for stage, values in self.latencies.items():
+            v = sorted(values)
+            if v:
+                out[stage] = {"n": len(v), "p50_ms": v[len(v) // 2],
+                              "p95_ms": v[min(len(v) - 1, int(len(v) * 0.95))], "max_ms": v[-1]}
+        return out
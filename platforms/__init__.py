@@ -0,0 +1,36 @@
+# platforms/__init__.py
+
+"""
+OS integration behind one set of interfaces (see base.py), so the command
+path runs unchanged on Windows, on Linux and headless against fakes.
+
+The backend is picked from VA_PLATFORM, then the "platform" key of
+va_settings.json, then sys.platform:
+
+    VA_PLATFORM=fake python bench/bench_platform.py
+"""
+
+import importlib
+import os
+import sys
+
+from .base import (AppCatalog, WindowInfo, WindowManager, ProcessManager, VolumeControl,
+                   AudioDevices, MediaKeys, TextInput, Platform)
+
+BACKENDS = ("windows", "linux", "fake")
+
+
+def default_name():
+    return "windows" if sys.platform == "win32" else "linux"
+
+
+def create_platform(name=None, **kwargs) -> Platform:
+    """Build the named backend (imported only when chosen)."""
+    name = os.environ.get("VA_PLATFORM") or name or default_name()
+    if name not in BACKENDS:
+        raise ValueError(f"unknown platform {name!r}, expected one of {BACKENDS}")
+    return importlib.import_module(f"{__name__}.{name}").create(**kwargs)
+
+
+__all__ = ["AppCatalog", "WindowInfo", "WindowManager", "ProcessManager", "VolumeControl", "AudioDevices",
+           "MediaKeys", "TextInput", "Platform", "BACKENDS", "create_platform", "default_name"]
@@ -0,0 +1,192 @@
+# platforms/base.py
+
+"""
+Interfaces for everything the assistant asks of the operating system.
+Backends subclass these; methods that cannot work on a given machine
+return False / None rather than raise.
+"""
+
+from typing import NamedTuple
+
+from app_scanner import apps_from_state
+
+
+class AppCatalog:
+    """Installed applications as an incrementally refreshable index state."""
+
+    def refresh(self, prev_state=None):
+        """Return (state, stats) like app_scanner.refresh_app_state."""
+        raise NotImplementedError
+
+    def apps(self, state):
+        """{app name: launch target} from a state returned by refresh()."""
+        return apps_from_state(state)
+
+
+class WindowInfo(NamedTuple):
+    handle: object
+    title: str
+    pid: object = None          # None where the backend cannot tell
+    exe: str = ""               # full path of the owning executable, if known
+
+
+class WindowManager:
+    # kinds of events passed to watch() callbacks as (kind, handle)
+    EVENTS = ("create", "destroy", "title", "focus", "resync")
+
+    def list_windows(self):
+        """[(handle, title)] of visible top-level windows."""
+        raise NotImplementedError
+
+    def windows(self):
+        """[WindowInfo] of visible top-level windows, with owner pid/exe where available."""
+        return [WindowInfo(handle, title) for handle, title in self.list_windows()]
+
+    def info(self, handle):
+        """WindowInfo of one window, or None if it is gone or hidden."""
+        return next((w for w in self.windows() if w.handle == handle), None)
+
+    def watch(self, on_event):
+        """
+        Call on_event(kind, handle) from a background thread as windows
+        appear, close, change title or get focus ("resync" = re-list all).
+        Returns False if the backend has no such events (callers poll).
+        """
+        return False
+
+    def activate(self, handle):
+        """Restore and focus a window.  Returns True on success."""
+        raise NotImplementedError
+
+    def close(self, handle):
+        """Ask a window to close, as its close button would.  Returns True if the request was sent."""
+        raise NotImplementedError
+
+    def find(self, fragment):
+        """Handle of the first visible window whose title contains `fragment`."""
+        fragment = fragment.lower()
+        for handle, title in self.list_windows():
+            if fragment in title.lower():
+                return handle
+        return None
+
+    def switch_to(self, fragment):
+        handle = self.find(fragment)
+        return handle is not None and self.activate(handle)
+
+
+class ProcessManager:
+    def launch(self, target):
+        """Start an app from its catalog target (or an argv list).  Returns True if it was started."""
+        raise NotImplementedError
+
+    def kill(self, target):
+        """Stop every process of the app behind `target`.  Returns True if any was found."""
+        raise NotImplementedError
+
+    # The process table (process_tracker.ProcessTracker).  psutil by
+    # default; backends override these where the OS offers something cheaper.
+
+    def running_pids(self):
+        """Set of pids currently running."""
+        import psutil
+        return set(psutil.pids())
+
+    def describe(self, pid):
+        """(exe path, start time) of a running pid, or None if it is gone or inaccessible."""
+        import psutil
+        try:
+            p = psutil.Process(pid)
+            with p.oneshot():
+                return p.exe() or p.name(), p.create_time()
+        except (psutil.Error, OSError):
+            return None
+
+    def terminate(self, pid, force=False):
+        """Ask a process to exit (force: kill it outright).  Returns False if it was already gone."""
+        import psutil
+        try:
+            p = psutil.Process(pid)
+            p.kill() if force else p.terminate()
+            return True
+        except (psutil.Error, OSError):
+            return False
+
+
+class VolumeControl:
+    def get(self):
+        """Master volume in 0..1, or None if it cannot be read."""
+        raise NotImplementedError
+
+    def set(self, level):
+        raise NotImplementedError
+
+    def set_mute(self, muted):
+        raise NotImplementedError
+
+    def step(self, delta):
+        """
+        Move the volume by `delta`, clamped to 0..1.  Returns the new level,
+        or None (and changes nothing) when the current one is unknown.
+        """
+        level = self.get()
+        if level is None:
+            return None
+        new = min(1.0, max(0.0, level + delta))
+        self.set(new)
+        return new
+
+
+class AudioDevices:
+    def input_names(self):
+        """Names of the audio input devices, indexed like sr.Microphone(device_index=…).  A full probe: slow."""
+        import speech_recognition as sr
+        return sr.Microphone.list_microphone_names()
+
+    def signature(self):
+        """
+        Cheap token that changes when a device is plugged in or removed, so
+        cached input_names() can be dropped.  None if the backend cannot tell.
+        """
+        return None
+
+
+class MediaKeys:
+    ACTIONS = ("play_pause", "next", "previous", "stop")
+
+    def prepare(self):
+        """Warm up whatever send() needs (called once, off the UI thread)."""
+
+    def send(self, action):
+        """Send one of ACTIONS to the active media player."""
+        raise NotImplementedError
+
+    def now_playing(self):
+        """media_control.NowPlaying of the active player, or None if unknown."""
+        return None
+
+
+class TextInput:
+    def write(self, text):
+        """Type `text` ("\n" included) into the focused window, in as few OS calls as possible."""
+        raise NotImplementedError
+
+    def press(self, key):
+        """Press a named key ("enter", "backspace", …)."""
+        raise NotImplementedError
+
+    def erase(self, n):
+        """Press backspace `n` times."""
+        for _ in range(n):
+            self.press("backspace")
+
+
+class Platform(NamedTuple):
+    name: str
+    apps: AppCatalog
+    windows: WindowManager
+    processes: ProcessManager
+    volume: VolumeControl
+    audio: AudioDevices
+    media: MediaKeys
+    text: TextInput
@@ -0,0 +1,390 @@
+# platforms/fake.py
+
+"""
+In-memory backend for benchmarks and headless runs.  Nothing touches the
+OS; every call is appended to a shared `log` as (component, action, arg)
+so a run can be checked afterwards.
+"""
+
+import asyncio
+import itertools
+import os
+import time
+from types import SimpleNamespace
+
+from app_scanner import INDEX_VERSION, apps_from_state
+
+from .base import (AppCatalog, WindowInfo, WindowManager, ProcessManager, VolumeControl,
+                   AudioDevices, MediaKeys, TextInput, Platform)
+
+
+class FakeAppCatalog(AppCatalog):
+    def __init__(self, apps, log):
+        self.installed = dict(apps)     # name → target; edit to simulate (un)installs
+        self.log = log
+
+    def refresh(self, prev_state=None):
+        t0 = time.perf_counter()
+        state = {"version": INDEX_VERSION, "order": ["fake"],
+                 "sources": {"fake": {"apps": dict(self.installed)}}}
+        old, new = apps_from_state(prev_state or {}), self.installed
+        self.log.append(("apps", "refresh", len(new)))
+        return state, {
+            "added": sum(1 for k in new if k not in old),
+            "removed": sum(1 for k in old if k not in new),
+            "changed": sum(1 for k in new if k in old and old[k] != new[k]),
+            "files_touched": 0,
+            "sources_rescanned": int(new != old),
+            "elapsed_ms": (time.perf_counter() - t0) * 1e3,
+        }
+
+
+class FakeWindowManager(WindowManager):
+    def __init__(self, log):
+        self.titles = {}                # handle → title
+        self.owners = {}                # handle → (pid, exe)
+        self.active = None
+        self.ignore_close = set()       # pids whose windows do not close when asked (hung apps)
+        self.on_last_close = None       # set by FakeProcessManager: the app exits with its last window
+        self.log = log
+        self._listeners = []
+
+    def list_windows(self):
+        return list(self.titles.items())
+
+    def _info(self, handle):
+        pid, exe = self.owners.get(handle, (None, ""))
+        return WindowInfo(handle, self.titles[handle], pid, exe)
+
+    def windows(self):
+        return [self._info(h) for h in list(self.titles)]
+
+    def info(self, handle):
+        return self._info(handle) if handle in self.titles else None
+
+    def activate(self, handle):
+        self.active = handle
+        self.log.append(("windows", "activate", self.titles.get(handle)))
+        if handle in self.titles:
+            self._emit("focus", handle)
+        return handle in self.titles
+
+    def close(self, handle):
+        self.log.append(("windows", "close", self.titles.get(handle)))
+        if handle not in self.titles:
+            return False
+        pid = self.owners.get(handle, (None, ""))[0]
+        if pid not in self.ignore_close:
+            self.close_window(handle)
+            if self.on_last_close and not any(o[0] == pid for o in self.owners.values()):
+                self.on_last_close(pid)
+        return True
+
+    def watch(self, on_event):
+        self._listeners.append(on_event)
+        return True
+
+    # ── Simulation (not part of WindowManager) ───────────────────
+
+    def open_window(self, handle, title, pid=None, exe=""):
+        self.titles[handle] = title
+        self.owners[handle] = (pid, exe)
+        self._emit("create", handle)
+
+    def close_window(self, handle):
+        if self.titles.pop(handle, None) is not None:
+            self.owners.pop(handle, None)
+            self._emit("destroy", handle)
+
+    def set_title(self, handle, title):
+        self.titles[handle] = title
+        self._emit("title", handle)
+
+    def _emit(self, kind, handle):
+        for cb in self._listeners:
+            cb(kind, handle)
+
+
+def _program(target):
+    return os.path.basename(target if isinstance(target, str) else target[0])
+
+
+class FakeProcessManager(ProcessManager):
+    def __init__(self, windows, log):
+        self.running = {}               # pid → target
+        self.started = {}               # pid → start time
+        self._windows = windows
+        self._windows.on_last_close = self._exit
+        self._next_pid = 1000
+        self.log = log
+
+    def launch(self, target):
+        pid = self.spawn(target)
+        self.log.append(("processes", "launch", target))
+        return pid is not None
+
+    def spawn(self, target, window=True):
+        """Add a process (with one window titled after its program) without logging a launch."""
+        pid, self._next_pid = self._next_pid, self._next_pid + 1
+        self.running[pid] = target
+        self.started[pid] = float(pid)
+        if window:
+            exe = target if isinstance(target, str) else target[0]
+            self._windows.open_window(pid, _program(target).rsplit(".", 1)[0], pid, exe)
+        return pid
+
+    def kill(self, target):
+        name = _program(target).lower()
+        pids = [pid for pid, t in self.running.items() if _program(t).lower() == name]
+        for pid in pids:
+            self._exit(pid)
+        self.log.append(("processes", "kill", target))
+        return bool(pids)
+
+    def running_pids(self):
+        return set(self.running)
+
+    def describe(self, pid):
+        target = self.running.get(pid)
+        if target is None:
+            return None
+        return (target if isinstance(target, str) else target[0]), self.started[pid]
+
+    def terminate(self, pid, force=False):
+        self.log.append(("processes", "terminate", (pid, force)))
+        if pid not in self.running:
+            return False
+        self._exit(pid)
+        return True
+
+    def _exit(self, pid):
+        self.running.pop(pid, None)
+        self.started.pop(pid, None)
+        for handle in [h for h, (p, _) in self._windows.owners.items() if p == pid]:
+            self._windows.close_window(handle)
+
+
+class FakeVolume(VolumeControl):
+    def __init__(self, log, level=0.5):
+        self.level = level
+        self.muted = False
+        self.log = log
+
+    def get(self):
+        return self.level
+
+    def set(self, level):
+        self.level = level
+        self.log.append(("volume", "set", round(level, 4)))
+
+    def set_mute(self, muted):
+        self.muted = bool(muted)
+        self.log.append(("volume", "mute", self.muted))
+
+
+class FakeAudioDevices(AudioDevices):
+    def __init__(self, log, names=("Microphone (Fake)",), probe_s=0.0):
+        self.names = list(names)        # edit to simulate plugging a device in or out
+        self.probe_s = probe_s          # seconds input_names() takes, like a PortAudio probe
+        self.log = log
+
+    def input_names(self):
+        time.sleep(self.probe_s)
+        self.log.append(("audio", "probe", len(self.names)))
+        return list(self.names)
+
+    def signature(self):
+        return tuple(self.names)
+
+
+class FakeMediaKeys(MediaKeys):
+    def __init__(self, log):
+        self.playing = None             # media_control.NowPlaying to report, if any
+        self.log = log
+
+    def send(self, action):
+        if action not in self.ACTIONS:
+            raise ValueError(action)
+        self.log.append(("media", "send", action))
+        return True
+
+    def now_playing(self):
+        return self.playing
+
+
+# ─── Media sessions (shaped like winsdk's, for media_control) ───────────
+
+class _Events:
+    """add_*/remove_* handler lists; handlers are called as (sender, args)."""
+
+    _tokens = itertools.count(1)
+
+    def __init__(self):
+        self._handlers = {}
+
+    def add(self, handler):
+        token = next(self._tokens)
+        self._handlers[token] = handler
+        return token
+
+    def remove(self, token):
+        self._handlers.pop(token, None)
+
+    def fire(self, sender):
+        for handler in list(self._handlers.values()):
+            handler(sender, None)
+
+    def __len__(self):
+        return len(self._handlers)
+
+
+class FakeMediaSession:
+    """A GlobalSystemMediaTransportControlsSession of one player."""
+
+    PLAYING, PAUSED, STOPPED = 4, 5, 3
+
+    def __init__(self, app, log, title="", artist="", album="", latency=0.0):
+        self.source_app_user_model_id = app
+        self.status = self.PAUSED
+        self.props = SimpleNamespace(title=title, artist=artist, album_title=album)
+        self.latency = latency          # seconds each *_async call takes
+        self.log = log
+        self.playback_info_changed = _Events()
+        self.media_properties_changed = _Events()
+
+    def add_playback_info_changed(self, handler):
+        return self.playback_info_changed.add(handler)
+
+    def remove_playback_info_changed(self, token):
+        self.playback_info_changed.remove(token)
+
+    def add_media_properties_changed(self, handler):
+        return self.media_properties_changed.add(handler)
+
+    def remove_media_properties_changed(self, token):
+        self.media_properties_changed.remove(token)
+
+    def get_playback_info(self):
+        return SimpleNamespace(playback_status=self.status)
+
+    async def try_get_media_properties_async(self):
+        await asyncio.sleep(self.latency)
+        return SimpleNamespace(**vars(self.props))
+
+    async def _transport(self, action, status=None):
+        await asyncio.sleep(self.latency)
+        self.log.append(("media", action, self.source_app_user_model_id))
+        if status is not None and status != self.status:
+            self.status = status
+            self.playback_info_changed.fire(self)
+        return True
+
+    def try_play_async(self):
+        return self._transport("play", self.PLAYING)
+
+    def try_pause_async(self):
+        return self._transport("pause", self.PAUSED)
+
+    def try_toggle_play_pause_async(self):
+        return self._transport("play_pause", self.PAUSED if self.status == self.PLAYING else self.PLAYING)
+
+    def try_stop_async(self):
+        return self._transport("stop", self.STOPPED)
+
+    def try_skip_next_async(self):
+        return self._transport("next")
+
+    def try_skip_previous_async(self):
+        return self._transport("previous")
+
+    # ── Simulation ───────────────────────────────────────────────
+
+    def set_track(self, title, artist="", album=""):
+        self.props = SimpleNamespace(title=title, artist=artist, album_title=album)
+        self.media_properties_changed.fire(self)
+
+
+class FakeMediaSessionManager:
+    """A GlobalSystemMediaTransportControlsSessionManager over FakeMediaSessions."""
+
+    def __init__(self, log, latency=0.0):
+        self.sessions = []
+        self.current = None
+        self.latency = latency          # seconds request_async takes
+        self.requests = 0
+        self.log = log
+        self.current_session_changed = _Events()
+
+    async def request_async(self):
+        self.requests += 1
+        await asyncio.sleep(self.latency)
+        return self
+
+    def get_current_session(self):
+        return self.current
+
+    def get_sessions(self):
+        return list(self.sessions)
+
+    def add_current_session_changed(self, handler):
+        return self.current_session_changed.add(handler)
+
+    def remove_current_session_changed(self, token):
+        self.current_session_changed.remove(token)
+
+    # ── Simulation ───────────────────────────────────────────────
+
+    def open_session(self, app, **kw):
+        """Start a player session and make it current."""
+        session = FakeMediaSession(app, self.log, **kw)
+        self.sessions.append(session)
+        self.set_current(session)
+        return session
+
+    def close_session(self, session):
+        self.sessions.remove(session)
+        if session is self.current:
+            self.set_current(self.sessions[-1] if self.sessions else None)
+
+    def set_current(self, session):
+        self.current = session
+        self.current_session_changed.fire(self)
+
+
+class FakeTextInput(TextInput):
+    def __init__(self, log, call_s=0.0, key_s=0.0):
+        self.typed = []
+        self.screen = ""                # what the focused window would now show
+        self.call_s = call_s            # seconds per OS call …
+        self.key_s = key_s              # … plus per key event (down + up) it carries
+        self.log = log
+
+    def _cost(self, keys):
+        if self.call_s or self.key_s:
+            time.sleep(self.call_s + self.key_s * keys)
+
+    def write(self, text):
+        self._cost(len(text))
+        self.typed.append(text)
+        self.screen += text
+        self.log.append(("text", "write", text))
+
+    def press(self, key):
+        self._cost(1)
+        if key == "enter":
+            self.screen += "\n"
+        elif key == "backspace":
+            self.screen = self.screen[:-1]
+        self.log.append(("text", "press", key))
+
+    def erase(self, n):
+        self._cost(n)
+        self.screen = self.screen[:len(self.screen) - n]
+        self.log.append(("text", "erase", n))
+
+
+def create(apps=None, log=None, **_):
+    log = [] if log is None else log
+    windows = FakeWindowManager(log)
+    return Platform("fake", FakeAppCatalog(apps or {}, log), windows, FakeProcessManager(windows, log),
+                    FakeVolume(log), FakeAudioDevices(log), FakeMediaKeys(log), FakeTextInput(log))
@@ -0,0 +1,285 @@
+# platforms/linux.py
+
+"""
+Linux backend: XDG .desktop catalog, wmctrl windows, /proc process
+lookup, PulseAudio/PipeWire volume via pactl, MPRIS media keys via
+playerctl and typing via xdotool.  Missing tools make the corresponding
+call return False instead of raising.
+"""
+
+import os
+import re
+import shlex
+import signal
+import subprocess
+import threading
+
+from app_scanner import refresh_app_state, refresh_shortcut_tree
+
+from .base import (AppCatalog, WindowInfo, WindowManager, ProcessManager, VolumeControl,
+                   AudioDevices, MediaKeys, TextInput, Platform)
+
+
+def _run(args, **kw):
+    """stdout of a helper tool, or None if it is missing or fails."""
+    try:
+        return subprocess.run(args, capture_output=True, text=True, check=True, timeout=5, **kw).stdout
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+# ─── Applications ────────────────────────────────────────────────────────
+
+# field codes (%f, %U, …) are placeholders for files/URLs; launching bare drops them
+_FIELD_CODE = re.compile(r"\s*%[fFuUdDnNickvm]")
+
+
+def application_dirs():
+    home = os.environ.get("XDG_DATA_HOME") or os.path.expanduser("~/.local/share")
+    data = os.environ.get("XDG_DATA_DIRS") or "/usr/local/share:/usr/share"
+    dirs = [home] + [d for d in data.split(":") if d]
+    dirs += ["/var/lib/flatpak/exports/share", os.path.expanduser("~/.local/share/flatpak/exports/share")]
+    out = []
+    for d in dirs:
+        apps = os.path.join(d, "applications")
+        if apps not in out and os.path.isdir(apps):
+            out.append(apps)
+    if os.path.isdir("/var/lib/snapd/desktop/applications"):
+        out.append("/var/lib/snapd/desktop/applications")
+    return out
+
+
+def read_desktop_entry(path):
+    """[name, command line] of a launchable .desktop file, or None."""
+    fields, in_entry = {}, False
+    try:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            for line in f:
+                line = line.strip()
+                if line.startswith("["):
+                    in_entry = line == "[Desktop Entry]"
+                elif in_entry and "=" in line:
+                    k, v = line.split("=", 1)
+                    fields.setdefault(k.strip(), v.strip())
+    except OSError:
+        return None
+    if fields.get("Type", "Application") != "Application" or not fields.get("Exec"):
+        return None
+    if fields.get("NoDisplay") == "true" or fields.get("Hidden") == "true":
+        return None
+    name = fields.get("Name") or os.path.basename(path).rsplit(".", 1)[0]
+    return [name.lower(), _FIELD_CODE.sub("", fields["Exec"]).replace("%%", "%")]
+
+
+def refresh_desktop_dir(folder, prev):
+    return refresh_shortcut_tree(folder, prev, ".desktop", read_desktop_entry,
+                                 lambda full, entry: tuple(entry) if entry else None)
+
+
+class LinuxAppCatalog(AppCatalog):
+    def refresh(self, prev_state=None):
+        sources = [(f"xdg:{d}", refresh_desktop_dir, (d,)) for d in application_dirs()]
+        return refresh_app_state(prev_state, sources=sources)
+
+
+# ─── Windows & processes ─────────────────────────────────────────────────
+
+class LinuxWindowManager(WindowManager):
+    def list_windows(self):
+        out = _run(["wmctrl", "-l"])
+        windows = []
+        for line in (out or "").splitlines():
+            parts = line.split(None, 3)
+            if len(parts) == 4:
+                windows.append((parts[0], parts[3]))
+        return windows
+
+    def windows(self):
+        out = _run(["wmctrl", "-lp"])
+        windows = []
+        for line in (out or "").splitlines():
+            parts = line.split(None, 4)
+            if len(parts) == 5:
+                pid = int(parts[2]) if parts[2].isdigit() and parts[2] != "0" else None
+                windows.append(WindowInfo(parts[0], parts[4], pid, _exe(pid)))
+        return windows
+
+    def activate(self, handle):
+        return _run(["wmctrl", "-i", "-a", handle]) is not None
+
+    def close(self, handle):
+        return _run(["wmctrl", "-i", "-c", handle]) is not None
+
+    def watch(self, on_event):
+        """
+        `xprop -spy` on the root window: a changed client list means windows
+        came or went ("resync"), a changed active window is a focus event.
+        Title changes are picked up by the registry's periodic re-list.
+        """
+        try:
+            proc = subprocess.Popen(["xprop", "-root", "-spy", "_NET_CLIENT_LIST", "_NET_ACTIVE_WINDOW"],
+                                    stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+        except OSError:
+            return False
+        try:
+            proc.wait(timeout=0.2)      # exits straight away without an X display
+            return False
+        except subprocess.TimeoutExpired:
+            pass
+
+        def run():
+            for line in proc.stdout:
+                if line.startswith("_NET_CLIENT_LIST"):
+                    on_event("resync", None)
+                elif line.startswith("_NET_ACTIVE_WINDOW"):
+                    m = re.search(r"0x([0-9a-f]+)", line)
+                    if m and int(m.group(1), 16):
+                        on_event("focus", f"0x{int(m.group(1), 16):08x}")   # wmctrl's spelling
+
+        threading.Thread(target=run, daemon=True, name="xprop-spy").start()
+        return True
+
+
+def _exe(pid):
+    try:
+        return os.readlink(f"/proc/{pid}/exe") if pid else ""
+    except OSError:
+        return ""
+
+
+def _program(target):
+    try:
+        argv = shlex.split(target)
+    except ValueError:
+        argv = target.split()
+    return os.path.basename(argv[0]) if argv else ""
+
+
+class LinuxProcessManager(ProcessManager):
+    def launch(self, target):
+        try:
+            argv = shlex.split(target) if isinstance(target, str) else list(target)
+            subprocess.Popen(argv, start_new_session=True,
+                             stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            return True
+        except (OSError, ValueError):
+            return False
+
+    def pids(self, program):
+        """Pids whose executable, argv[0] or comm is `program`."""
+        found = []
+        for entry in os.listdir("/proc"):
+            if not entry.isdigit() or int(entry) == os.getpid():
+                continue
+            base = f"/proc/{entry}"
+            names = set()
+            try:
+                names.add(os.path.basename(os.readlink(f"{base}/exe")))
+            except OSError:
+                pass
+            try:
+                with open(f"{base}/cmdline", "rb") as f:
+                    argv0 = f.read().split(b"\0", 1)[0].decode(errors="replace")
+                names.add(os.path.basename(argv0))
+                with open(f"{base}/comm") as f:
+                    names.add(f.read().strip())
+            except OSError:
+                continue
+            # comm is cut to 15 characters by the kernel
+            if program in names or program[:15] in names:
+                found.append(int(entry))
+        return found
+
+    def running_pids(self):
+        return {int(e) for e in os.listdir("/proc") if e.isdigit()}
+
+    def describe(self, pid):
+        try:
+            with open(f"/proc/{pid}/stat", "rb") as f:
+                # fields after the parenthesised comm; starttime is field 22
+                started = int(f.read().rsplit(b")", 1)[1].split()[19])
+        except (OSError, IndexError, ValueError):
+            return None
+        exe = _exe(pid)
+        if not exe:
+            try:
+                with open(f"/proc/{pid}/comm") as f:
+                    exe = f.read().strip()
+            except OSError:
+                return None
+        return exe, started
+
+    def terminate(self, pid, force=False):
+        try:
+            os.kill(pid, signal.SIGKILL if force else signal.SIGTERM)
+            return True
+        except OSError:
+            return False
+
+    def kill(self, target):
+        pids = self.pids(_program(target))
+        for pid in pids:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except OSError:
+                pass
+        return bool(pids)
+
+
+# ─── Audio, media & input ────────────────────────────────────────────────
+
+class LinuxVolume(VolumeControl):
+    SINK = "@DEFAULT_SINK@"
+
+    def get(self):
+        out = _run(["pactl", "get-sink-volume", self.SINK])
+        m = re.search(r"(\d+)%", out or "")
+        return int(m.group(1)) / 100.0 if m else None     # pactl failed: not "silent"
+
+    def set(self, level):
+        return _run(["pactl", "set-sink-volume", self.SINK, f"{round(level * 100)}%"]) is not None
+
+    def set_mute(self, muted):
+        return _run(["pactl", "set-sink-mute", self.SINK, "1" if muted else "0"]) is not None
+
+
+class LinuxAudioDevices(AudioDevices):
+    def signature(self):
+        """ALSA device nodes; a USB microphone adds/removes a pcmC*D*c node."""
+        try:
+            return tuple(sorted(os.listdir("/dev/snd")))
+        except OSError:
+            return None
+
+
+class LinuxMediaKeys(MediaKeys):
+    COMMANDS = {"play_pause": "play-pause", "next": "next", "previous": "previous", "stop": "stop"}
+
+    def send(self, action):
+        return _run(["playerctl", self.COMMANDS[action]]) is not None
+
+    def now_playing(self):
+        from media_control import NowPlaying
+        out = _run(["playerctl", "metadata", "--format",
+                    "{{playerName}}\t{{title}}\t{{artist}}\t{{album}}\t{{lc(status)}}"])
+        fields = out.rstrip("\n").split("\t") if out else []
+        return NowPlaying(*fields) if len(fields) == 5 else None
+
+
+class LinuxTextInput(TextInput):
+    KEYS = {"enter": "Return", "backspace": "BackSpace", "tab": "Tab", "space": "space",
+            "escape": "Escape", "delete": "Delete"}
+
+    def write(self, text):
+        return _run(["xdotool", "type", "--delay", "0", "--", text]) is not None
+
+    def press(self, key):
+        return _run(["xdotool", "key", self.KEYS.get(key, key)]) is not None
+
+    def erase(self, n):
+        return _run(["xdotool", "key", "--delay", "0", "--repeat", str(n), "BackSpace"]) is not None
+
+
+def create(**_):
+    return Platform("linux", LinuxAppCatalog(), LinuxWindowManager(), LinuxProcessManager(),
+                    LinuxVolume(), LinuxAudioDevices(), LinuxMediaKeys(), LinuxTextInput())
@@ -0,0 +1,302 @@
+# platforms/windows.py
+
+"""
+Windows backend: registry + Start Menu catalog, win32gui windows,
+taskkill, pycaw master volume, winmm device changes, media keys via
+`keyboard`, typing via SendInput.
+Third-party modules are imported on first use.
+"""
+
+import ctypes
+import os
+import subprocess
+import threading
+
+from app_scanner import refresh_app_state
+from startup import lazy_import
+
+from .base import (AppCatalog, WindowInfo, WindowManager, ProcessManager, VolumeControl,
+                   AudioDevices, MediaKeys, TextInput, Platform)
+
+win32gui     = lazy_import("win32gui")
+win32con     = lazy_import("win32con")
+win32api     = lazy_import("win32api")
+win32process = lazy_import("win32process")
+keyboard     = lazy_import("keyboard")
+pyautogui    = lazy_import("pyautogui")
+
+
+class WindowsAppCatalog(AppCatalog):
+    def refresh(self, prev_state=None):
+        return refresh_app_state(prev_state)
+
+
+class WindowsWindowManager(WindowManager):
+    # SetWinEventHook events → WindowManager.EVENTS
+    _WIN_EVENTS = {0x8002: "create",     # EVENT_OBJECT_SHOW
+                   0x8003: "destroy",    # EVENT_OBJECT_HIDE
+                   0x8001: "destroy",    # EVENT_OBJECT_DESTROY
+                   0x800C: "title",      # EVENT_OBJECT_NAMECHANGE
+                   0x0003: "focus"}      # EVENT_SYSTEM_FOREGROUND
+
+    def __init__(self):
+        self._exes = {}         # pid → exe path, cleared on every full listing (pids get reused)
+
+    def list_windows(self):
+        out = []
+
+        def _enum(hwnd, _):
+            if win32gui.IsWindowVisible(hwnd):
+                out.append((hwnd, win32gui.GetWindowText(hwnd)))
+
+        win32gui.EnumWindows(_enum, None)
+        return out
+
+    def _exe(self, pid):
+        if pid not in self._exes:
+            path = ""
+            h = ctypes.windll.kernel32.OpenProcess(0x1000, False, pid)  # QUERY_LIMITED_INFORMATION
+            if h:
+                buf, size = ctypes.create_unicode_buffer(1024), ctypes.c_ulong(1024)
+                if ctypes.windll.kernel32.QueryFullProcessImageNameW(h, 0, buf, ctypes.byref(size)):
+                    path = buf.value
+                ctypes.windll.kernel32.CloseHandle(h)
+            self._exes[pid] = path
+        return self._exes[pid]
+
+    def info(self, hwnd):
+        try:
+            if not win32gui.IsWindow(hwnd) or not win32gui.IsWindowVisible(hwnd):
+                return None
+            _, pid = win32process.GetWindowThreadProcessId(hwnd)
+            return WindowInfo(hwnd, win32gui.GetWindowText(hwnd), pid, self._exe(pid))
+        except Exception:
+            return None
+
+    def windows(self):
+        self._exes.clear()
+        return [w for w in (self.info(hwnd) for hwnd, _ in self.list_windows()) if w is not None]
+
+    def watch(self, on_event):
+        """WinEvent hooks for top-level windows, on a thread with its own message loop."""
+        from ctypes import wintypes
+        proc_type = ctypes.WINFUNCTYPE(None, wintypes.HANDLE, wintypes.DWORD, wintypes.HWND,
+                                       wintypes.LONG, wintypes.LONG, wintypes.DWORD, wintypes.DWORD)
+
+        def callback(hook, event, hwnd, id_object, id_child, thread, time_ms):
+            # OBJID_WINDOW / CHILDID_SELF only, and only top-level windows
+            try:
+                if hwnd and id_object == 0 and id_child == 0 and win32gui.GetParent(hwnd) == 0:
+                    on_event(self._WIN_EVENTS[event], hwnd)
+            except Exception:
+                pass
+
+        def run():
+            user32 = ctypes.windll.user32
+            proc = proc_type(callback)          # must outlive the hooks
+            hooks = [user32.SetWinEventHook(e, e, 0, proc, 0, 0, 0x0002)  # OUTOFCONTEXT|SKIPOWNPROCESS
+                     for e in self._WIN_EVENTS]
+            ready.append(all(hooks))
+            started.set()
+            msg = wintypes.MSG()
+            while user32.GetMessageW(ctypes.byref(msg), 0, 0, 0) > 0:
+                user32.TranslateMessage(ctypes.byref(msg))
+                user32.DispatchMessageW(ctypes.byref(msg))
+
+        ready, started = [], threading.Event()
+        threading.Thread(target=run, daemon=True, name="win-events").start()
+        started.wait(5)
+        return bool(ready and ready[0])
+
+    def activate(self, hwnd):
+        """Restore if minimized and bring to the foreground as if Alt+Tabbed to it."""
+        try:
+            if win32gui.IsIconic(hwnd):
+                win32gui.ShowWindow(hwnd, win32con.SW_RESTORE)
+
+            # If not already foreground, attach input threads to force focus
+            foreground_hwnd = win32gui.GetForegroundWindow()
+            if foreground_hwnd != hwnd:
+                current_thread = win32api.GetCurrentThreadId()
+                target_thread, _ = win32process.GetWindowThreadProcessId(hwnd)
+
+                ctypes.windll.user32.AttachThreadInput(current_thread, target_thread, True)
+
+                win32gui.BringWindowToTop(hwnd)
+                win32gui.SetForegroundWindow(hwnd)
+                win32gui.SetActiveWindow(hwnd)
+
+                ctypes.windll.user32.AttachThreadInput(current_thread, target_thread, False)
+            else:
+                win32gui.BringWindowToTop(hwnd)
+            return True
+        except Exception:
+            return False
+
+    def close(self, hwnd):
+        try:
+            win32gui.PostMessage(hwnd, win32con.WM_CLOSE, 0, 0)
+            return True
+        except Exception:
+            return False
+
+
+class WindowsProcessManager(ProcessManager):
+    def launch(self, target):
+        try:
+            subprocess.Popen(target)
+            return True
+        except Exception:
+            return False
+
+    def kill(self, target):
+        try:
+            subprocess.run(["taskkill", "/im", os.path.basename(target), "/f"],
+                           check=True, capture_output=True)
+            return True
+        except Exception:
+            return False
+
+
+class WindowsVolume(VolumeControl):
+    def __init__(self):
+        self._endpoint = None
+
+    @property
+    def endpoint(self):
+        """IAudioEndpointVolume of the default speakers, created on first use."""
+        if self._endpoint is None:
+            import comtypes
+            from pycaw.pycaw import AudioUtilities, IAudioEndpointVolume
+            try:
+                comtypes.CoInitialize()
+            except OSError:
+                pass
+            devices   = AudioUtilities.GetSpeakers()
+            interface = devices.Activate(IAudioEndpointVolume._iid_, comtypes.CLSCTX_ALL, None)
+            self._endpoint = comtypes.cast(interface, comtypes.POINTER(IAudioEndpointVolume))
+        return self._endpoint
+
+    def get(self):
+        return self.endpoint.GetMasterVolumeLevelScalar()
+
+    def set(self, level):
+        self.endpoint.SetMasterVolumeLevelScalar(level, None)
+
+    def set_mute(self, muted):
+        self.endpoint.SetMute(int(bool(muted)), None)
+
+
+class _WAVEINCAPSW(ctypes.Structure):
+    _fields_ = [("wMid", ctypes.c_ushort), ("wPid", ctypes.c_ushort), ("vDriverVersion", ctypes.c_uint),
+                ("szPname", ctypes.c_wchar * 32), ("dwFormats", ctypes.c_uint),
+                ("wChannels", ctypes.c_ushort), ("wReserved1", ctypes.c_ushort)]
+
+
+class WindowsAudioDevices(AudioDevices):
+    def signature(self):
+        """waveIn device names: winmm answers in microseconds, unlike a PortAudio probe."""
+        winmm = ctypes.windll.winmm
+        caps, names = _WAVEINCAPSW(), []
+        for i in range(winmm.waveInGetNumDevs()):
+            if winmm.waveInGetDevCapsW(i, ctypes.byref(caps), ctypes.sizeof(caps)) == 0:
+                names.append(caps.szPname)
+        return tuple(names)
+
+
+class WindowsMediaKeys(MediaKeys):
+    KEYS = {"play_pause": "play/pause media", "next": "next track",
+            "previous": "previous track", "stop": "stop media"}
+
+    def __init__(self):
+        self.session = None     # media_control.MediaController, see prepare()
+
+    def prepare(self):
+        from media_control import MediaController
+        self.session = MediaController().start()
+        self.session.submit(self.session.connect())
+
+    def send(self, action):
+        """Through the media session (without waiting); the media key if there is none."""
+        if self.session is None:
+            keyboard.send(self.KEYS[action])
+            return True
+
+        def fallback(future):
+            if future.cancelled() or future.exception() is not None or not future.result():
+                keyboard.send(self.KEYS[action])
+        self.session.send(action).add_done_callback(fallback)
+        return True
+
+    def now_playing(self):
+        return self.session.now_playing() if self.session else None
+
+
+class _KEYBDINPUT(ctypes.Structure):
+    _fields_ = [("wVk", ctypes.c_ushort), ("wScan", ctypes.c_ushort), ("dwFlags", ctypes.c_uint),
+                ("time", ctypes.c_uint), ("dwExtraInfo", ctypes.c_size_t)]
+
+
+class _MOUSEINPUT(ctypes.Structure):
+    # only here so that sizeof(_INPUT) matches the real union
+    _fields_ = [("dx", ctypes.c_int), ("dy", ctypes.c_int), ("mouseData", ctypes.c_uint),
+                ("dwFlags", ctypes.c_uint), ("time", ctypes.c_uint), ("dwExtraInfo", ctypes.c_size_t)]
+
+
+class _INPUTUNION(ctypes.Union):
+    _fields_ = [("ki", _KEYBDINPUT), ("mi", _MOUSEINPUT)]
+
+
+class _INPUT(ctypes.Structure):
+    _anonymous_ = ("u",)
+    _fields_ = [("type", ctypes.c_uint), ("u", _INPUTUNION)]
+
+
+class WindowsTextInput(TextInput):
+    """
+    A whole string is one SendInput call of KEYEVENTF_UNICODE events
+    (pyautogui sent every character as separate key presses), however
+    long it is.  Nothing goes through the clipboard: there is no telling
+    when the target has read a paste, so the user's clipboard could not
+    be put back safely.
+    """
+    VK = {"enter": 0x0D, "backspace": 0x08, "tab": 0x09, "escape": 0x1B, "delete": 0x2E,
+          "space": 0x20}
+
+    def write(self, text):
+        events = []
+        for ch in text.replace("\r\n", "\n"):
+            if ch == "\n":
+                events += [(self.VK["enter"], 0, 0), (self.VK["enter"], 0, 0x0002)]
+                continue
+            data = ch.encode("utf-16-le")
+            for i in range(0, len(data), 2):        # surrogate pairs are two units
+                unit = int.from_bytes(data[i:i + 2], "little")
+                events += [(0, unit, 0x0004), (0, unit, 0x0004 | 0x0002)]   # UNICODE, UNICODE | KEYUP
+        return self._send(events)
+
+    def press(self, key):
+        vk = self.VK.get(key)
+        if vk is None:
+            pyautogui.press(key)
+            return True
+        return self._send([(vk, 0, 0), (vk, 0, 0x0002)])
+
+    def erase(self, n):
+        return self._send([(self.VK["backspace"], 0, flags) for _ in range(n) for flags in (0, 0x0002)])
+
+    @staticmethod
+    def _send(events):
+        """One SendInput call for [(virtual key, scan code / UTF-16 unit, flags)]."""
+        if not events:
+            return True
+        inputs = (_INPUT * len(events))()
+        for item, (vk, scan, flags) in zip(inputs, events):
+            item.type = 1                           # INPUT_KEYBOARD
+            item.ki.wVk, item.ki.wScan, item.ki.dwFlags = vk, scan, flags
+        return ctypes.windll.user32.SendInput(len(events), inputs, ctypes.sizeof(_INPUT)) == len(events)
+
+
+def create(**_):
+    return Platform("windows", WindowsAppCatalog(), WindowsWindowManager(), WindowsProcessManager(),
+                    WindowsVolume(), WindowsAudioDevices(), WindowsMediaKeys(), WindowsTextInput())
@@ -0,0 +1,126 @@
+# process_tracker.py
+
+"""
+Running processes by program, for "open" and "close".
+
+"open" used to start a second instance of an app that was already
+running, and "close" spawned `taskkill /im <exe> /f`.  The tracker keeps
+pid → program from the platform's process table, refreshed incrementally:
+each refresh lists pids (one cheap call) and only describes the new ones.
+Programs are compared by stem (window_registry.program_name), so an
+APP_COMMANDS target finds its processes however it was started.
+
+stop() closes gracefully: the caller has already asked the app's windows
+to close; whatever is still running after `grace` seconds is terminated,
+and after as long again killed.  That wait happens on a background thread.
+"""
+
+import threading
+import time
+from collections import defaultdict
+
+from window_registry import program_name
+
+
+class ProcessTracker:
+    def __init__(self, processes, max_age=1.0):
+        self.processes = processes      # platforms ProcessManager
+        self.max_age = max_age          # lookups refresh a table older than this
+        self._lock = threading.Lock()
+        self._procs = {}                # pid → (program, exe, start time)
+        self._by_program = defaultdict(set)
+        self._refreshed = 0.0
+
+    # ── Table ────────────────────────────────────────────────────
+
+    def refresh(self):
+        """Apply pids that appeared or exited since the last call.  Returns stats."""
+        t0 = time.perf_counter()
+        current = self.processes.running_pids()
+        with self._lock:
+            gone = [pid for pid in self._procs if pid not in current]
+            new = [pid for pid in current if pid not in self._procs]
+        described = [(pid, self.processes.describe(pid)) for pid in new]
+        added = removed = 0
+        with self._lock:
+            # a refresh on another thread may have applied some of these meanwhile
+            for pid in gone:
+                removed += self._forget(pid)
+            for pid, info in described:
+                if info is not None and pid not in self._procs:
+                    exe, started = info
+                    program = program_name(exe)
+                    self._procs[pid] = (program, exe, started)
+                    self._by_program[program].add(pid)
+                    added += 1
+            self._refreshed = time.monotonic()
+        return {"processes": len(self._procs), "added": added, "removed": removed,
+                "elapsed_ms": (time.perf_counter() - t0) * 1e3}
+
+    def _forget(self, pid):
+        """Drop `pid`; False if it was not in the table."""
+        entry = self._procs.pop(pid, None)
+        if entry is None:
+            return False
+        program = entry[0]
+        bucket = self._by_program[program]
+        bucket.discard(pid)
+        if not bucket:
+            del self._by_program[program]
+        return True
+
+    def __len__(self):
+        return len(self._procs)
+
+    def pids_for(self, target):
+        """Running pids of the program behind an APP_COMMANDS target (oldest first)."""
+        program = program_name(target)
+        fresh = time.monotonic() - self._refreshed <= self.max_age
+        if not fresh:
+            self.refresh()
+        pids = self._lookup(program)
+        if not pids and fresh:
+            # not seen yet: it may have been started since the last refresh
+            self.refresh()
+            pids = self._lookup(program)
+        return pids
+
+    def _lookup(self, program):
+        with self._lock:
+            return sorted(self._by_program.get(program, ()), key=lambda pid: self._procs[pid][2])
+
+    # ── Stopping ─────────────────────────────────────────────────
+
+    def stop(self, pids, grace=3.0, wait=False):
+        """
+        Terminate whatever of `pids` is still running after `grace` s, kill
+        it after another `grace` s.  Runs on a thread unless wait=True;
+        returns the thread (or the pids that had to be killed).
+        """
+        def run():
+            forced = []
+            for force in (False, True):
+                left = self._wait_exit(pids, grace)
+                if not left:
+                    break
+                for pid in left:
+                    self.processes.terminate(pid, force=force)
+                if force:
+                    forced = left
+            self.refresh()
+            return forced
+
+        if wait:
+            return run()
+        t = threading.Thread(target=run, daemon=True, name="process-stop")
+        t.start()
+        return t
+
+    def _wait_exit(self, pids, timeout, poll=0.05):
+        deadline = time.monotonic() + timeout
+        while True:
+            running = self.processes.running_pids()
+            left = [pid for pid in pids if pid in running]
+            if not left or time.monotonic() >= deadline:
+                return left
+            time.sleep(min(poll, max(0.0, deadline - time.monotonic())))
@@ -0,0 +1,129 @@
+# recognizers.py
+
+"""
+Speech-to-text backends behind one interface.
+
+Every backend takes a speech_recognition.AudioData and returns a
+RecognitionResult (text is None when nothing was understood).  The backend
+is picked from the "recognizer" section of va_settings.json:
+
+    "recognizer": {"backend": "google",  "language": "bg-BG"}
+    "recognizer": {"backend": "vosk",    "model_path": "C:/models/vosk-bg"}
+    "recognizer": {"backend": "fixture", "fixture_path": "bench/fixtures/transcripts.json"}
+"""
+
+import hashlib
+import json
+import time
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+DEFAULT_CFG = {"backend": "google", "language": "bg-BG"}
+
+
+class RecognitionResult(NamedTuple):
+    text: Optional[str]
+    confidence: float       # 0..1, 1.0 when the backend gives no score
+    audio_s: float          # length of the audio that was recognized
+    elapsed_s: float        # wall time spent in the backend
+    backend: str
+
+    @property
+    def rtf(self):
+        """Real-time factor: processing time / audio length."""
+        return self.elapsed_s / self.audio_s if self.audio_s else 0.0
+
+
+def audio_seconds(audio):
+    return len(audio.frame_data) / float(audio.sample_rate * audio.sample_width)
+
+
+class RecognizerBackend:
+    name = "base"
+
+    def recognize(self, audio) -> RecognitionResult:
+        t0 = time.perf_counter()
+        text, conf = self._recognize(audio)
+        return RecognitionResult(text or None, conf, audio_seconds(audio),
+                                 time.perf_counter() - t0, self.name)
+
+    def _recognize(self, audio):
+        """Return (text or None, confidence)."""
+        raise NotImplementedError
+
+
+class GoogleBackend(RecognizerBackend):
+    name = "google"
+
+    def __init__(self, language="bg-BG", **_):
+        import speech_recognition as sr
+        self._sr = sr
+        self._recognizer = sr.Recognizer()
+        self.language = language
+
+    def _recognize(self, audio):
+        try:
+            res = self._recognizer.recognize_google(audio, language=self.language, show_all=True)
+        except self._sr.UnknownValueError:
+            return None, 0.0
+        if not res or not res.get("alternative"):
+            return None, 0.0
+        best = res["alternative"][0]
+        return best.get("transcript"), float(best.get("confidence", 1.0))
+
+
+class VoskBackend(RecognizerBackend):
+    """Offline recognition with a local Vosk/Kaldi model (`pip install vosk`)."""
+    name = "vosk"
+    RATE = 16000
+
+    def __init__(self, model_path, **_):
+        import vosk
+        vosk.SetLogLevel(-1)
+        self._vosk = vosk
+        self._model = vosk.Model(str(model_path))
+
+    def _recognize(self, audio):
+        rec = self._vosk.KaldiRecognizer(self._model, self.RATE)
+        rec.SetWords(True)
+        rec.AcceptWaveform(audio.get_raw_data(convert_rate=self.RATE, convert_width=2))
+        res = json.loads(rec.FinalResult())
+        words = res.get("result", [])
+        conf = sum(w.get("conf", 1.0) for w in words) / len(words) if words else 0.0
+        return res.get("text") or None, conf
+
+
+class FixtureBackend(RecognizerBackend):
+    """
+    Deterministic stand-in for tests and benchmarks.  Looks the audio up in
+    a {sha1 of raw frames: text} table and can simulate network delay.
+    """
+    name = "fixture"
+
+    def __init__(self, transcripts=None, fixture_path=None, delay_s=0.0, **_):
+        self.transcripts = dict(transcripts or {})
+        if fixture_path:
+            self.transcripts.update(json.loads(Path(fixture_path).read_text(encoding="utf-8")))
+        self.delay_s = delay_s
+
+    @staticmethod
+    def key(audio):
+        return hashlib.sha1(audio.frame_data).hexdigest()
+
+    def add(self, audio, text):
+        self.transcripts[self.key(audio)] = text
+
+    def _recognize(self, audio):
+        if self.delay_s:
+            time.sleep(self.delay_s)
+        text = self.transcripts.get(self.key(audio))
+        return text, 1.0 if text else 0.0
+
+
+BACKENDS = {"google": GoogleBackend, "vosk": VoskBackend, "fixture": FixtureBackend}
+
+
+def create_backend(cfg=None) -> RecognizerBackend:
+    """Build the backend named in a va_settings.json "recognizer" section."""
+    cfg = dict(DEFAULT_CFG, **(cfg or {}))
+    return BACKENDS[cfg.pop("backend")](**cfg)
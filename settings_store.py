@@ -0,0 +1,254 @@
+# settings_store.py
+
+"""
+Every JSON file the app keeps, behind one store.
+
+save_json used to rewrite files in place (a crash mid-write left half a
+file) from whichever thread asked, and load_json turned any error into
+the default, so a corrupt va_settings.json silently reset the settings.
+SettingsStore holds each Document in memory and persists it like this:
+
+  writes    put()/update() only mark a document dirty.  A writer thread
+            waits until changes stop for `delay` seconds (at most
+            `max_delay` after the first), then writes every dirty
+            document.  flush() writes now; it also runs at exit.
+  atomic    the new content goes to <file>.<pid>.<thread>.tmp and is
+            fsynced.  The current file, if it parses, is copied to
+            <file>.bak (the last good copy).  Then the tmp file is
+            renamed over the file.  A crash at any point leaves a
+            complete file, a complete .bak, or both.
+  versions  the document's schema number is stored under "_schema";
+            older files go through the document's migrations in order
+            when they are loaded (files without one are version 1).
+  recovery  if a file is missing or does not parse, the newest
+            complete tmp file (written and fsynced, never renamed) or
+            else the .bak is used.  It is written back and reported
+            in `problems`.
+
+Documents are JSON objects.  get() returns the stored object itself:
+treat it as read-only and hand changes to put()/update().
+"""
+
+import atexit
+import json
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Callable, NamedTuple
+
+SCHEMA_KEY = "_schema"
+STALE_TMP_S = 60.0          # tmp files older than this are debris of a crashed writer
+
+
+class Document(NamedTuple):
+    filename: str
+    version: int = 1
+    migrations: tuple = ()      # migrations[i](data, folder) takes version i+1 to i+2
+    default: Callable = dict    # data of a document that has never been written
+
+
+def read_json(path):
+    """Parsed JSON object at `path`, or None if it is missing, unreadable or not an object."""
+    try:
+        data = json.loads(Path(path).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def _replace(src, dst, attempts=20):
+    # on Windows a reader holding dst open makes the rename fail for a moment
+    for i in range(attempts):
+        try:
+            os.replace(src, dst)
+            return
+        except PermissionError:
+            if i == attempts - 1:
+                raise
+            time.sleep(0.005 * (i + 1))
+
+
+def _fsync_dir(folder):
+    if os.name == "posix":
+        fd = os.open(folder, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+def write_atomic(path, text):
+    """Write `text` (serialized JSON) to `path` via an fsynced tmp file, keeping the old copy as .bak."""
+    path = Path(path)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    if read_json(path) is not None:
+        bak_tmp = path.with_name(f"{tmp.stem}.bak.tmp")
+        try:
+            shutil.copyfile(path, bak_tmp)
+            _replace(bak_tmp, path.with_name(path.name + ".bak"))
+        except OSError:
+            try:
+                os.unlink(bak_tmp)
+            except OSError:
+                pass
+    _replace(tmp, path)
+    _fsync_dir(path.parent)
+
+
+class SettingsStore:
+    def __init__(self, folder, documents, delay=0.5, max_delay=2.0):
+        self.folder = Path(folder)
+        self.documents = dict(documents)    # name → Document
+        self.delay = delay
+        self.max_delay = max_delay
+        self.problems = []                  # what recovery and migration had to do
+        self._data = {}
+        self._dirty = set()
+        self._first_dirty = self._last_dirty = 0.0
+        self._lock = threading.RLock()      # guards _data/_dirty; held while serializing
+        self._write_lock = threading.Lock() # one writer at a time in this process
+        self._wake = threading.Condition(self._lock)
+        self._writer = None
+        self._closed = False
+        self.stats = {"updates": 0, "writes": 0, "recovered": 0, "migrated": 0}
+        atexit.register(self.flush)
+
+    # ── Reading ──────────────────────────────────────────────────
+
+    def get(self, name):
+        """The document's data (loaded on first use).  Do not mutate it."""
+        with self._lock:
+            if name not in self._data:
+                self._data[name] = self._load(name)
+            return self._data[name]
+
+    def _load(self, name):
+        doc = self.documents[name]
+        path = self.folder / doc.filename
+        data, source = read_json(path), None
+        if data is None:
+            data, source = self._recover(path)
+        self._sweep(path)
+        fresh = data is None
+        if fresh:
+            data = doc.default()            # never written: migrations may still find older files
+        version = data.pop(SCHEMA_KEY, 1)
+        if not isinstance(version, int) or version > doc.version:
+            self.problems.append(f"{doc.filename}: schema {version!r} is newer than {doc.version}, "
+                                 "loaded as is")
+            version = doc.version
+        for migrate in doc.migrations[version - 1:doc.version - 1]:
+            data = migrate(data, self.folder)
+            self.stats["migrated"] += 1
+        if fresh:
+            return data                     # the older files are still there: reading creates no file
+        if source or version < doc.version:
+            if source:
+                self.problems.append(f"{doc.filename}: unreadable, recovered from {source}")
+                self.stats["recovered"] += 1
+            self._mark(name)                # write the recovered / migrated form back
+        return data
+
+    @staticmethod
+    def _tmp_files(path):
+        """[(mtime, tmp path)] of the write-ahead files of `path`, newest first."""
+        out = []
+        for tmp in path.parent.glob(f"{path.name}.*.tmp"):
+            try:
+                out.append((tmp.stat().st_mtime, tmp))
+            except OSError:
+                continue
+        return sorted(out, reverse=True)
+
+    def _recover(self, path):
+        """(data, file name) from the newest complete tmp file or else the .bak."""
+        bak = path.with_name(path.name + ".bak")
+        for source in [tmp for _, tmp in self._tmp_files(path)] + [bak]:
+            data = read_json(source)
+            if data is not None:
+                return data, source.name
+        return None, None
+
+    def _sweep(self, path):
+        # tmp files this old belong to a writer that died; live ones are renamed within ms
+        cutoff = time.time() - STALE_TMP_S
+        for mtime, tmp in self._tmp_files(path):
+            if mtime < cutoff:
+                try:
+                    tmp.unlink()
+                except OSError:
+                    pass
+
+    # ── Writing ──────────────────────────────────────────────────
+
+    def put(self, name, data):
+        """Replace a document; written in the background."""
+        with self._lock:
+            self._data[name] = data
+            self._mark(name)
+
+    def update(self, name, **values):
+        """Set top-level keys of a document; written in the background."""
+        with self._lock:
+            self._data[name] = dict(self.get(name), **values)
+            self._mark(name)
+
+    def _mark(self, name):
+        now = time.monotonic()
+        if not self._dirty:
+            self._first_dirty = now
+        self._dirty.add(name)
+        self._last_dirty = now
+        self.stats["updates"] += 1
+        if self._writer is None and not self._closed:
+            self._writer = threading.Thread(target=self._run, daemon=True, name="settings-writer")
+            self._writer.start()
+        self._wake.notify()
+
+    def _run(self):
+        while True:
+            with self._lock:
+                while not self._dirty and not self._closed:
+                    self._wake.wait()
+                if self._closed:
+                    return
+                now = time.monotonic()
+                due = min(self._last_dirty + self.delay, self._first_dirty + self.max_delay)
+                if now < due:
+                    self._wake.wait(due - now)
+                    continue
+            self.flush()
+
+    def flush(self):
+        """Write every dirty document now (on the calling thread)."""
+        with self._write_lock:
+            with self._lock:
+                # serialized under the lock: a snapshot, whatever callers do to the data afterwards
+                batch = {name: json.dumps(dict(self._data[name], **{SCHEMA_KEY: self.documents[name].version}),
+                                          indent=2, ensure_ascii=False)
+                         for name in self._dirty}
+                self._dirty.clear()
+            for name, text in batch.items():
+                try:
+                    write_atomic(self.folder / self.documents[name].filename, text)
+                    self.stats["writes"] += 1
+                except OSError as e:
+                    self.problems.append(f"{self.documents[name].filename}: write failed: {e}")
+                    with self._lock:
+                        # retried after another `delay`
+                        self._first_dirty = self._last_dirty = time.monotonic()
+                        self._dirty.add(name)
+
+    def close(self):
+        """Flush and stop the writer thread."""
+        self.flush()
+        with self._lock:
+            self._closed = True
+            self._wake.notify()
+        atexit.unregister(self.flush)
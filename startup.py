@@ -0,0 +1,158 @@
+# startup.py
+
+"""
+Startup helpers: lazy module proxies and the startup profiler.
+
+    python voice_assistant_new_ui.py --profile-startup
+    (or VA_PROFILE_STARTUP=1)
+
+writes startup_profile.txt once every subsystem reports ready: a timeline
+of startup phases (which thread, when, how long) followed by the slowest
+imports with self and cumulative time, like `python -X importtime`.
+"""
+
+import importlib
+import importlib.abc
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+
+# ─── Lazy imports ────────────────────────────────────────────────────────
+
+class LazyModule:
+    """Stands in for a module and imports it on first attribute access."""
+
+    def __init__(self, name):
+        self.__dict__["_name"] = name
+        self.__dict__["_module"] = None
+
+    def _load(self):
+        mod = self.__dict__["_module"]
+        if mod is None:
+            mod = self.__dict__["_module"] = importlib.import_module(self._name)
+        return mod
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr, value):
+        setattr(self._load(), attr, value)
+
+    def __repr__(self):
+        state = "loaded" if self.__dict__["_module"] else "not loaded"
+        return f"<lazy module {self._name!r} ({state})>"
+
+
+def lazy_import(name):
+    return LazyModule(name)
+
+
+# ─── Import timing ───────────────────────────────────────────────────────
+
+class _TimedLoader:
+    """Wraps a loader so exec_module() is timed; everything else passes through."""
+
+    def __init__(self, loader, name, timer):
+        self._loader, self._name, self._timer = loader, name, timer
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        self._timer.enter(self._name)
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._timer.leave()
+
+    def __getattr__(self, attr):
+        return getattr(self._loader, attr)
+
+
+class _ImportTimer(importlib.abc.MetaPathFinder):
+    def __init__(self):
+        self.records = []       # (name, self_us, cumulative_us, depth)
+        self._local = threading.local()
+
+    def find_spec(self, name, path=None, target=None):
+        finders = sys.meta_path[sys.meta_path.index(self) + 1:]
+        for finder in finders:
+            find = getattr(finder, "find_spec", None)
+            spec = find(name, path, target) if find else None
+            if spec is not None:
+                if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                    spec.loader = _TimedLoader(spec.loader, name, self)
+                return spec
+        return None
+
+    def enter(self, name):
+        stack = self._local.__dict__.setdefault("stack", [])
+        stack.append([name, time.perf_counter(), 0.0])
+
+    def leave(self):
+        stack = self._local.stack
+        name, t0, children = stack.pop()
+        total = time.perf_counter() - t0
+        if stack:
+            stack[-1][2] += total
+        self.records.append((name, (total - children) * 1e6, total * 1e6, len(stack)))
+
+
+# ─── Profiler ────────────────────────────────────────────────────────────
+
+class StartupProfiler:
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.t0 = time.perf_counter()
+        self.phases = []        # (name, start_ms, duration_ms, thread)
+        self._lock = threading.Lock()
+        self._imports = None
+        if enabled:
+            self._imports = _ImportTimer()
+            sys.meta_path.insert(0, self._imports)
+
+    @classmethod
+    def from_argv(cls, argv):
+        enabled = "--profile-startup" in argv or os.environ.get("VA_PROFILE_STARTUP") == "1"
+        return cls(enabled)
+
+    def now_ms(self):
+        return (time.perf_counter() - self.t0) * 1e3
+
+    @contextmanager
+    def phase(self, name):
+        start = self.now_ms()
+        try:
+            yield
+        finally:
+            self._add(name, start, self.now_ms() - start)
+
+    def mark(self, name):
+        """An instant on the timeline (e.g. "window shown")."""
+        self._add(name, self.now_ms(), 0.0)
+
+    def _add(self, name, start, duration):
+        with self._lock:
+            self.phases.append((name, start, duration, threading.current_thread().name))
+
+    def report(self, top_imports=30):
+        lines = ["startup phases (ms since the profiler was created)",
+                 f"{'start':>9} {'took':>9}  {'thread':<16} phase"]
+        with self._lock:
+            phases = sorted(self.phases, key=lambda p: p[1])
+        for name, start, dur, thread in phases:
+            lines.append(f"{start:9.1f} {dur:9.1f}  {thread[:16]:<16} {name}")
+        if self._imports and self._imports.records:
+            recs = sorted(self._imports.records, key=lambda r: r[2], reverse=True)[:top_imports]
+            lines += ["", "slowest imports (µs)", f"{'self':>10} | {'cumulative':>10} | module"]
+            for name, self_us, cum_us, depth in recs:
+                lines.append(f"{self_us:10.0f} | {cum_us:10.0f} | {'  ' * depth}{name}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        if self.enabled:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(self.report())
@@ -0,0 +1,263 @@
+# telemetry.py
+
+"""
+Latency spans from end of speech to the OS action.
+
+Every phrase gets a trace id when it is captured; the pipeline binds it
+to whichever thread is working on the phrase, so spans recorded on the
+way (capture, vad, queue, recognize, dispatch, fuzzy_match, os_action,
+total) all carry it.  Spans go into a fixed-size ring buffer: writers
+take a slot from an itertools.count (atomic under the GIL) and store one
+tuple, so recording never takes a lock.  A background exporter writes
+new spans to a logger of their own (trace.log in the app) as JSON, one
+per line after a "[Trace] " tag, and summary() gives live p50/p95/p99
+per stage.
+
+    python telemetry.py [trace.log …] [--stage recognize] [--bins 12]
+
+prints per-stage latency histograms from the log (rotated files too).
+"""
+
+import argparse
+import glob
+import itertools
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+TRACE_TAG = "[Trace] "
+STAGES = ("capture", "calibrate", "vad", "queue", "recognize", "reorder",
+          "dispatch", "fuzzy_match", "os_action", "execute", "total")
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * q))]
+
+
+class Tracer:
+    def __init__(self, size=4096):
+        self.size = size
+        self._buf = [None] * size       # (index, trace, stage, start, end, attrs)
+        self._slots = itertools.count()
+        self._high = 0                  # 1 + the highest index stored (may lag a racing writer)
+        self._traces = itertools.count(1)
+        self._local = threading.local()
+        self._exported = 0
+        self.dropped = 0                # spans overwritten before they were exported
+
+    # ── Recording ────────────────────────────────────────────────
+
+    def new_trace(self):
+        return next(self._traces)
+
+    def bind(self, trace):
+        """Make `trace` the current trace of this thread."""
+        self._local.trace = trace
+
+    @property
+    def current(self):
+        return getattr(self._local, "trace", None)
+
+    def record(self, stage, start, end, trace=None, **attrs):
+        """Store a finished span (monotonic seconds)."""
+        i = next(self._slots)
+        self._buf[i % self.size] = (i, trace if trace is not None else self.current, stage, start, end, attrs)
+        self._high = i + 1
+
+    @contextmanager
+    def span(self, stage, **attrs):
+        start = time.monotonic()
+        try:
+            yield attrs                 # callers may add attributes while the span is open
+        finally:
+            self.record(stage, start, time.monotonic(), **attrs)
+
+    def wrap(self, obj, stage, **attrs):
+        """Proxy whose public method calls are recorded as `stage` spans."""
+        return _Traced(self, obj, stage, attrs)
+
+    # ── Reading ──────────────────────────────────────────────────
+
+    def spans(self, since=0):
+        """(spans with index ≥ since in order, next index).  Overwritten ones are skipped."""
+        # a writer that lost a race may have left _high a little low; never go back past `since`
+        end = max(self._high, since)
+        start = max(since, end - self.size)
+        out = [s for s in (self._buf[i % self.size] for i in range(start, end))
+               if s is not None and s[0] >= start]
+        out.sort(key=lambda s: s[0])
+        return out, end
+
+    def summary(self, stages=None):
+        """{stage: {"n", "p50_ms", "p95_ms", "p99_ms"}} over what the buffer holds."""
+        by_stage = {}
+        for _, _, stage, start, end, _ in self.spans()[0]:
+            if stages is None or stage in stages:
+                by_stage.setdefault(stage, []).append((end - start) * 1e3)
+        out = {}
+        for stage, values in by_stage.items():
+            values.sort()
+            out[stage] = {"n": len(values), "p50_ms": percentile(values, 0.50),
+                          "p95_ms": percentile(values, 0.95), "p99_ms": percentile(values, 0.99)}
+        return out
+
+    # ── Export ───────────────────────────────────────────────────
+
+    @staticmethod
+    def to_json(span):
+        _, trace, stage, start, end, attrs = span
+        return json.dumps(dict(attrs, trace=trace, stage=stage, start=round(start, 6),
+                               dur_ms=round((end - start) * 1e3, 3)), ensure_ascii=False, default=str)
+
+    def export(self, log):
+        """
+        Write spans recorded since the last export to `log` (a logging.Logger).
+        Use a logger of its own: every span is a line.
+        """
+        spans, end = self.spans(self._exported)
+        if spans and spans[0][0] > self._exported:
+            self.dropped += spans[0][0] - self._exported
+        for s in spans:
+            log.info("%s%s", TRACE_TAG, self.to_json(s))
+        self._exported = end
+        return len(spans)
+
+    def start_exporter(self, log, interval=1.0):
+        def run():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.export(log)
+                except Exception:
+                    log.exception("[Trace] export failed")
+        threading.Thread(target=run, daemon=True, name="trace-exporter").start()
+
+
+class _Traced:
+    def __init__(self, tracer, obj, stage, attrs):
+        self._tracer, self._obj, self._stage, self._attrs = tracer, obj, stage, attrs
+
+    def __getattr__(self, name):
+        value = getattr(self._obj, name)
+        if name.startswith("_") or not callable(value):
+            return value
+
+        def call(*args, **kwargs):
+            with self._tracer.span(self._stage, op=name, **self._attrs):
+                return value(*args, **kwargs)
+        return call
+
+
+TRACER = Tracer()
+
+
+class UIStallMonitor:
+    """
+    Instrumented Tk event loop: an after() heartbeat every interval_ms.  A
+    tick that arrives late means the Tk thread was busy for that long, so
+    the lateness is the stall the user saw (no input, no redraws).
+    """
+
+    def __init__(self, root, interval_ms=5, threshold_ms=20.0):
+        self.root = root
+        self.interval_ms = interval_ms
+        self.threshold_ms = threshold_ms    # lateness below this is scheduler jitter
+        self.stalls = []                    # ms of each stall ≥ threshold
+        self._last = None
+        self._job = None
+
+    def start(self):
+        self._last = time.perf_counter()
+        self._job = self.root.after(self.interval_ms, self._tick)
+        return self
+
+    def stop(self):
+        if self._job is not None:
+            self.root.after_cancel(self._job)
+            self._job = None
+
+    def reset(self):
+        self.stalls = []
+        self._last = time.perf_counter()
+
+    def _tick(self):
+        now = time.perf_counter()
+        late = (now - self._last) * 1e3 - self.interval_ms
+        if late >= self.threshold_ms:
+            self.stalls.append(late)
+        self._last = now
+        self._job = self.root.after(self.interval_ms, self._tick)
+
+    def report(self):
+        return {"stalls": len(self.stalls), "max_ms": max(self.stalls, default=0.0),
+                "total_ms": sum(self.stalls)}
+
+
+# ─── CLI: histograms from trace.log ──────────────────────────────────────
+
+def read_spans(paths):
+    for path in paths:
+        try:
+            with open(path, encoding="utf-8", errors="replace") as f:
+                for line in f:
+                    i = line.find(TRACE_TAG)
+                    if i >= 0:
+                        try:
+                            yield json.loads(line[i + len(TRACE_TAG):])
+                        except ValueError:
+                            continue
+        except OSError:
+            continue
+
+
+def histogram(values, bins=12, width=40):
+    """Text histogram on log-spaced bins (latencies span orders of magnitude)."""
+    lo, hi = max(min(values), 1e-3), max(max(values), 1e-3)
+    if hi / lo < 1.01:
+        hi = lo * 1.01
+    edges = [lo * (hi / lo) ** (k / bins) for k in range(bins + 1)]
+    counts = [0] * bins
+    for v in values:
+        k = int(bins * math.log(max(v, lo) / lo) / math.log(hi / lo))
+        counts[min(bins - 1, k)] += 1
+    top = max(counts)
+    return [f"  {edges[k]:10.3f} – {edges[k + 1]:10.3f} ms {counts[k]:7d} "
+            f"{'█' * round(width * counts[k] / top)}" for k in range(bins)]
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Per-stage latency histograms from trace.log")
+    ap.add_argument("logs", nargs="*", help="log files (default: trace.log and its rotations)")
+    ap.add_argument("--stage", action="append", help="only these stages")
+    ap.add_argument("--bins", type=int, default=12)
+    args = ap.parse_args()
+
+    # the app's data folder (VA_DATA_DIR, else the checkout); spans went to
+    # assistant.log before they had a file of their own
+    folder = Path(os.environ.get("VA_DATA_DIR") or Path(__file__).parent)
+    paths = args.logs or sorted(glob.glob(str(folder / "trace.log*")) + glob.glob(str(folder / "assistant.log*")))
+    by_stage = {}
+    for span in read_spans(paths):
+        by_stage.setdefault(span.get("stage"), []).append(float(span.get("dur_ms", 0.0)))
+    order = [s for s in STAGES if s in by_stage] + sorted(s for s in by_stage if s not in STAGES)
+    if not order:
+        print("no trace spans found in", ", ".join(paths) or "(no files)")
+        return
+    for stage in order:
+        if args.stage and stage not in args.stage:
+            continue
+        v = sorted(by_stage[stage])
+        print(f"{stage}: n={len(v)}  p50 {percentile(v, .5):.2f}  p95 {percentile(v, .95):.2f}  "
+              f"p99 {percentile(v, .99):.2f}  max {v[-1]:.2f} ms")
+        print("\n".join(histogram(v, args.bins)))
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+# text_output.py
+
+"""
+Typing mode: dictated text and voice edits, sent from one output thread.
+
+_handle_text used to call PLATFORM.text.write(text + " ") on the
+pipeline executor.  The Windows backend went through pyautogui, one
+keystroke at a time, so a long sentence held up the commands queued
+behind it for seconds.  TextOutput takes phrases and edits from a queue
+instead:
+
+  batching   whatever is queued when the thread wakes goes to the
+             backend as a single write() (the backends send a whole
+             string in one call: SendInput, xdotool);
+  edits      "delete last word", "delete that", "new line", … in
+             Bulgarian and English (EDITS).  What a backspace removes
+             is worked out from what this session typed, so nothing is
+             read back from the target window;
+  tracing    with a telemetry.Tracer, backend calls are recorded under
+             the trace of the phrase that produced them.
+
+The record of typed text is only a guess about the target window: it is
+reset when typing mode is switched on, and edits never erase more than
+it holds.
+"""
+
+import queue
+import re
+import threading
+
+from commands import normalize
+
+# spoken phrase → edit
+EDITS = {
+    "изтрий последната дума": "delete_word",
+    "изтрий дума":            "delete_word",
+    "delete last word":       "delete_word",
+    "delete word":            "delete_word",
+    "изтрий това":            "delete_phrase",
+    "изтрий последното":      "delete_phrase",
+    "delete that":            "delete_phrase",
+    "scratch that":           "delete_phrase",
+    "нов ред":                "newline",
+    "new line":               "newline",
+    "newline":                "newline",
+    "нов параграф":           "paragraph",
+    "new paragraph":          "paragraph",
+    "ентър":                  "enter",
+    "enter":                  "enter",
+}
+INSERTS = {"newline": "\n", "paragraph": "\n\n"}
+
+HISTORY_CHARS = 4000        # how much typed text is remembered for edits
+_LAST_WORD = re.compile(r"(?:\S+ *|\n)$")
+
+
+def parse_edit(text):
+    """The edit a dictated phrase asks for ("Delete last word." → "delete_word"), or None."""
+    return EDITS.get(normalize(text).strip(" .,!?"))
+
+
+class TextOutput:
+    def __init__(self, text_input, tracer=None):
+        self.text = text_input              # platforms TextInput
+        self._tracer = tracer
+        self._queue = queue.Queue()         # (kind, value, trace); kind "type" | "edit" | "reset" | "done"
+        self._typed = ""                    # recent text this session typed (for edits)
+        self._phrases = []                  # offsets in _typed where each phrase starts
+        self._thread = None
+        self.stats = {"phrases": 0, "edits": 0, "chars": 0, "calls": 0}
+
+    # ── Lifecycle ────────────────────────────────────────────────
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True, name="text-output")
+            self._thread.start()
+        return self
+
+    def wait(self, timeout=None):
+        """Block until everything queued so far has been sent.  False on timeout."""
+        done = threading.Event()
+        self._put("done", done)
+        return done.wait(timeout)
+
+    # ── Requests (any thread) ────────────────────────────────────
+
+    def type(self, text):
+        """Type a dictated phrase, followed by a space."""
+        self._put("type", text + " ")
+
+    def edit(self, op):
+        """Apply one of the EDITS values."""
+        self._put("edit", op)
+
+    def dictate(self, text):
+        """type() or edit(), whichever the phrase is.  Returns the edit or None."""
+        op = parse_edit(text)
+        if op:
+            self.edit(op)
+        else:
+            self.type(text)
+        return op
+
+    def reset(self):
+        """Forget what was typed (the cursor may be anywhere now)."""
+        self._put("reset", None)
+
+    def _put(self, kind, value):
+        self.start()
+        self._queue.put((kind, value, self._tracer.current if self._tracer else None))
+
+    # ── Output thread ────────────────────────────────────────────
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            pending, trace = [], None
+            for kind, value, item_trace in batch:
+                if kind == "type" or (kind == "edit" and value in INSERTS):
+                    pending.append(self._record(value if kind == "type" else INSERTS[value], kind == "type"))
+                    trace = item_trace
+                    self.stats["phrases" if kind == "type" else "edits"] += 1
+                    continue
+                self._send("".join(pending), trace)
+                pending = []
+                if kind == "edit":
+                    self._edit(value, item_trace)
+                elif kind == "reset":
+                    self._typed, self._phrases = "", []
+                elif kind == "done":
+                    value.set()
+            self._send("".join(pending), trace)
+
+    def _record(self, text, phrase):
+        if phrase:
+            self._phrases.append(len(self._typed))
+        self._typed += text
+        if len(self._typed) > HISTORY_CHARS:
+            cut = len(self._typed) - HISTORY_CHARS
+            self._typed = self._typed[cut:]
+            self._phrases = [p - cut for p in self._phrases if p >= cut]
+        return text
+
+    def _send(self, text, trace):
+        if not text:
+            return
+        if self._tracer:
+            self._tracer.bind(trace)
+        try:
+            self.text.write(text)
+        except Exception as e:
+            print("[Typing] write failed:", e)
+        self.stats["chars"] += len(text)
+        self.stats["calls"] += 1
+
+    def _edit(self, op, trace):
+        if self._tracer:
+            self._tracer.bind(trace)
+        self.stats["edits"] += 1
+        if op == "enter":
+            self._call("press", "enter")
+            self._record("\n", False)
+            return
+        if op == "delete_word":
+            m = _LAST_WORD.search(self._typed)
+            n = len(m.group()) if m else 0
+        else:                               # delete_phrase
+            n = len(self._typed) - self._phrases[-1] if self._phrases else 0
+        if not n:
+            print("[Typing] nothing of this session's left to delete")
+            return
+        self._typed = self._typed[:-n]
+        self._phrases = [p for p in self._phrases if p < len(self._typed)]
+        self._call("erase", n)
+
+    def _call(self, method, arg):
+        try:
+            getattr(self.text, method)(arg)
+        except Exception as e:
+            print(f"[Typing] {method} failed:", e)
+        self.stats["calls"] += 1
+
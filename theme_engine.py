@@ -0,0 +1,239 @@
+# theme_engine.py
+
+"""
+Themes compiled once and applied as a diff.
+
+apply_theme used to walk every widget from Python on each switch: one
+Tcl round trip to list a widget's children and another to configure it.
+It also read btn_bg/btn_fg while themes.json says button_bg/button_fg,
+so buttons got None.  Now:
+
+  normalize()      maps aliases to the canonical KEYS, lets a "module"
+                   from the themes/ package fill keys in, derives the
+                   missing ones and drops colours Tk would reject (with
+                   a message);
+  compile_theme()  turns a theme into per-class option lists for classic
+                   Tk widgets, option-database entries (for widgets
+                   created later, e.g. the settings dialog) and ttk
+                   styles;
+  ThemeEngine      lists widgets with one Tcl call and configures, in one
+                   batched script, only those whose resolved options
+                   differ from what it last gave them.
+"""
+
+import re
+from typing import NamedTuple
+
+import themes as theme_modules
+
+# canonical keys and, for the optional ones, the key they default to
+KEYS = {
+    "bg": None, "fg": None,
+    "btn_bg": "bg", "btn_fg": "fg",
+    "entry_bg": "bg", "entry_fg": "fg",
+    "active_bg": "btn_bg",
+    "select_bg": "btn_bg", "select_fg": "btn_fg",
+}
+ALIASES = {
+    "background": "bg", "foreground": "fg",
+    "button_bg": "btn_bg", "button_fg": "btn_fg",
+    "button_background": "btn_bg", "button_foreground": "btn_fg",
+    "input_bg": "entry_bg", "input_fg": "entry_fg",
+}
+FALLBACK = {"bg": "#f0f0f0", "fg": "#000000"}
+
+_COLOR = re.compile(r"#(?:[0-9a-fA-F]{3}){1,4}|[A-Za-z][A-Za-z0-9 ]*")
+
+
+def normalize(name, raw):
+    """(theme with exactly KEYS, [problem messages]) from a themes.json entry."""
+    problems = []
+    theme = _colours(name, {k: v for k, v in raw.items() if k != "module"}, problems)
+    if raw.get("module"):
+        try:
+            supplied = theme_modules.build(raw["module"], theme)
+        except Exception as e:
+            problems.append(f"{name}: module {raw['module']!r} failed: {e}")
+        else:
+            theme = dict(_colours(raw["module"], supplied, problems), **theme)
+    for key, default in KEYS.items():
+        if key not in theme:
+            if default is None:
+                problems.append(f"{name}: no {key!r}, using {FALLBACK[key]}")
+            theme[key] = theme[default] if default else FALLBACK[key]
+    return theme, problems
+
+
+def _colours(name, items, problems):
+    """{canonical key: colour} of `items`; what does not fit is reported in `problems`."""
+    out = {}
+    for key, value in items.items():
+        canon = ALIASES.get(key, key)
+        if canon not in KEYS:
+            problems.append(f"{name}: unknown key {key!r} ignored")
+        elif not isinstance(value, str) or not _COLOR.fullmatch(value.strip()):
+            problems.append(f"{name}: {key}={value!r} is not a colour, ignored")
+        else:
+            out[canon] = value.strip()
+    return out
+
+
+def parse_themes(raw):
+    """({name: normalized theme}, [problems]) from the themes.json object."""
+    out, problems = {}, []
+    for name, entry in raw.items():
+        if not isinstance(entry, dict):
+            problems.append(f"{name}: not an object, skipped")
+            continue
+        out[name], p = normalize(name, entry)
+        problems += p
+    return out, problems
+
+
+# ─── Compilation ────────────────────────────────────────────────────────
+
+# Tk class → [(configure option, theme key)]
+CLASSES = {
+    "Tk":          [("background", "bg")],
+    "Toplevel":    [("background", "bg")],
+    "Frame":       [("background", "bg")],
+    "Labelframe":  [("background", "bg"), ("foreground", "fg")],
+    "Label":       [("background", "bg"), ("foreground", "fg")],
+    "Button":      [("background", "btn_bg"), ("foreground", "btn_fg"),
+                    ("activebackground", "active_bg"), ("activeforeground", "btn_fg")],
+    "Checkbutton": [("background", "bg"), ("foreground", "fg"), ("activebackground", "bg"),
+                    ("activeforeground", "fg"), ("selectcolor", "entry_bg")],
+    "Radiobutton": [("background", "bg"), ("foreground", "fg"), ("activebackground", "bg"),
+                    ("activeforeground", "fg"), ("selectcolor", "entry_bg")],
+    "Entry":       [("background", "entry_bg"), ("foreground", "entry_fg"),
+                    ("readonlybackground", "entry_bg"), ("insertbackground", "entry_fg"),
+                    ("selectbackground", "select_bg"), ("selectforeground", "select_fg")],
+    "Listbox":     [("background", "entry_bg"), ("foreground", "entry_fg"),
+                    ("selectbackground", "select_bg"), ("selectforeground", "select_fg")],
+    "Text":        [("background", "entry_bg"), ("foreground", "entry_fg"), ("insertbackground", "entry_fg"),
+                    ("selectbackground", "select_bg"), ("selectforeground", "select_fg")],
+}
+
+# option-database names of the options above
+_DB_NAMES = {"activebackground": "activeBackground", "activeforeground": "activeForeground",
+             "selectcolor": "selectColor", "readonlybackground": "readonlyBackground",
+             "insertbackground": "insertBackground", "selectbackground": "selectBackground",
+             "selectforeground": "selectForeground"}
+
+
+class CompiledTheme(NamedTuple):
+    classes: dict       # Tk class → ((option, value), …)
+    options: tuple      # ((option-database pattern, value), …)
+    styles: dict        # ttk style → {option: value}
+    maps: dict          # ttk style → {option: [(state, value)]}
+
+
+def compile_theme(theme):
+    classes = {cls: tuple((opt, theme[key]) for opt, key in opts) for cls, opts in CLASSES.items()}
+    options = [("*background", theme["bg"]), ("*foreground", theme["fg"])]
+    for cls, opts in classes.items():
+        if cls != "Tk":
+            options += [(f"*{cls}.{_DB_NAMES.get(opt, opt)}", value) for opt, value in opts]
+    # the drop-down list of a ttk.Combobox is a classic Listbox
+    options += [(f"*TCombobox*Listbox.{_DB_NAMES.get(opt, opt)}", value) for opt, value in classes["Listbox"]]
+    field = {"fieldbackground": theme["entry_bg"], "foreground": theme["entry_fg"]}
+    styles = {
+        ".":            {"background": theme["bg"], "foreground": theme["fg"],
+                         "selectbackground": theme["select_bg"], "selectforeground": theme["select_fg"]},
+        "TButton":      {"background": theme["btn_bg"], "foreground": theme["btn_fg"]},
+        "TCombobox":    dict(field, background=theme["btn_bg"], arrowcolor=theme["entry_fg"]),
+        "TEntry":       field,
+        "TCheckbutton": {"background": theme["bg"], "foreground": theme["fg"]},
+    }
+    maps = {
+        "TButton":   {"background": [("active", theme["active_bg"])]},
+        "TCombobox": {"fieldbackground": [("readonly", theme["entry_bg"])],
+                      "foreground": [("readonly", theme["entry_fg"])]},
+    }
+    return CompiledTheme(classes, tuple(options), styles, maps)
+
+
+# ─── Applying ───────────────────────────────────────────────────────────
+
+# one Tcl call returning {path class path class …} for a whole widget tree
+_WALK = """
+proc ::va_theme_walk {w var} {
+    upvar 1 $var out
+    foreach c [winfo children $w] {
+        lappend out $c [winfo class $c]
+        ::va_theme_walk $c out
+    }
+}
+proc ::va_theme_list {w} {
+    set out [list $w [winfo class $w]]
+    ::va_theme_walk $w out
+    return $out
+}
+"""
+
+
+class ThemeEngine:
+    def __init__(self, root):
+        self.root = root
+        self._compiled = {}         # tuple(sorted(theme.items())) → CompiledTheme
+        self._current = None        # CompiledTheme whose global parts are installed
+        self._applied = {}          # widget path → options it was last given
+        self._keep = {}             # widget path → options the theme must not touch
+        self._style = None
+        root.tk.eval(_WALK)
+
+    def keep(self, widget, *options):
+        """Leave `options` of `widget` alone (e.g. a status label's own foreground)."""
+        self._keep.setdefault(str(widget), set()).update(options)
+        self._applied.pop(str(widget), None)
+
+    def compile(self, theme):
+        key = tuple(sorted(theme.items()))
+        compiled = self._compiled.get(key)
+        if compiled is None:
+            compiled = self._compiled[key] = compile_theme(theme)
+        return compiled
+
+    def apply(self, theme, widget=None):
+        """
+        Theme `widget`'s tree (default: the root) and everything created
+        later.  Returns {"widgets": n listed, "configured": n changed}.
+        """
+        compiled = self.compile(theme)
+        if compiled is not self._current:
+            self._install(compiled)
+        root = widget or self.root
+        tree = self.root.tk.splitlist(self.root.tk.call("::va_theme_list", str(root)))
+        paths = tree[0::2]
+        lines = []
+        for path, cls in zip(paths, tree[1::2]):
+            opts = compiled.classes.get(cls)
+            if opts is None:
+                continue
+            keep = self._keep.get(path)
+            if keep:
+                opts = tuple(o for o in opts if o[0] not in keep)
+            if self._applied.get(path) != opts:
+                self._applied[path] = opts
+                args = " ".join(f"-{opt} {{{value}}}" for opt, value in opts)
+                lines.append(f"catch {{{path} configure {args}}}")
+        if widget is None:
+            alive = set(paths)
+            for path in [p for p in self._applied if p not in alive]:
+                del self._applied[path]
+        if lines:
+            self.root.tk.eval("\n".join(lines))
+        return {"widgets": len(paths), "configured": len(lines)}
+
+    def _install(self, compiled):
+        """Option database and ttk styles: global, so set once per theme switch."""
+        for pattern, value in compiled.options:
+            self.root.option_add(pattern, value)
+        if self._style is None:
+            from tkinter import ttk
+            self._style = ttk.Style(self.root)
+        for style, cfg in compiled.styles.items():
+            self._style.configure(style, **cfg)
+        for style, cfg in compiled.maps.items():
+            self._style.map(style, **cfg)
+        self._current = compiled
@@ -0,0 +1,37 @@
+# themes/__init__.py
+
+"""
+Themes built in code.  A themes.json entry can name a module of this
+package in its "module" key:
+
+    "Dark": {"bg": "#000000", "fg": "#FFFFFF", "module": "themes.darkmode"}
+
+The module's build(theme) gets the entry's colours (already normalized,
+see theme_engine.normalize) and returns keys to fill in; keys written in
+themes.json win over the ones it returns.
+"""
+
+import importlib
+import re
+
+_HEX = re.compile(r"#([0-9a-fA-F]{6})")
+
+
+def build(module, theme):
+    """Keys supplied by `module` (a "themes.x" name) for `theme`."""
+    if not module.startswith(__name__ + "."):
+        raise ValueError(f"theme module {module!r} is not in the {__name__} package")
+    return dict(importlib.import_module(module).build(dict(theme)))
+
+
+def mix(a, b, t):
+    """#rrggbb colour `t` of the way from a to b (a itself if either is not #rrggbb)."""
+    ma, mb = _HEX.fullmatch(a or ""), _HEX.fullmatch(b or "")
+    if not (ma and mb):
+        return a
+    ca = [int(ma.group(1)[i:i + 2], 16) for i in (0, 2, 4)]
+    cb = [int(mb.group(1)[i:i + 2], 16) for i in (0, 2, 4)]
+    return "#" + "".join(f"{round(x + (y - x) * t):02x}" for x, y in zip(ca, cb))
+
+
+__all__ = ["build", "mix"]
@@ -0,0 +1,17 @@
+# themes/darkmode.py
+
+"""Dark theme: input fields, pressed buttons and selection derived from the base colours."""
+
+from . import mix
+
+
+def build(theme):
+    bg, fg = theme.get("bg", "#000000"), theme.get("fg", "#ffffff")
+    button = theme.get("btn_bg", mix(bg, fg, 0.2))
+    return {
+        "btn_bg":    button,
+        "entry_bg":  mix(bg, fg, 0.12),
+        "active_bg": mix(button, fg, 0.15),
+        "select_bg": "#264f78",
+        "select_fg": fg,
+    }
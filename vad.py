@@ -0,0 +1,124 @@
+# vad.py
+
+"""
+Voice-activity detection in front of the recognizer.
+
+The Recognizer's energy threshold is set once from half a second of
+ambient noise, so fans, music and clicks still produce phrases that cost a
+recognize_google round-trip only to raise UnknownValueError.  This stage
+looks at every captured phrase frame by frame (RMS energy + zero-crossing
+rate, vectorized with NumPy), drops phrases with no speech, trims leading
+and trailing silence from the rest and keeps adapting its noise floor from
+the frames it classed as non-speech.
+"""
+
+import numpy as np
+
+
+class VoiceActivityDetector:
+    def __init__(self, frame_ms=20, energy_ratio=3.0, max_zcr=0.30, loud_ratio=10.0,
+                 min_speech_ms=120, min_run_ms=60, hangover_ms=150, pad_ms=100, adapt=0.1):
+        self.frame_ms = frame_ms
+        self.energy_ratio = energy_ratio    # speech: RMS above floor × this …
+        self.max_zcr = max_zcr              # … and voiced (low zero-crossing rate),
+        self.loud_ratio = loud_ratio        # or simply much louder than the floor
+        self.min_speech_ms = min_speech_ms   # total speech needed in a phrase
+        self.min_run_ms = min_run_ms         # longest unbroken run (rejects clicks)
+        self.hangover_ms = hangover_ms
+        self.pad_ms = pad_ms
+        self.adapt = adapt
+        self.noise_floor = None             # RMS on a 0..1 scale
+
+        self.phrases = 0
+        self.rejected = 0
+        self.trimmed_s = 0.0
+
+    # ── Frame features ───────────────────────────────────────────
+
+    def _frames(self, samples, rate):
+        n = max(1, int(rate * self.frame_ms / 1000))
+        count = len(samples) // n
+        return samples[:count * n].reshape(count, n), n
+
+    def features(self, samples, rate):
+        """Per-frame (rms, zcr) arrays for float samples in -1..1."""
+        frames, _ = self._frames(samples, rate)
+        if not len(frames):
+            return np.zeros(0), np.zeros(0)
+        rms = np.sqrt(np.mean(frames * frames, axis=1))
+        signs = np.signbit(frames)
+        zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / frames.shape[1]
+        return rms, zcr
+
+    def speech_mask(self, rms, zcr):
+        """Raw per-frame speech decision against the current noise floor."""
+        if self.noise_floor is None:
+            self.noise_floor = max(float(np.percentile(rms, 10)) if len(rms) else 0.0, 1e-4)
+        floor = self.noise_floor
+        return ((rms > floor * self.energy_ratio) & (zcr < self.max_zcr)) | (rms > floor * self.loud_ratio)
+
+    def _fill_gaps(self, mask):
+        """Hangover: bridge gaps of up to hangover_ms between speech frames."""
+        hang = int(self.hangover_ms / self.frame_ms)
+        if not hang or not mask.any():
+            return mask
+        i = np.arange(len(mask))
+        prev = np.maximum.accumulate(np.where(mask, i, -1))
+        nxt = np.minimum.accumulate(np.where(mask, i, len(mask))[::-1])[::-1]
+        return mask | ((prev >= 0) & (nxt < len(mask)) & (nxt - prev <= hang + 1))
+
+    @staticmethod
+    def _longest_run(mask):
+        edges = np.diff(np.concatenate(([0], mask.view(np.int8), [0])))
+        starts, ends = np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+        return int((ends - starts).max()) if len(starts) else 0
+
+    def _adapt(self, rms, mask):
+        noise = rms[~mask]
+        if len(noise):
+            self.noise_floor = max((1 - self.adapt) * self.noise_floor + self.adapt * float(np.median(noise)),
+                                   1e-4)
+
+    # ── Public API ───────────────────────────────────────────────
+
+    def detect(self, samples, rate):
+        """
+        Returns (start, end) sample offsets of the speech run, or None.
+        `samples` are floats in -1..1.
+        """
+        rms, zcr = self.features(samples, rate)
+        if not len(rms):
+            return None
+        raw = self.speech_mask(rms, zcr)
+        self._adapt(rms, raw)
+        if raw.sum() * self.frame_ms < self.min_speech_ms \
+                or self._longest_run(raw) * self.frame_ms < self.min_run_ms:
+            return None
+        idx = np.flatnonzero(self._fill_gaps(raw))
+        n = int(rate * self.frame_ms / 1000)
+        pad = int(rate * self.pad_ms / 1000)
+        return max(0, idx[0] * n - pad), min(len(samples), (idx[-1] + 1) * n + pad)
+
+    def process(self, audio):
+        """
+        Trim a speech_recognition.AudioData to its speech, or return None if
+        it holds no speech and should never reach the recognizer.
+        """
+        self.phrases += 1
+        raw = audio.get_raw_data(convert_width=2)
+        samples = np.frombuffer(raw, dtype="<i2").astype(np.float32) / 32768.0
+        span = self.detect(samples, audio.sample_rate)
+        if span is None:
+            self.rejected += 1
+            self.trimmed_s += len(samples) / audio.sample_rate
+            return None
+        start, end = span
+        self.trimmed_s += (len(samples) - (end - start)) / audio.sample_rate
+        if start == 0 and end == len(samples):
+            return audio
+        return type(audio)(raw[start * 2:end * 2], audio.sample_rate, 2)
+
+    def stats(self):
+        return {"phrases": self.phrases, "rejected": self.rejected,
+                "trimmed_s": round(self.trimmed_s, 2),
+                "noise_floor": self.noise_floor}
@@ -1,32 +1,36 @@
-import os
 import sys
-import json
+from startup import StartupProfiler, lazy_import
+
+# created first so --profile-startup can time every import below
+PROFILE = StartupProfiler.from_argv(sys.argv)
+
+import os
 import threading
+import time
+import multiprocessing
 import logging
 from logging.handlers import RotatingFileHandler
 import tkinter as tk
 from tkinter import ttk, Toplevel, messagebox as mb, filedialog
-import speech_recognition as sr
-from pathlib import Path
-from PIL import Image, ImageTk, ImageSequence
-import subprocess
-import difflib
-import winreg
-import requests
-import win32gui
-import win32con
-import ctypes
-import win32api
-import win32process
-import pyautogui   # used for typing keystrokes
-from media_control import MediaController
-from pycaw.pycaw import AudioUtilities, IAudioEndpointVolume
-import comtypes
-import asyncio
-import keyboard
-from pycaw.pycaw import AudioUtilities, IAudioEndpointVolume
-import comtypes
 from pathlib import Path
+from commands import CommandRegistry, normalize as normalize_phrase
+from pipeline import RecognitionPipeline
+from recognizers import create_backend, DEFAULT_CFG as RECOGNIZER_DEFAULTS
+from app_index import AppNameIndex
+from platforms import create_platform
+from window_registry import WindowRegistry
+from process_tracker import ProcessTracker
+from devices import DeviceCache
+from text_output import TextOutput
+from theme_engine import ThemeEngine, parse_themes, normalize as normalize_theme
+from settings_store import SettingsStore, Document, read_json
+from telemetry import TRACER, STAGES as TRACE_STAGES
+
+# Heavy modules are imported on first use, after the window is up
+# (see VoiceAssistantApp._start_subsystems).  NumPy-backed modules
+# (vad, kws, intents, model_engine, music_library) are imported there too,
+# and OS modules by the platform backend (platforms/).
+sr         = lazy_import("speech_recognition")
 
 
 # ─── Version Handling & Update Checker (GitHub Releases) ─────────────────
@@ -46,34 +50,78 @@ CREATE_NO_WINDOW = 0x08000000
 # ─── Paths & Logging ────────────────────────────────────────────────────
 
 BASE_DIR   = Path(__file__).parent
-LOG_PATH   = BASE_DIR / "assistant.log"
-MIC_FILE   = BASE_DIR / "selected_mic.json"
-THEME_JSON = BASE_DIR / "themes.json"
-SEL_THEME  = BASE_DIR / "selected_theme.json"
-APPS_JSON  = BASE_DIR / "apps_index.json"
-USER_CFG   = BASE_DIR / "va_settings.json"  # <-- store media player + music folder here
+# settings, logs, indexes and caches; VA_DATA_DIR keeps them out of the checkout
+DATA_DIR   = Path(os.environ.get("VA_DATA_DIR") or BASE_DIR)
+LOG_PATH   = DATA_DIR / "assistant.log"
+TRACE_LOG_PATH = DATA_DIR / "trace.log" # latency spans, one JSON line each (telemetry.py)
+MUSIC_DB   = DATA_DIR / "music_index.db"
+KWS_FILE   = DATA_DIR / "kws_templates.npz"
 CREATE_NO_WINDOW = 0x08000000
-mc = MediaController()
+PROFILE_PATH = DATA_DIR / "startup_profile.txt"
+GIF_CACHE  = DATA_DIR / "frame_cache"   # decoded, scaled GIF frames (gif_frames.py)
 
 
 
 logger = logging.getLogger("VA")
 logger.setLevel(logging.DEBUG)
-fh = RotatingFileHandler(LOG_PATH, maxBytes=1_000_000, backupCount=3, encoding="utf-8")
-fh.setFormatter(logging.Formatter("%(asctime)s | %(levelname)s | %(message)s"))
-logger.addHandler(fh)
-logger.addHandler(logging.StreamHandler(sys.stdout))
+# spans get a file of their own: at a line each they would drown the console and assistant.log
+trace_log = logging.getLogger("VA.trace")
+trace_log.setLevel(logging.INFO)
+trace_log.propagate = False
+
+def setup_logging():
+    """Attach the file and console handlers.  Called by the app, not on import."""
+    if logger.handlers:
+        return
+    DATA_DIR.mkdir(parents=True, exist_ok=True)
+    fh = RotatingFileHandler(LOG_PATH, maxBytes=1_000_000, backupCount=3, encoding="utf-8")
+    fh.setFormatter(logging.Formatter("%(asctime)s | %(levelname)s | %(message)s"))
+    logger.addHandler(fh)
+    logger.addHandler(logging.StreamHandler(sys.stdout))
+    th = RotatingFileHandler(TRACE_LOG_PATH, maxBytes=5_000_000, backupCount=3, encoding="utf-8")
+    th.setFormatter(logging.Formatter("%(asctime)s | %(message)s"))
+    trace_log.addHandler(th)
 
 # ─── Persistence Helpers ─────────────────────────────────────────────────
 
-def load_json(path, default=None):
-    try:
-        return json.loads(Path(path).read_text())
-    except:
-        return default
+def _settings_v2(data, folder):
+    """v2: selected_mic.json and selected_theme.json are folded into va_settings.json."""
+    data = dict(data)
+    mic = read_json(folder / "selected_mic.json") or {}
+    theme = read_json(folder / "selected_theme.json") or {}
+    if mic.get("device_index") is not None:
+        data.setdefault("mic_index", mic["device_index"])
+    if theme.get("theme"):
+        data.setdefault("theme", theme["theme"])
+    return data
+
+# every JSON file the app keeps (settings_store.py): atomic, debounced writes off the UI thread
+DOCUMENTS = {
+    # media player, music folder, recognizer, wake word, microphone, selected theme
+    "settings": Document("va_settings.json", version=2, migrations=(_settings_v2,)),
+    "themes":   Document("themes.json"),
+    "apps":     Document("apps_index.json"),
+}
 
-def save_json(path, data):
-    Path(path).write_text(json.dumps(data, indent=2))
+def open_store(folder=DATA_DIR):
+    return SettingsStore(folder, DOCUMENTS)
+
+STORE = open_store()
+
+# OS integration (apps, windows, processes, volume, media keys, typing);
+# every call except the catalog is recorded as an "os_action" span
+PLATFORM = create_platform(STORE.get("settings").get("platform"))
+# open windows and running processes (their listings are not traced)
+WINDOWS  = WindowRegistry(PLATFORM.windows)
+PROCS    = ProcessTracker(PLATFORM.processes)
+# microphone names and media players for the settings dialog
+DEVICES  = DeviceCache(PLATFORM.audio)
+PLATFORM = PLATFORM._replace(**{
+    c: TRACER.wrap(getattr(PLATFORM, c), "os_action", component=c)
+    for c in ("windows", "processes", "volume", "media", "text")
+})
+# typing mode: dictated phrases and voice edits, sent from their own thread
+OUTPUT = TextOutput(PLATFORM.text, tracer=TRACER)
 
 
 
@@ -100,6 +148,9 @@ BG_TO_EN_ACTION = {
     "слушай":     "play",
 }
 
+# Wake word: off by default; window_s = how long a lone wake word keeps the mic open
+WAKE_DEFAULTS = {"enabled": False, "window_s": 5.0}
+
 # Typing-mode toggles with a few alternative phrases
 BG_TYPE_ON  = ("режим писане", "режим за писане", "включи писане")
 BG_TYPE_OFF = ("излез режим писане", "изключи писане", "спри писане")
@@ -110,100 +161,51 @@ BG_TYPE_OFF = ("излез режим писане", "изключи писан
 
 # ─── App‐scan & commands ─────────────────────────────────────────────────
 
-def scan_installed_apps():
-    apps = {}
-
-    # 1) HKLM Uninstall (32-bit & 64-bit)
-    for hive, flag in (
-        (winreg.HKEY_LOCAL_MACHINE, winreg.KEY_WOW64_32KEY),
-        (winreg.HKEY_LOCAL_MACHINE, winreg.KEY_WOW64_64KEY),
-    ):
-        sub_key = r"SOFTWARE\Microsoft\Windows\CurrentVersion\Uninstall"
-        try:
-            with winreg.OpenKey(hive, sub_key, 0, winreg.KEY_READ | flag) as key:
-                for i in range(winreg.QueryInfoKey(key)[0]):
-                    try:
-                        sub = winreg.EnumKey(key, i)
-                        with winreg.OpenKey(key, sub) as sk:
-                            name, _ = winreg.QueryValueEx(sk, "DisplayName")
-                            icon, _ = winreg.QueryValueEx(sk, "DisplayIcon")
-                            if name and icon:
-                                exe_path = icon.split(",")[0]
-                                apps[name.lower()] = exe_path
-                    except OSError:
-                        continue
-        except OSError:
-            continue
-
-    # 2) HKCU Uninstall (current user)
-    try:
-        cu_key = r"SOFTWARE\Microsoft\Windows\CurrentVersion\Uninstall"
-        with winreg.OpenKey(winreg.HKEY_CURRENT_USER, cu_key, 0, winreg.KEY_READ) as key:
-            for i in range(winreg.QueryInfoKey(key)[0]):
-                try:
-                    sub = winreg.EnumKey(key, i)
-                    with winreg.OpenKey(key, sub) as sk:
-                        name, _ = winreg.QueryValueEx(sk, "DisplayName")
-                        icon, _ = winreg.QueryValueEx(sk, "DisplayIcon")
-                        if name and icon:
-                            exe_path = icon.split(",")[0]
-                            apps[name.lower()] = exe_path
-                except OSError:
-                    continue
-    except OSError:
-        pass
-
-    # Helper to scan a Start Menu folder for .lnk shortcuts
-    def scan_start_menu_folder(folder_path):
-        for root_dir, _, files in os.walk(folder_path):
-            for fn in files:
-                if fn.lower().endswith(".lnk"):
-                    full = os.path.join(root_dir, fn)
-                    ps = [
-                        "powershell",
-                        "-NoProfile",
-                        "-WindowStyle", "Hidden",
-                        "-Command",
-                        f"(New-Object -COM WScript.Shell).CreateShortcut('{full}').TargetPath"
-                    ]
-                    try:
-                        tgt = subprocess.check_output(
-                            ps,
-                            universal_newlines=True,
-                            stderr=subprocess.DEVNULL,
-                            creationflags=CREATE_NO_WINDOW
-                        ).strip()
-                        name = fn.lower().rsplit(".", 1)[0]
-                        if tgt:
-                            apps[name] = tgt
-                    except subprocess.SubprocessError:
-                        continue
-                        
-    # 3) All Users Start Menu
-    program_data = os.environ.get("PROGRAMDATA", "")
-    all_users_start = os.path.join(program_data, "Microsoft", "Windows", "Start Menu", "Programs")
-    if os.path.isdir(all_users_start):
-        scan_start_menu_folder(all_users_start)
-
-    # 4) Current User’s Start Menu
-    app_data = os.environ.get("APPDATA", "")
-    user_start = os.path.join(app_data, "Microsoft", "Windows", "Start Menu", "Programs")
-    if os.path.isdir(user_start):
-        scan_start_menu_folder(user_start)
-
-    return apps
-
 def load_or_build_app_index():
-    if APPS_JSON.exists():
-        try:
-            return load_json(APPS_JSON, {})
-        except:
-            pass
-    apps = scan_installed_apps()
-    save_json(APPS_JSON, apps)
-    return apps
-
-APP_COMMANDS = load_or_build_app_index()
+    """
+    Return the cached index straight away; only a first run (no cache yet)
+    waits for a full scan.  Staleness is handled by refresh_app_index().
+    """
+    state = STORE.get("apps")
+    if not state:
+        state, stats = PLATFORM.apps.refresh({})
+        STORE.put("apps", state)
+        logger.info("[Apps] index built: %d apps in %.0f ms", stats["added"], stats["elapsed_ms"])
+    return state
+
+def refresh_app_index():
+    """Re-scan changed sources and swap in the merged result (background thread)."""
+    global APP_STATE, APP_COMMANDS, APP_INDEX
+    try:
+        state, stats = PLATFORM.apps.refresh(APP_STATE)
+    except Exception:
+        logger.exception("[Apps] index refresh failed")
+        return
+    logger.info(
+        "[Apps] index refresh: +%d -%d ~%d entries, %d files touched, "
+        "%d sources rescanned, %.0f ms",
+        stats["added"], stats["removed"], stats["changed"],
+        stats["files_touched"], stats["sources_rescanned"], stats["elapsed_ms"],
+    )
+    if stats["sources_rescanned"] or state != APP_STATE:
+        apps = PLATFORM.apps.apps(state)
+        APP_INDEX, APP_COMMANDS, APP_STATE = AppNameIndex(apps), apps, state
+        STORE.put("apps", state)
+
+def init_app_index():
+    """Load (or first-time build) the index, then refresh it.  Runs off the UI thread."""
+    global APP_STATE, APP_COMMANDS, APP_INDEX
+    with PROFILE.phase("apps: load cached index"):
+        state = load_or_build_app_index()
+        apps = PLATFORM.apps.apps(state)
+        APP_INDEX, APP_COMMANDS, APP_STATE = AppNameIndex(apps), apps, state
+    with PROFILE.phase("apps: refresh"):
+        refresh_app_index()
+
+# empty until init_app_index() has run
+APP_STATE    = {}
+APP_COMMANDS = {}
+APP_INDEX    = AppNameIndex()
 
 def handle_system_command(text) -> bool:
     """
@@ -216,232 +218,348 @@ def handle_system_command(text) -> bool:
         return False
 
     action, target = words[0], " ".join(words[1:])
-    names = list(APP_COMMANDS.keys())
-    best = difflib.get_close_matches(target, names, n=1, cutoff=0.6)
-    if not best:
-        return False
-
-    app_name = best[0]
-    exe_path = APP_COMMANDS[app_name]
-
-    if action == "open":
-        try:
-            subprocess.Popen(exe_path)
-        except Exception:
-            pass
-        return True
-
-    if action == "close":
-        proc = os.path.basename(exe_path)
-        try:
-            subprocess.run(["taskkill", "/im", proc, "/f"], check=True)
-        except Exception:
-            pass
-        return True
+    with TRACER.span("fuzzy_match", index="apps", size=len(APP_COMMANDS)):
+        app_name = APP_INDEX.best_match(target, cutoff=0.6)
+    # index & commands are swapped by the background refresh
+    exe_path = APP_COMMANDS.get(app_name) if app_name else None
 
     if action == "switch":
-        # First try to bring an existing window to front
-        if switch_to_window(app_name):
+        # best open window by title, owning app and recent focus; otherwise launch
+        with TRACER.span("fuzzy_match", index="windows", size=len(WINDOWS)):
+            hwnd = WINDOWS.best(target, app_target=exe_path)
+        if hwnd is not None:
+            PLATFORM.windows.activate(hwnd)
+            return True
+        if exe_path:
+            PLATFORM.processes.launch(exe_path)
             return True
-
-        # Otherwise, launch it
-        try:
-            subprocess.Popen(exe_path)
-        except Exception:
-            pass
-        return True
-
-    return False
-
-def switch_to_window(app_name_fragment: str) -> bool:
-    """
-    Search all visible top‐level windows for one whose title contains
-    `app_name_fragment` (case-insensitive). If found, restore/minimize &
-    bring it to the foreground as if Alt+Tabbed to it.
-    """
-    fragment = app_name_fragment.lower()
-    candidates = []
-
-    def _enum(hwnd, _):
-        if win32gui.IsWindowVisible(hwnd):
-            title = win32gui.GetWindowText(hwnd).lower()
-            if fragment in title:
-                candidates.append(hwnd)
-
-    win32gui.EnumWindows(_enum, None)
-    if not candidates:
         return False
 
-    hwnd = candidates[0]
+    if not exe_path:
+        return False
     try:
-        # If window is minimized, restore it
-        if win32gui.IsIconic(hwnd):
-            win32gui.ShowWindow(hwnd, win32con.SW_RESTORE)
-
-        # If not already foreground, attach input threads to force focus
-        foreground_hwnd = win32gui.GetForegroundWindow()
-        if foreground_hwnd != hwnd:
-            current_thread = win32api.GetCurrentThreadId()
-            target_thread, _ = win32process.GetWindowThreadProcessId(hwnd)
-
-            ctypes.windll.user32.AttachThreadInput(current_thread, target_thread, True)
-
-            win32gui.BringWindowToTop(hwnd)
-            win32gui.SetForegroundWindow(hwnd)
-            win32gui.SetActiveWindow(hwnd)
+        pids = PROCS.pids_for(exe_path)
+    except Exception:
+        logger.exception("[Apps] process table unavailable")
+        pids = None
 
-            ctypes.windll.user32.AttachThreadInput(current_thread, target_thread, False)
+    if action == "open":
+        # already running: bring its window forward instead of starting another instance
+        hwnds = WINDOWS.owned_by(pids) if pids else []
+        if hwnds:
+            PLATFORM.windows.activate(hwnds[0])
         else:
-            win32gui.BringWindowToTop(hwnd)
+            PLATFORM.processes.launch(exe_path)
+        return True
 
+    if action == "close":
+        if pids is None:
+            PLATFORM.processes.kill(exe_path)
+        elif not pids:
+            print(f"[Apps] {app_name} is not running")
+        else:
+            # close its windows like the close button would; terminate what is left later
+            for hwnd in WINDOWS.owned_by(pids):
+                PLATFORM.windows.close(hwnd)
+            PROCS.stop(pids)
         return True
-    except Exception:
-        return False
+
+    return False
 
 # ─── Theme Helpers ───────────────────────────────────────────────────────
 
+DEFAULT_THEMES = {
+    "Light": {"bg":"#f0f0f0","fg":"#000","btn_bg":"#e0e0e0","btn_fg":"#000"},
+    "Dark":  {"bg":"#333","fg":"#eee","btn_bg":"#555","btn_fg":"#fff"},
+}
+
 def load_themes():
-    d = load_json(THEME_JSON, {})
-    if not d:
-        d = {
-            "Light": {"bg":"#f0f0f0","fg":"#000","btn_bg":"#e0e0e0","btn_fg":"#000"},
-            "Dark":  {"bg":"#333","fg":"#eee","btn_bg":"#555","btn_fg":"#fff"},
-        }
-        save_json(THEME_JSON, d)
-    return d
-
-def load_selected_theme():
-    return load_json(SEL_THEME, {}).get("theme", "Dark")
+    """{name: normalized theme} (theme_engine.normalize); problems are reported, not raised."""
+    themes, problems = parse_themes(STORE.get("themes"))
+    for p in problems:
+        print("[Theme]", p)
+    if not themes:
+        STORE.put("themes", DEFAULT_THEMES)
+        themes = {name: normalize_theme(name, t)[0] for name, t in DEFAULT_THEMES.items()}
+    return themes
+
+def load_selected_theme(themes=None):
+    name = STORE.get("settings").get("theme", "Dark")
+    if themes and name not in themes:
+        name = next(iter(themes))
+    return name
 
 def save_selected_theme(n):
-    save_json(SEL_THEME, {"theme":n})
-
-def apply_theme(root, th):
-    bg, fg = th["bg"], th["fg"]
-    bb, bf = th.get("btn_bg"), th.get("btn_fg")
-    root.configure(bg=bg)
-    def walk(w):
-        for c in w.winfo_children():
-            cls = c.__class__.__name__
-            if cls in ("Frame","Toplevel"):
-                c.configure(bg=bg)
-            if cls == "Label":
-                c.configure(bg=bg, fg=fg)
-            if cls == "Button":
-                c.configure(bg=bb, fg=bf)
-            walk(c)
-    walk(root)
+    STORE.update("settings", theme=n)
 
 # ─── Mic Helpers ──────────────────────────────────────────────────────────
 
 def load_mic():
-    return load_json(MIC_FILE, {}).get("device_index", None)
+    return STORE.get("settings").get("mic_index", None)
 
 def save_mic(i):
-    save_json(MIC_FILE, {"device_index": i})
+    STORE.update("settings", mic_index=i)
 
-# ─── User Settings (media player & music folder) ──────────────────────────
+# ─── User Settings (media player, music folder, recognizer) ───────────────
 
 def load_user_cfg():
-    cfg = load_json(USER_CFG, {})
+    cfg = STORE.get("settings")
     return {
         "media_player": cfg.get("media_player", ""),
-        "music_folder": cfg.get("music_folder", "")
+        "music_folder": cfg.get("music_folder", ""),
+        "recognizer":   dict(RECOGNIZER_DEFAULTS, **cfg.get("recognizer", {})),
+        "wake_word":    dict(WAKE_DEFAULTS, **cfg.get("wake_word", {})),
+        # opt-in: lets templates learned on this machine run commands without the cloud
+        "direct_commands": cfg.get("direct_commands", False),
     }
 
-def save_user_cfg(media_player, music_folder):
-    cfg = {
-        "media_player": media_player,
-        "music_folder": music_folder
-    }
-    save_json(USER_CFG, cfg)
+def save_user_cfg(media_player, music_folder, **extra):
+    # keys edited by hand (e.g. "recognizer") are kept: only these are replaced
+    STORE.update("settings", media_player=media_player, music_folder=music_folder, **extra)
+
+def make_recognizer_backend(cfg):
+    """Backend from settings; falls back to Google if e.g. a model is missing."""
+    try:
+        return create_backend(cfg)
+    except Exception as e:
+        logger.warning("[Recognizer] %r unavailable (%s), using google", cfg.get("backend"), e)
+        return create_backend(RECOGNIZER_DEFAULTS)
 
 # ─── Main UI ───────────────────────────────────────────────────────────────
 
 class VoiceAssistantApp:
+    # started after the window is shown; the status line lists those not ready yet
+    SUBSYSTEMS = ("apps", "windows", "processes", "audio", "media", "gif", "recognizer", "music")
+    gif = None      # gif_frames.GifAnimator, once _show_gif has run
+
     def __init__(self, root):
         self.root = root
         root.title("Voice Assistant")
         root.geometry("500x380")
 
-        # ── Volume control setup via pycaw ────────────────────────
-        devices   = AudioUtilities.GetSpeakers()
-        interface = devices.Activate(
-            IAudioEndpointVolume._iid_, comtypes.CLSCTX_ALL, None
-        )
-        self.volume = comtypes.cast(interface, comtypes.POINTER(IAudioEndpointVolume))
-
         # ── Mic indicator ─────────────────────────────────────────
         self.mic_indicator = tk.Label(
             root, text="● Mic: OFF", fg="red", font=("Segoe UI", 10, "bold")
         )
         self.mic_indicator.place(relx=0.01, rely=0.95, anchor="sw")
 
-        # ── Media controller ───────────────────────────────────────
-        self.mc = MediaController()
-
         # ── Top Controls ───────────────────────────────────────────
         frm = tk.Frame(root); frm.pack(pady=5)
-        self.start_btn = tk.Button(frm, text="Start", command=self.start_listening)
+        self.start_btn = tk.Button(frm, text="Start", command=self.start_listening, state=tk.DISABLED)
         self.start_btn.pack(side=tk.LEFT)
         self.stop_btn = tk.Button(frm, text="Stop", command=self.stop_listening, state=tk.DISABLED)
         self.stop_btn.pack(side=tk.LEFT)
-        tk.Button(frm, text="⚙️Settings",   command=self.open_settings).pack(side=tk.LEFT, padx=5)
-       
-        
+        self.settings_btn = tk.Button(frm, text="⚙️Settings", command=self.open_settings, state=tk.DISABLED)
+        self.settings_btn.pack(side=tk.LEFT, padx=5)
+
+        # ── Readiness ──────────────────────────────────────────────
+        self.status_lbl = tk.Label(root, text="", font=("Segoe UI", 9))
+        self.status_lbl.pack()
+        self.ready = dict.fromkeys(self.SUBSYSTEMS, False)   # init finished, either way
+        self.failed = {}                # subsystem → the exception its init raised
 
-        # ── Little Dog GIF ─────────────────────────────────────────
-        gif = BASE_DIR / "annoying_dog.gif"
-        if gif.exists():
-            img = Image.open(gif)
-            self.frames = [
-                ImageTk.PhotoImage(f.resize((80,80), Image.LANCZOS))
-                for f in ImageSequence.Iterator(img)
-            ]
-            self._gif_i  = 0
-            self.dog_lbl = tk.Label(root, bg=root["bg"])
-            self.dog_lbl.place(relx=1, rely=1, anchor="se", x=-5, y=-5)
-            self._animate_gif()
-
-        # ── Speech Recognizer ──────────────────────────────────────
-        self.recognizer   = sr.Recognizer()
-        self.mic_index    = load_mic()
-        self.microphone   = (
-            sr.Microphone(device_index=self.mic_index)
-            if self.mic_index is not None else sr.Microphone()
-        )
         self.bg_listener = None
+        self._switching  = False        # a microphone is being calibrated off the Tk thread
+        self._want_listening = False    # Stop pressed meanwhile: do not start on the new one
         self.typing_mode = False
 
         # ── Load user config ───────────────────────────────────────
         cfg = load_user_cfg()
         self.media_player = cfg["media_player"]
         self.music_folder = cfg["music_folder"]
+        self.wake_cfg     = cfg["wake_word"]
+        self.direct_commands = cfg["direct_commands"]
+        self._wake_until  = 0.0
 
         # ── Apply theme ───────────────────────────────────────────
+        self.theme = ThemeEngine(root)
+        self.theme.keep(self.mic_indicator, "foreground")      # red/green is the mic state
         themes = load_themes()
-        apply_theme(root, themes[load_selected_theme()])
+        self.theme.apply(themes[load_selected_theme(themes)])
+
+        self._update_status()
+        PROFILE.mark("window built")
+        # everything heavy starts once the window has been drawn
+        root.after(0, self._start_subsystems)
+
+
+    # ── Deferred start-up ──────────────────────────────────────────
+
+    def _start_subsystems(self):
+        PROFILE.mark("window shown")
+        TRACER.start_exporter(trace_log)
+        self._init_async("apps", init_app_index)
+        self._init_async("windows", WINDOWS.start)
+        self._init_async("processes", PROCS.refresh)
+        self._init_async("audio", self._init_audio)
+        self._init_async("media", self._init_media)
+        self._init_async("gif", self._load_gif, self._show_gif)
+        self._init_async("recognizer", self._init_recognizer)
+        self._init_async("music", self._init_music)
+
+    def _init_async(self, name, work, on_ui=None):
+        """
+        Run work() on a thread; then on_ui(result) on the Tk thread, and mark
+        `name` ready.  If either raises, `name` goes into self.failed instead.
+        """
+        def run():
+            result = error = None
+            try:
+                with PROFILE.phase(f"{name}: init"):
+                    result = work()
+            except Exception as e:
+                logger.exception("[Startup] %s failed to initialize", name)
+                error = e
+            self.root.after(0, lambda: self._mark_ready(name, on_ui, result, error))
+        threading.Thread(target=run, daemon=True, name=f"init-{name}").start()
+
+    def _ok(self, name):
+        return self.ready[name] and name not in self.failed
+
+    def _mark_ready(self, name, on_ui, result, error=None):
+        if on_ui and error is None:
+            try:
+                on_ui(result)
+            except Exception as e:
+                logger.exception("[Startup] %s failed to initialize", name)
+                error = e
+        if error is not None:
+            self.failed[name] = error
+        self.ready[name] = True
+        # Start and Settings use the recognizer's and music's attributes: only on success
+        if name == "recognizer" and self._ok(name) and hasattr(self, "pipeline"):
+            self.start_btn.config(state=tk.NORMAL)
+        if self._ok("recognizer") and self._ok("music"):
+            self.settings_btn.config(state=tk.NORMAL)
+        self._update_status()
+        if all(self.ready.values()):
+            PROFILE.mark("all subsystems ready")
+            if PROFILE.enabled:
+                PROFILE.write(PROFILE_PATH)
+                logger.info("[Startup] profile written to %s", PROFILE_PATH)
+
+    def _update_status(self):
+        pending = [name for name in self.SUBSYSTEMS if not self.ready[name]]
+        parts = [f"Loading: {', '.join(pending)}…"] if pending else []
+        parts += [f"{name} failed: {e}" for name, e in self.failed.items()]
+        self.status_lbl.config(text="  |  ".join(parts) or "Ready")
+
+    def _init_audio(self):
+        PLATFORM.volume.get()           # first use opens the audio endpoint
+        DEVICES.start()                 # probe the microphones before the settings dialog needs them
+
+    def _init_media(self):
+        PLATFORM.media.prepare()
+
+    def _init_recognizer(self):
+        from vad import VoiceActivityDetector
+        from kws import KeywordSpotter
+        cfg = load_user_cfg()
+        with PROFILE.phase("recognizer: commands"):
+            self.commands = self._build_commands()
+        with PROFILE.phase("recognizer: microphone"):
+            self.recognizer = sr.Recognizer()
+            self.mic_index  = load_mic()
+            self.microphone = (
+                sr.Microphone(device_index=self.mic_index)
+                if self.mic_index is not None else sr.Microphone()
+            )
+        with PROFILE.phase("recognizer: backend"):
+            self.backend = make_recognizer_backend(cfg["recognizer"])
+            self.vad     = VoiceActivityDetector()
+            self.kws     = KeywordSpotter(KWS_FILE)
+        self.pipeline = RecognitionPipeline(
+            self._recognize, self._handle_text,
+            on_error=lambda stage, e: print("Recognition error:", e),
+            tracer=TRACER,
+        )
 
+    def _init_music(self):
+        from music_library import MusicLibrary
+        self.music = MusicLibrary(MUSIC_DB, self.music_folder)
+        self.music.refresh_async(self._log_music_refresh)
 
-    def _animate_gif(self):
-        self.dog_lbl.config(image=self.frames[self._gif_i])
-        self._gif_i = (self._gif_i + 1) % len(self.frames)
-        self.root.after(100, self._animate_gif)
+    def _load_gif(self):
+        """Scaled GIF frames and durations, from the frame cache or decoded (off the Tk thread)."""
+        from gif_frames import load_frames
+        gif = BASE_DIR / "annoying_dog.gif"
+        if not gif.exists():
+            return None
+        return load_frames(gif, (80, 80), GIF_CACHE)
+
+    def _show_gif(self, frames):
+        # PhotoImage has to be created on the Tk thread
+        if not frames:
+            return
+        from PIL import ImageTk
+        from gif_frames import GifAnimator
+        self.frames  = [ImageTk.PhotoImage(img) for img, _ in frames]
+        self.dog_lbl = tk.Label(self.root, bg=self.root["bg"])
+        self.dog_lbl.place(relx=1, rely=1, anchor="se", x=-5, y=-5)
+        self.gif = GifAnimator(self.root, self.dog_lbl, self.frames, [ms for _, ms in frames]).start()
+
+    def _poke_gif(self):
+        # the dog plays while something is happening, and rests when idle or minimized
+        if self.gif:
+            self.gif.poke()
 
 
     def start_listening(self):
-        if not self.bg_listener:
-            with self.microphone as src:
-                self.recognizer.adjust_for_ambient_noise(src, duration=0.5)
-            self.bg_listener = self.recognizer.listen_in_background(
-                self.microphone, self._callback
-            )
+        if not self.bg_listener and not self._switching:
+            self._want_listening = True
             self.start_btn.config(state=tk.DISABLED)
-            self.stop_btn.config(state=tk.NORMAL)
-            self.mic_indicator.config(text="● Mic: ON", fg="green")
+            self._use_microphone(lambda: self.microphone, listen=True)
+
+    def _use_microphone(self, make_mic, listen):
+        """
+        Open make_mic() and, if `listen`, calibrate a recognizer for it on a
+        thread (both probe the device); then switch over on the Tk thread.
+        """
+        self._switching = True
+        if listen:
+            self.mic_indicator.config(text="● Mic: calibrating…", fg="orange")
+
+        def run():
+            mic = recognizer = error = None
+            try:
+                mic = make_mic()
+                if listen:
+                    recognizer = sr.Recognizer()
+                    with TRACER.span("calibrate"), mic as src:
+                        recognizer.adjust_for_ambient_noise(src, duration=0.5)
+            except Exception as e:
+                error = e
+            self.root.after(0, lambda: self._switch_microphone(mic, recognizer, error))
+        threading.Thread(target=run, daemon=True, name="mic-switch").start()
+
+    def _switch_microphone(self, mic, recognizer, error):
+        """Tk thread: start listening on the new device, then stop the listener it replaces."""
+        self._switching = False
+        if error is not None:
+            logger.warning("[Mic] could not open the microphone: %s", error)
+            if not self.bg_listener:
+                self.start_btn.config(state=tk.NORMAL)
+                self.mic_indicator.config(text="● Mic: OFF", fg="red")
+            else:
+                self.mic_indicator.config(text="● Mic: ON", fg="green")
+            return
+        self.microphone = mic
+        if recognizer is None or not self._want_listening:
+            return
+        old, self.recognizer = self.bg_listener, recognizer
+        # seed the VAD noise floor from the calibrated energy threshold
+        self.vad.noise_floor = recognizer.energy_threshold / recognizer.dynamic_energy_ratio / 32768
+        self.bg_listener = recognizer.listen_in_background(mic, self._callback)
+        if old:
+            old(wait_for_stop=False)
+        self.start_btn.config(state=tk.DISABLED)
+        self.stop_btn.config(state=tk.NORMAL)
+        self.mic_indicator.config(text="● Mic: ON", fg="green")
+        self._poke_gif()
 
 
     def stop_listening(self):
+        self._want_listening = False
         if self.bg_listener:
             self.bg_listener(wait_for_stop=False)
             self.bg_listener = None
@@ -450,149 +568,261 @@ class VoiceAssistantApp:
             self.mic_indicator.config(text="● Mic: OFF", fg="red")
 
 
+    def _build_commands(self):
+        """Register every spoken command as data on a CommandRegistry."""
+        reg = CommandRegistry()
+
+        # volume controls
+        reg.add_exact(("запази", "mute"), lambda: self._set_mute(1), "volume.mute")
+        reg.add_exact(("възстанови звук", "unmute"), lambda: self._set_mute(0), "volume.unmute")
+        reg.add_exact(("свиване", "volume down", "громкост надолу"),
+                      lambda: self._volume_step(-0.1), "volume.down")
+        reg.add_exact(("повече звук", "volume up", "громкост нагоре"),
+                      lambda: self._volume_step(+0.1), "volume.up")
+
+        # media controls via media keys
+        reg.add_exact(("пауза", "pause"),
+                      lambda: self._media_key("play_pause", "play/pause"), "media.pause")
+        reg.add_exact(("пусни", "продължи", "play", "resume"),
+                      lambda: self._media_key("play_pause", "play/resume"), "media.play")
+        reg.add_exact(("следваща песен", "следващ", "next"),
+                      lambda: self._media_key("next", "next"), "media.next")
+        reg.add_exact(("предишна песен", "предишен", "previous"),
+                      lambda: self._media_key("previous", "previous"), "media.previous")
+        reg.add_exact(("спри", "stop"),
+                      lambda: self._media_key("stop", "stop"), "media.stop")
+        reg.add_exact(("какво свири", "what's playing", "what is playing"),
+                      self._now_playing, "media.now_playing")
+
+        # typing mode
+        reg.add_exact(BG_TYPE_ON, lambda: self._set_typing_mode(True), "typing.on")
+        reg.add_exact(BG_TYPE_OFF, lambda: self._set_typing_mode(False), "typing.off")
+
+        # Bulgarian / English verb + argument
+        for verb, en_act in BG_TO_EN_ACTION.items():
+            if en_act == "play":
+                reg.add_prefix(verb, self._play_song, "play")
+            else:
+                reg.add_prefix(verb, lambda rest, a=en_act: handle_system_command(f"{a} {rest}"), en_act)
+        reg.add_prefix("play", self._play_song, "play")
+        for en_act in ("open", "close", "switch"):
+            reg.add_prefix(en_act, lambda rest, a=en_act: handle_system_command(f"{a} {rest}"), en_act)
+
+        # paraphrases of the exact phrases ("turn it up a bit"), via model_state.json
+        try:
+            from intents import IntentClassifier, EXAMPLES as INTENT_EXAMPLES
+            from model_engine import load_model
+            intents = IntentClassifier(load_model())
+            for label, phrases in INTENT_EXAMPLES.items():
+                intents.add(label, phrases)
+            reg.set_intents(intents)
+        except Exception as e:
+            print("[Intents] classifier disabled:", e)
+
+        return reg
+
+
+    def _set_mute(self, state):
+        PLATFORM.volume.set_mute(state)
+        print("[Volume] muted" if state else "[Volume] unmuted")
+
+    def _volume_step(self, delta):
+        new = PLATFORM.volume.step(delta)
+        if new is None:
+            print("[Volume] could not read the volume; left as it is"); return
+        print(f"[Volume] {'up' if delta > 0 else 'down'} → {new:.10%}")
+
+    def _media_key(self, action, label):
+        PLATFORM.media.send(action); print(f"[Media] {label}")
+
+    def _now_playing(self):
+        now = PLATFORM.media.now_playing()
+        if not now or not now.title:
+            print("[Media] nothing playing"); return
+        by = f" by {now.artist}" if now.artist else ""
+        print(f"[Media] {now.status or 'now'}: {now.title!r}{by} ({now.app})")
+
+    def _set_typing_mode(self, on):
+        self.typing_mode = on
+        if on:
+            OUTPUT.reset()
+        print(f"[Typing Mode] {'enabled' if on else 'disabled'}")
+
+
     def _callback(self, recognizer, audio):
         """Called from the background thread when speech is detected."""
+        from kws import WAKE
+        # this callback fires at end of speech; the phrase itself is the capture span
+        now = time.monotonic()
+        TRACER.bind(TRACER.new_trace())
+        TRACER.record("capture", now - len(audio.frame_data) / (audio.sample_rate * audio.sample_width), now)
+
+        # drop noise-only phrases before they cost a recognizer call
+        with TRACER.span("vad") as span:
+            speech = self.vad.process(audio)
+            span["speech"] = speech is not None
+        if speech is None:
+            logger.debug("[VAD] rejected phrase (%s)", self.vad.stats())
+            return
+
+        # wake word gate: nothing goes upstream unless it follows the wake word
+        if self.wake_cfg["enabled"] and WAKE in self.kws.labels():
+            if time.monotonic() < self._wake_until:
+                self._wake_until = 0.0
+            else:
+                end = self.kws.spot_wake(speech)
+                if end is None:
+                    return
+                rest = speech.get_raw_data()[end * speech.sample_width:]
+                if len(rest) < 0.3 * speech.sample_rate * speech.sample_width:
+                    # wake word on its own: listen for the next phrase
+                    self._wake_until = time.monotonic() + self.wake_cfg["window_s"]
+                    print("[Wake] listening…"); return
+                speech = sr.AudioData(rest, speech.sample_rate, speech.sample_width)
+
+        self.pipeline.submit(speech, trace=TRACER.current)
+
+
+    def _recognize(self, audio):
+        """Pipeline worker: audio → text (None if nothing was understood)."""
+        # fixed phrases the spotter already knows never leave the machine
+        if self.direct_commands:
+            local = self.kws.match_command(audio)
+            if local:
+                logger.debug("[KWS] direct command %r", local)
+                return local
+
+        text = self.backend.recognize(audio).text
+        # learn templates for fixed phrases the cloud recognizer confirmed,
+        # and for the garbage model from everything else it heard
+        if text and self.direct_commands:
+            from kws import OTHER
+            self.kws.enroll(normalize_phrase(text) if self.commands.match_exact(text) else OTHER, audio)
+        return text
+
+
+    def _handle_text(self, text):
+        """Pipeline executor: runs commands one at a time, in spoken order."""
         try:
-            # 1) recognize speech
-            text  = recognizer.recognize_google(audio, language="bg-BG")
             lower = text.lower().strip()
             print("[You said]", text)
+            self._poke_gif()
 
-            # 2) volume controls
-            if lower in ("запази", "mute"):
-                self.volume.SetMute(1, None); print("[Volume] muted"); return
-            if lower in ("възстанови звук", "unmute"):
-                self.volume.SetMute(0, None); print("[Volume] unmuted"); return
-            if lower in ("свиване", "volume down", "громкост надолу"):
-                curr = self.volume.GetMasterVolumeLevelScalar()
-                new  = max(0.0, curr - 0.1)
-                self.volume.SetMasterVolumeLevelScalar(new, None)
-                print(f"[Volume] down → {new:.10%}"); return
-            if lower in ("повече звук", "volume up", "громкост нагоре"):
-                curr = self.volume.GetMasterVolumeLevelScalar()
-                new  = min(1.0, curr + 0.1)
-                self.volume.SetMasterVolumeLevelScalar(new, None)
-                print(f"[Volume] up → {new:.10%}"); return
-
-            # 3) media controls via keyboard
-            if lower in ("пауза", "pause"):
-                keyboard.send("play/pause media"); print("[Media] play/pause"); return
-            if lower in ("пусни", "продължи", "play", "resume"):
-                keyboard.send("play/pause media"); print("[Media] play/resume"); return
-            if lower in ("следваща песен", "следващ", "next"):
-                keyboard.send("next track"); print("[Media] next"); return
-            if lower in ("предишна песен", "предишен", "previous"):
-                keyboard.send("previous track"); print("[Media] previous"); return
-            if lower in ("спри", "stop"):
-                keyboard.send("stop media"); print("[Media] stop"); return
-
-            # 4) typing mode
-            if lower in BG_TYPE_ON:
-                self.typing_mode = True; print("[Typing Mode] enabled"); return
-            if lower in BG_TYPE_OFF:
-                self.typing_mode = False; print("[Typing Mode] disabled"); return
-            if self.typing_mode:
-                if lower in ("ентър", "enter"):
-                    pyautogui.press("enter")
-                else:
-                    pyautogui.write(text + " ")
+            # 1) exact phrases (volume, media, typing toggles) always win
+            with TRACER.span("dispatch", kind="exact") as span:
+                span["label"] = self.commands.dispatch(lower, exact_only=True)
+            if span["label"]:
                 return
 
-            # 5) Bulgarian → English open/close/switch/play
-            words = lower.split()
-            if words and words[0] in BG_TO_EN_ACTION:
-                en_act = BG_TO_EN_ACTION[words[0]]
-                rest   = " ".join(words[1:])
-                if en_act == "play":
-                    self._play_song(rest); return
-                if handle_system_command(f"{en_act} {rest}"):
-                    return
-
-            # 6) English “play …” fallback
-            if lower.startswith("play "):
-                self._play_song(lower[5:]); return
-
-            # 7) English open/close/switch fallback
-            if handle_system_command(text):
+            # 2) typing mode swallows everything else ("нов ред", "delete last word", … are edits)
+            if self.typing_mode:
+                OUTPUT.dictate(text)
                 return
 
-        except sr.UnknownValueError:
-            pass
+            # 3) verb + argument (open/close/switch/play), then paraphrased intents, then fallbacks
+            with TRACER.span("dispatch", kind="full") as span:
+                span["label"] = self.commands.dispatch(lower)
+
         except Exception as e:
             print("Recognition error:", e)
 
 
+    def _log_music_refresh(self, stats):
+        logger.info(
+            "[Music] index refresh: %d tracks (+%d -%d), %d dirs scanned, %.0f ms, "
+            "%d files tagged",
+            stats["tracks"], stats["added"], stats["removed"],
+            stats["dirs_scanned"], stats["elapsed_ms"], stats["tagged"],
+        )
+
+
     def _play_song(self, song_name_fragment: str):
-        """Fuzzy-match a file in self.music_folder and launch it."""
+        """
+        Fuzzy-match a track from the music library index and launch it.
+        False when nothing was played, so the dispatcher tries the intents
+        next ("пусни по-силно", "play the music" are not track names).
+        """
         if not self.media_player or not os.path.isfile(self.media_player):
-            print("[Music] No media player set."); return
+            print("[Music] No media player set."); return False
         if not self.music_folder or not os.path.isdir(self.music_folder):
-            print("[Music] No music folder set."); return
-
-        audio_exts = (".mp3",".wav",".flac",".aac",".ogg",".m4a")
-        candidates, file_map = [], {}
-        for root_dir, _, files in os.walk(self.music_folder):
-            for fn in files:
-                if fn.lower().endswith(audio_exts):
-                    base = os.path.splitext(fn)[0].lower()
-                    full = os.path.join(root_dir, fn)
-                    candidates.append(base)
-                    file_map[base] = full
-
-        if not candidates:
-            print("[Music] No audio files found."); return
-
-        best = difflib.get_close_matches(song_name_fragment.lower(), candidates, n=1, cutoff=0.5)
-        if not best:
-            print(f"[Music] No match for {song_name_fragment!r}."); return
-
-        path = file_map[best[0]]
-        print(f"[Music] Playing {best[0]!r} → {path}")
-        try:
-            subprocess.Popen([self.media_player, path])
-        except Exception as e:
-            print(f"[Music] Failed to launch player: {e}")
+            print("[Music] No music folder set."); return False
+
+        if not len(self.music):
+            print("[Music] No audio files found."); return False
+
+        # "album X" / "songs by Y" queue every track; anything else plays the best hit
+        with TRACER.span("fuzzy_match", index="music", size=len(self.music)):
+            field, hits = self.music.query(song_name_fragment, limit=1)
+        if not hits:
+            print(f"[Music] No match for {song_name_fragment!r}."); return False
+
+        if field:
+            # a playlist file: hundreds of paths do not fit on a Windows command line
+            from music_library import write_playlist
+            print(f"[Music] Queueing {len(hits)} tracks for {field} {song_name_fragment!r}")
+            target = write_playlist([path for _, path, _ in hits])
+        else:
+            print(f"[Music] Playing {hits[0][2]!r} → {hits[0][1]}")
+            target = hits[0][1]
+        if not PLATFORM.processes.launch([self.media_player, target]):
+            print("[Music] Failed to launch player")
 
 
     def open_settings(self):
+        from kws import WAKE
         win = Toplevel(self.root)
         win.title("Settings")
-        win.geometry("350x300")
+        win.geometry("350x660")
 
         # — Theme Selector —
         tk.Label(win, text="Theme:").pack(pady=(10,0))
         themes = load_themes()
-        tv = tk.StringVar(value=load_selected_theme())
+        tv = tk.StringVar(value=load_selected_theme(themes))
         cb = ttk.Combobox(win, values=list(themes), textvariable=tv, state="readonly")
         cb.pack(fill=tk.X, padx=20)
 
-        # — Microphone Selector —
+        # lists arrive from other threads; this runs fn on the Tk thread while the dialog is open
+        def on_tk(fn):
+            return lambda *a: self.root.after(0, lambda: win.winfo_exists() and fn(*a))
+
+        # — Microphone Selector (cached names; probed off the Tk thread) —
         tk.Label(win, text="Microphone:").pack(pady=(15,0))
-        mic_names = sr.Microphone.list_microphone_names()
-        mv = tk.StringVar()
-        idx = load_mic()
-        if isinstance(idx, int) and idx < len(mic_names):
-            mv.set(mic_names[idx])
-        elif mic_names:
-            mv.set(mic_names[0])
-        mc_combo = ttk.Combobox(win, values=mic_names, textvariable=mv, state="readonly")
+        mic_names = []
+        mv = tk.StringVar(value="Loading…")
+        mc_combo = ttk.Combobox(win, textvariable=mv, state="disabled")
         mc_combo.pack(fill=tk.X, padx=20)
+        def show_mics(names):
+            current = mv.get() if mic_names else None
+            mic_names[:] = names
+            mc_combo.config(values=names, state="readonly" if names else "disabled")
+            idx = load_mic()
+            if current in names:
+                mv.set(current)
+            elif isinstance(idx, int) and idx < len(names):
+                mv.set(names[idx])
+            else:
+                mv.set(names[0] if names else "No microphones found")
+        DEVICES.microphones(on_tk(show_mics))
+        hotplug = on_tk(show_mics)
+        DEVICES.on_change(hotplug)
+        win.bind("<Destroy>", lambda e: e.widget is win and DEVICES.remove_listener(hotplug))
 
         # — Media Player Selector —
         tk.Label(win, text="Preferred Media Player:").pack(pady=(15,0))
-        media_keywords = ("player","vlc","spotify","itunes","winamp","foobar")
-        player_names, player_map = [], {}
-        for friendly, path in APP_COMMANDS.items():
-            if any(k in friendly for k in media_keywords):
-                player_names.append(friendly)
-                player_map[friendly] = path
+        player_map = {}
         mp_var = tk.StringVar(value="")
         cfg = load_user_cfg()
-        for friendly, path in player_map.items():
-            if path.lower() == cfg["media_player"].lower():
-                mp_var.set(friendly); break
-        mp_combo = ttk.Combobox(win, values=player_names, textvariable=mp_var, state="readonly")
+        mp_combo = ttk.Combobox(win, textvariable=mp_var, state="readonly")
         mp_combo.pack(fill=tk.X, padx=20)
+        def show_players(players):
+            player_map.update(players)
+            mp_combo.config(values=list(players))
+            if not mp_var.get():
+                for friendly, path in players.items():
+                    if path.lower() == cfg["media_player"].lower():
+                        mp_var.set(friendly); break
+        show = on_tk(show_players)
+        threading.Thread(target=lambda: show(DEVICES.players(APP_COMMANDS)), daemon=True).start()
         def choose_media_player():
             p = filedialog.askopenfilename(
                 title="Select Media Player", filetypes=[("EXE","*.exe"),("All","*.*")]
@@ -614,28 +844,72 @@ class VoiceAssistantApp:
         def apply_and_close():
             # theme
             save_selected_theme(tv.get())
-            apply_theme(self.root, themes[tv.get()])
-            # mic
-            if mic_names:
+            self.theme.apply(themes[tv.get()])
+            # mic: opened (and calibrated, if listening) off the Tk thread, then handed over
+            if mv.get() in mic_names:
                 new_idx = mic_names.index(mv.get())
                 save_mic(new_idx)
-                self.mic_index = new_idx
-                self.microphone = sr.Microphone(device_index=new_idx)
-                if self.bg_listener:
-                    self.stop_listening(); self.start_listening()
+                if new_idx != self.mic_index and not self._switching:
+                    self.mic_index = new_idx
+                    self._use_microphone(lambda: sr.Microphone(device_index=new_idx),
+                                         listen=bool(self.bg_listener))
             # media player & music folder
             chosen = mp_var.get().strip()
             mpath = player_map.get(chosen, chosen)
             save_user_cfg(mpath, mf_var.get().strip())
             self.media_player  = mpath
             self.music_folder  = mf_var.get().strip()
+            if os.path.normpath(self.music_folder) != self.music.folder:
+                self.music.set_folder(self.music_folder)
+            # wake word
+            self.wake_cfg["enabled"] = bool(wake_var.get())
+            save_user_cfg(mpath, self.music_folder, wake_word=self.wake_cfg)
             win.destroy()
 
+        # — Wake Word —
+        wake_var = tk.IntVar(value=int(self.wake_cfg["enabled"]))
+        tk.Checkbutton(win, text="Require wake word", variable=wake_var).pack(pady=(15,0))
+        wake_status = tk.Label(win, text=f"Wake word samples: {self.kws.count(WAKE)}")
+        wake_status.pack()
+        def record_wake_sample():
+            def run():
+                try:
+                    with self.microphone as src:
+                        audio = self.recognizer.listen(src, timeout=5, phrase_time_limit=3)
+                    self.kws.enroll(WAKE, self.vad.process(audio) or audio)
+                    n = self.kws.count(WAKE)
+                    msg = f"Wake word samples: {n}" + ("" if n >= 2 else " (record at least 2)")
+                except Exception as e:
+                    msg = f"Recording failed: {e}"
+                self.root.after(0, lambda: wake_status.config(text=msg))
+            wake_status.config(text="Say the wake word…")
+            threading.Thread(target=run, daemon=True).start()
+        tk.Button(win, text="Record wake word sample", command=record_wake_sample).pack(pady=(5,0))
+
+        # — Latency (live, from the trace ring buffer) —
+        tk.Label(win, text="Latency ms:    p50     p95     p99").pack(pady=(15,0))
+        lat_lbl = tk.Label(win, font=("Consolas", 8), justify=tk.LEFT, anchor="w")
+        lat_lbl.pack(fill=tk.X, padx=20)
+        def refresh_latency():
+            if not win.winfo_exists():
+                return
+            summary, rows = TRACER.summary(), []
+            for stage in TRACE_STAGES:
+                v = summary.get(stage)
+                if v:
+                    rows.append(f"{stage:<12}{v['p50_ms']:8.1f}{v['p95_ms']:8.1f}{v['p99_ms']:8.1f}  n={v['n']}")
+            lat_lbl.config(text="\n".join(rows) or "no phrases yet")
+            win.after(1000, refresh_latency)
+        refresh_latency()
+
         tk.Button(win, text="Apply", command=apply_and_close).pack(pady=15)
         
 
 
 if __name__ == "__main__":
+    # tag reading uses a process pool; needed for the frozen (PyInstaller) exe
+    multiprocessing.freeze_support()
+    setup_logging()
     root = tk.Tk()
     
     VoiceAssistantApp(root)
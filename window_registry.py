@@ -0,0 +1,247 @@
+# window_registry.py
+
+"""
+Open top-level windows, kept current by the platform's window events.
+
+"switch to X" used to enumerate every window and take the first title that
+contained X.  The registry lists windows once, then applies create /
+destroy / title / focus events from WindowManager.watch() (or re-lists
+every poll_s seconds on backends without events), and keeps title word →
+windows and owning program → windows maps, plus a trigram index over the
+word vocabulary for misheard words.  A lookup only touches the windows
+that contain a (close) spoken word or belong to the matched app, and
+ranks them by:
+
+    title similarity (best run of words) + program match + recent focus
+"""
+
+import difflib
+import heapq
+import os
+import re
+import threading
+import time
+from collections import defaultdict
+
+from app_index import AppNameIndex
+
+EXE_WEIGHT = 0.5            # window belongs to the app the name resolved to
+RECENCY_WEIGHT = 0.2        # focused just now; halves every RECENCY_HALF_LIFE s
+RECENCY_HALF_LIFE = 300.0
+WORD_CUTOFF = 0.75          # a misheard word still finds the windows of its close matches
+
+_EXE = re.compile(r'([^\\/"]+?)\.exe\b', re.IGNORECASE)
+_WORD = re.compile(r"\w+")
+
+
+def program_name(target):
+    """Lower-case program stem of a launch target, exe path or argv list ("" if unknown)."""
+    if not target:
+        return ""
+    if not isinstance(target, str):
+        target = target[0]
+    m = _EXE.search(target)
+    if m:
+        return m.group(1).lower()
+    first = target.strip().strip('"').split()
+    return os.path.basename(first[0]).lower() if first else ""
+
+
+def title_words(title):
+    return set(_WORD.findall(title.lower()))
+
+
+def title_score(target, title):
+    """Best SequenceMatcher ratio of `target` against any run of as many title words."""
+    words = _WORD.findall(title.lower())
+    if not words:
+        return 0.0
+    if f" {target} " in f" {' '.join(words)} ":
+        return 1.0
+    n = len(target.split())
+    s = difflib.SequenceMatcher()
+    s.set_seq2(target)
+    best = 0.0
+    for i in range(max(1, len(words) - n + 1)):
+        s.set_seq1(" ".join(words[i:i + n]))
+        if s.real_quick_ratio() > best and s.quick_ratio() > best:
+            best = max(best, s.ratio())
+    return best
+
+
+class WindowRegistry:
+    def __init__(self, manager, poll_s=2.0, resync_s=30.0, shortlist=32):
+        self.manager = manager
+        self.poll_s = poll_s            # re-list interval without events
+        self.resync_s = resync_s        # safety re-list with events (missed ones)
+        self.shortlist = shortlist
+        self.evented = False
+
+        self._lock = threading.Lock()
+        self._windows = {}                      # handle → WindowInfo
+        self._words = {}                        # handle → title words
+        self._by_word = defaultdict(set)        # title word → handles
+        self._vocab = AppNameIndex()            # every title word seen, for near misses
+        self._vocab_words = set()
+        self._by_program = defaultdict(set)     # program stem → handles
+        self._by_pid = defaultdict(set)         # owning pid → handles
+        self._focus = {}                        # handle → monotonic time of last focus
+        self._started = False
+
+    # ── Lifecycle ────────────────────────────────────────────────
+
+    def start(self):
+        """List windows, subscribe to events (or poll).  Safe to call twice."""
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        self.resync()
+        self.evented = bool(self.manager.watch(self._on_event))
+        interval = self.resync_s if self.evented else self.poll_s
+        threading.Thread(target=self._poll, args=(interval,), daemon=True, name="window-registry").start()
+
+    def _poll(self, interval):
+        while True:
+            time.sleep(interval)
+            try:
+                self.resync()
+            except Exception:
+                pass
+
+    def resync(self):
+        """Replace the registry contents with a fresh listing."""
+        fresh = {w.handle: w for w in self.manager.windows()}
+        with self._lock:
+            for handle in [h for h in self._windows if h not in fresh]:
+                self._drop(handle)
+            for w in fresh.values():
+                self._put(w)
+            if len(self._vocab_words) > 2 * len(self._by_word) + 1000:
+                # titles churn (browser tabs): forget words no window has any more
+                self._vocab_words = set(self._by_word)
+                self._vocab = AppNameIndex(self._vocab_words)
+
+    def _on_event(self, kind, handle):
+        try:
+            if kind == "resync":
+                self.resync()
+            elif kind == "destroy":
+                with self._lock:
+                    self._drop(handle)
+            else:
+                info = self.manager.info(handle) if kind != "focus" or handle not in self._windows else None
+                with self._lock:
+                    if info is not None:
+                        self._put(info)
+                    elif kind != "focus":
+                        self._drop(handle)          # created hidden, or renamed and gone
+                    if kind == "focus" and handle in self._windows:
+                        self._focus[handle] = time.monotonic()
+        except Exception:
+            pass
+
+    # ── Index maintenance (caller holds the lock) ────────────────
+
+    def _put(self, info):
+        old = self._windows.get(info.handle)
+        if old == info:
+            return
+        if old is not None:
+            self._unindex(old)
+        self._windows[info.handle] = info
+        words = self._words[info.handle] = title_words(info.title)
+        for w in words:
+            self._by_word[w].add(info.handle)
+            if w not in self._vocab_words:
+                self._vocab_words.add(w)
+                self._vocab.add(w)
+        self._by_program[program_name(info.exe)].add(info.handle)
+        self._by_pid[info.pid].add(info.handle)
+
+    def _drop(self, handle):
+        info = self._windows.pop(handle, None)
+        if info is not None:
+            self._unindex(info)
+        self._focus.pop(handle, None)
+
+    def _unindex(self, info):
+        for w in self._words.pop(info.handle, ()):
+            bucket = self._by_word[w]
+            bucket.discard(info.handle)
+            if not bucket:
+                del self._by_word[w]
+        for index, key in ((self._by_program, program_name(info.exe)), (self._by_pid, info.pid)):
+            bucket = index[key]
+            bucket.discard(info.handle)
+            if not bucket:
+                del index[key]
+
+    # ── Lookup ───────────────────────────────────────────────────
+
+    def __len__(self):
+        return len(self._windows)
+
+    def windows(self):
+        with self._lock:
+            return list(self._windows.values())
+
+    def rank(self, target, app_target=None, cutoff=0.6, n=5):
+        """[(score, WindowInfo)] best first for a spoken window/app name."""
+        if not self._started:
+            self.start()
+        target = target.lower().strip()
+        program = program_name(app_target)
+        now = time.monotonic()
+        with self._lock:
+            # windows per spoken word they contain (exactly or as a close match)
+            per_word = []
+            for word in title_words(target):
+                near = () if word in self._by_word else self._vocab.close_matches(word, n=3, cutoff=WORD_CUTOFF)
+                matched = self._by_word.get(word, set())
+                for w in near:
+                    matched = matched | self._by_word.get(w, set())
+                per_word.append(matched)
+            per_word.sort(key=len)
+            full = set.intersection(*per_word) if per_word else set()
+            if full:
+                # windows with every spoken word: partial matches cannot beat them
+                hits = dict.fromkeys(full, len(per_word))
+            else:
+                hits = defaultdict(int)
+                for matched in per_word:
+                    for h in matched:
+                        hits[h] += 1
+            focus = self._focus.get
+            handles = set(heapq.nlargest(self.shortlist, hits, key=lambda h: (hits[h], focus(h, 0.0))))
+            owned = self._by_program.get(program, ()) if program else ()
+            if len(owned) > self.shortlist:
+                # many windows of one app: the best-matching and most recently focused
+                owned = heapq.nlargest(self.shortlist, owned, key=lambda h: (hits.get(h, 0), focus(h, 0.0)))
+            owned = set(owned)
+            handles |= owned
+            scored = []
+            for h in handles:
+                info = self._windows[h]
+                score = title_score(target, info.title)
+                if score < cutoff and h not in owned:
+                    continue
+                score += EXE_WEIGHT * (h in owned)
+                if h in self._focus:
+                    score += RECENCY_WEIGHT * 0.5 ** ((now - self._focus[h]) / RECENCY_HALF_LIFE)
+                scored.append((score, info))
+        scored.sort(key=lambda x: x[0], reverse=True)
+        return scored[:n]
+
+    def owned_by(self, pids):
+        """Handles of the windows of `pids`, most recently focused first."""
+        if not self._started:
+            self.start()
+        with self._lock:
+            handles = [h for pid in pids for h in self._by_pid.get(pid, ())]
+            return sorted(handles, key=lambda h: self._focus.get(h, 0.0), reverse=True)
+
+    def best(self, target, app_target=None, cutoff=0.6):
+        """Handle of the best window for `target`, or None."""
+        ranked = self.rank(target, app_target, cutoff, n=1)
+        return ranked[0][1].handle if ranked else None